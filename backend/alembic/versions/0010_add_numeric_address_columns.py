@@ -0,0 +1,98 @@
+"""Add numeric address columns to subnets, supernets and ip_assignments
+
+Revision ID: 0010_add_numeric_address_columns
+Revises: 0009_add_interface_to_ip_assignments
+Create Date: 2025-09-02 10:15:00.000000
+
+"""
+import ipaddress
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0010_add_numeric_address_columns'
+down_revision = '0009_add_interface_to_ip_assignments'
+branch_labels = None
+depends_on = None
+
+
+def _cidr_range(cidr):
+    try:
+        network = ipaddress.ip_network(cidr, strict=False)
+    except (ValueError, TypeError):
+        return None, None
+    return int(network.network_address), int(network.broadcast_address)
+
+
+def _ip_value(ip):
+    try:
+        return int(ipaddress.ip_address(ip))
+    except (ValueError, TypeError):
+        return None
+
+
+def _backfill_ranges(conn, table_name):
+    table = sa.table(
+        table_name,
+        sa.column('id', sa.Integer),
+        sa.column('cidr', sa.String),
+        sa.column('range_start', sa.Numeric(39, 0)),
+        sa.column('range_end', sa.Numeric(39, 0)),
+    )
+    rows = conn.execute(sa.select(table.c.id, table.c.cidr)).fetchall()
+    for row_id, cidr in rows:
+        start, end = _cidr_range(cidr)
+        conn.execute(
+            table.update().where(table.c.id == row_id).values(range_start=start, range_end=end)
+        )
+
+
+def upgrade():
+    from sqlalchemy import inspect
+    from alembic import context
+
+    conn = context.get_bind()
+    inspector = inspect(conn)
+
+    for table_name in ('subnets', 'supernets'):
+        existing_columns = [col['name'] for col in inspector.get_columns(table_name)]
+        existing_indexes = [idx['name'] for idx in inspector.get_indexes(table_name)]
+        with op.batch_alter_table(table_name) as batch_op:
+            if 'range_start' not in existing_columns:
+                batch_op.add_column(sa.Column('range_start', sa.Numeric(39, 0), nullable=True))
+            if 'range_end' not in existing_columns:
+                batch_op.add_column(sa.Column('range_end', sa.Numeric(39, 0), nullable=True))
+            if f'ix_{table_name}_range' not in existing_indexes:
+                batch_op.create_index(f'ix_{table_name}_range', ['range_start', 'range_end'])
+        _backfill_ranges(conn, table_name)
+
+    existing_columns = [col['name'] for col in inspector.get_columns('ip_assignments')]
+    existing_indexes = [idx['name'] for idx in inspector.get_indexes('ip_assignments')]
+    with op.batch_alter_table('ip_assignments') as batch_op:
+        if 'ip_value' not in existing_columns:
+            batch_op.add_column(sa.Column('ip_value', sa.Numeric(39, 0), nullable=True))
+        if 'ix_ip_assignments_subnet_ip_value' not in existing_indexes:
+            batch_op.create_index('ix_ip_assignments_subnet_ip_value', ['subnet_id', 'ip_value'])
+
+    ip_assignments = sa.table(
+        'ip_assignments',
+        sa.column('id', sa.Integer),
+        sa.column('ip_address', sa.String),
+        sa.column('ip_value', sa.Numeric(39, 0)),
+    )
+    rows = conn.execute(sa.select(ip_assignments.c.id, ip_assignments.c.ip_address)).fetchall()
+    for row_id, ip_address in rows:
+        conn.execute(
+            ip_assignments.update().where(ip_assignments.c.id == row_id).values(ip_value=_ip_value(ip_address))
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('ip_assignments') as batch_op:
+        batch_op.drop_index('ix_ip_assignments_subnet_ip_value')
+        batch_op.drop_column('ip_value')
+    for table_name in ('supernets', 'subnets'):
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_index(f'ix_{table_name}_range')
+            batch_op.drop_column('range_end')
+            batch_op.drop_column('range_start')
@@ -0,0 +1,82 @@
+"""Add trigram search indexes (Postgres) and FTS5 search tables (SQLite)
+
+Revision ID: 0011_add_search_indexes
+Revises: 0010_add_numeric_address_columns
+Create Date: 2025-09-03 09:40:00.000000
+
+"""
+from alembic import op
+
+
+revision = '0011_add_search_indexes'
+down_revision = '0010_add_numeric_address_columns'
+branch_labels = None
+depends_on = None
+
+
+SEARCH_COLUMNS = {
+    'subnets': ['cidr', 'name', 'assigned_to'],
+    'supernets': ['cidr', 'name'],
+    'vlans': ['name'],
+    'devices': ['name', 'hostname', 'role', 'location', 'vendor', 'serial_number'],
+    'ip_assignments': ['ip_address', 'role', 'interface'],
+}
+
+
+def _create_sqlite_fts(table, columns):
+    fts = f'{table}_fts'
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'new.{col}' for col in columns)
+    old_values = ', '.join(f'old.{col}' for col in columns)
+
+    op.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{column_list}, content='{table}', content_rowid='id', tokenize='trigram')"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+    )
+    op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def upgrade():
+    from alembic import context
+
+    dialect = context.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table, columns in SEARCH_COLUMNS.items():
+            for col in columns:
+                op.execute(
+                    f'CREATE INDEX IF NOT EXISTS ix_{table}_{col}_trgm ON {table} USING gin ({col} gin_trgm_ops)'
+                )
+    elif dialect == 'sqlite':
+        for table, columns in SEARCH_COLUMNS.items():
+            _create_sqlite_fts(table, columns)
+
+
+def downgrade():
+    from alembic import context
+
+    dialect = context.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        for table, columns in SEARCH_COLUMNS.items():
+            for col in columns:
+                op.execute(f'DROP INDEX IF EXISTS ix_{table}_{col}_trgm')
+    elif dialect == 'sqlite':
+        for table in SEARCH_COLUMNS:
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f'DROP TRIGGER IF EXISTS {table}_fts_{suffix}')
+            op.execute(f'DROP TABLE IF EXISTS {table}_fts')
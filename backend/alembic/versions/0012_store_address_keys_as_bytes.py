@@ -0,0 +1,115 @@
+"""Store address range keys as 16 byte keys with an ip_version column
+
+NUMERIC(39, 0) lost precision on SQLite, which keeps it as REAL, and binding
+an IPv6 value above 2^63 failed there outright. The keys become fixed-width
+big-endian bytes, which compare in numeric order on Postgres and SQLite, and
+ip_version keeps IPv4 and IPv6 ranges apart in the range indexes.
+
+Revision ID: 0012_store_address_keys_as_bytes
+Revises: 0011_add_search_indexes
+Create Date: 2025-09-10 11:20:00.000000
+
+"""
+import ipaddress
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0012_store_address_keys_as_bytes'
+down_revision = '0011_add_search_indexes'
+branch_labels = None
+depends_on = None
+
+
+def _key(value):
+    return None if value is None else value.to_bytes(16, 'big')
+
+
+def _network(cidr):
+    try:
+        return ipaddress.ip_network(cidr, strict=False)
+    except (ValueError, TypeError):
+        return None
+
+
+def _address(ip):
+    try:
+        return ipaddress.ip_address(ip)
+    except (ValueError, TypeError):
+        return None
+
+
+# Columns are added and dropped with plain ALTER TABLE rather than batch mode:
+# recreating the table on SQLite would drop the FTS triggers from 0011.
+def _replace_range_columns(conn, table_name, key_type, to_key):
+    op.drop_index(f'ix_{table_name}_range', table_name=table_name)
+    op.drop_column(table_name, 'range_end')
+    op.drop_column(table_name, 'range_start')
+    op.add_column(table_name, sa.Column('range_start', key_type, nullable=True))
+    op.add_column(table_name, sa.Column('range_end', key_type, nullable=True))
+
+    table = sa.table(
+        table_name,
+        sa.column('id', sa.Integer),
+        sa.column('cidr', sa.String),
+        sa.column('ip_version', sa.SmallInteger),
+        sa.column('range_start', key_type),
+        sa.column('range_end', key_type),
+    )
+    for row_id, cidr in conn.execute(sa.select(table.c.id, table.c.cidr)).fetchall():
+        network = _network(cidr)
+        if network is None:
+            continue
+        conn.execute(table.update().where(table.c.id == row_id).values(
+            ip_version=network.version,
+            range_start=to_key(int(network.network_address)),
+            range_end=to_key(int(network.broadcast_address)),
+        ))
+
+
+def _replace_ip_value(conn, key_type, to_key):
+    op.drop_index('ix_ip_assignments_subnet_ip_value', table_name='ip_assignments')
+    op.drop_column('ip_assignments', 'ip_value')
+    op.add_column('ip_assignments', sa.Column('ip_value', key_type, nullable=True))
+
+    table = sa.table(
+        'ip_assignments',
+        sa.column('id', sa.Integer),
+        sa.column('ip_address', sa.String),
+        sa.column('ip_version', sa.SmallInteger),
+        sa.column('ip_value', key_type),
+    )
+    for row_id, ip_address in conn.execute(sa.select(table.c.id, table.c.ip_address)).fetchall():
+        address = _address(ip_address)
+        if address is None:
+            continue
+        conn.execute(table.update().where(table.c.id == row_id).values(
+            ip_version=address.version, ip_value=to_key(int(address)),
+        ))
+    op.create_index('ix_ip_assignments_subnet_ip_value', 'ip_assignments', ['subnet_id', 'ip_value'])
+
+
+def upgrade():
+    from alembic import context
+
+    conn = context.get_bind()
+    for table_name in ('subnets', 'supernets'):
+        op.add_column(table_name, sa.Column('ip_version', sa.SmallInteger(), nullable=True))
+        _replace_range_columns(conn, table_name, sa.LargeBinary(16), _key)
+        op.create_index(f'ix_{table_name}_range', table_name, ['ip_version', 'range_start', 'range_end'])
+
+    op.add_column('ip_assignments', sa.Column('ip_version', sa.SmallInteger(), nullable=True))
+    _replace_ip_value(conn, sa.LargeBinary(16), _key)
+
+
+def downgrade():
+    from alembic import context
+
+    conn = context.get_bind()
+    _replace_ip_value(conn, sa.Numeric(39, 0), lambda value: value)
+    op.drop_column('ip_assignments', 'ip_version')
+
+    for table_name in ('supernets', 'subnets'):
+        _replace_range_columns(conn, table_name, sa.Numeric(39, 0), lambda value: value)
+        op.create_index(f'ix_{table_name}_range', table_name, ['range_start', 'range_end'])
+        op.drop_column(table_name, 'ip_version')
@@ -0,0 +1,31 @@
+"""Add the table_versions change counters shared by all workers
+
+Every commit bumps the counter of each table it wrote, in the same
+transaction, so workers can tell when their cached ETags, reference data,
+prefix trie and suggestion index are stale.
+
+Revision ID: 0013_add_table_versions
+Revises: 0012_store_address_keys_as_bytes
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0013_add_table_versions'
+down_revision = '0012_store_address_keys_as_bytes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'table_versions',
+        sa.Column('name', sa.String(length=64), primary_key=True),
+        sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('table_versions')
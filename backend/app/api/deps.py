@@ -1,11 +1,13 @@
+import secrets
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.config import settings
+from app.core.security import decode_token
 from app.db.session import get_db
 from app.db.models import User
+from app.core.query_stats import current_query_stats
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
@@ -15,20 +17,29 @@ async def get_current_user(db: AsyncSession = Depends(get_db), creds: HTTPAuthor
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
     token = creds.credentials
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=["HS256"])
+        payload = decode_token(token, settings.JWT_SECRET_KEY)
         sub = payload.get("sub")
         if sub is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
         uid = int(sub)
-    except JWTError:
+    except ValueError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     result = await db.execute(select(User).where(User.id == uid))
     user = result.scalar_one_or_none()
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    stats = current_query_stats()
+    if stats is not None:
+        stats.user_id = user.id
     return user
 
 
+async def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    if not current_user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
+
+
 async def get_current_user_from_token_param(request: Request, db: AsyncSession = Depends(get_db)) -> User:
     """Authenticate user from token URL parameter for direct file downloads"""
     token = request.query_params.get("token")
@@ -36,12 +47,12 @@ async def get_current_user_from_token_param(request: Request, db: AsyncSession =
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token parameter required")
     
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=["HS256"])
+        payload = decode_token(token, settings.JWT_SECRET_KEY)
         sub = payload.get("sub")
         if sub is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
         uid = int(sub)
-    except JWTError:
+    except ValueError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     
     result = await db.execute(select(User).where(User.id == uid))
@@ -49,3 +60,11 @@ async def get_current_user_from_token_param(request: Request, db: AsyncSession =
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user
+
+
+async def require_metrics_token(creds: HTTPAuthorizationCredentials | None = Depends(bearer_scheme)) -> None:
+    """Guard /metrics with the static METRICS_TOKEN; the endpoint is off while it is unset"""
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if creds is None or not secrets.compare_digest(creds.credentials, settings.METRICS_TOKEN):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
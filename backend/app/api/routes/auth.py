@@ -2,11 +2,10 @@ from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from jose import JWTError, jwt
 from app.db.session import get_db
 from app.db.models import User
 from app.schemas.user import UserCreate, UserLogin, UserOut, PasswordChange
-from app.core.security import get_password_hash, verify_password, create_access_token, create_refresh_token
+from app.core.security import get_password_hash, verify_password, create_access_token, create_refresh_token, decode_token
 from app.core.config import settings
 from app.api.deps import get_current_user
 
@@ -80,12 +79,12 @@ async def refresh(payload: dict, db: AsyncSession = Depends(get_db)):
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token is required")
     try:
-        jwt_payload = jwt.decode(token, settings.JWT_REFRESH_SECRET_KEY, algorithms=["HS256"])
+        jwt_payload = decode_token(token, settings.JWT_REFRESH_SECRET_KEY)
         sub = jwt_payload.get("sub")
         if not sub:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
         uid = int(sub)
-    except JWTError:
+    except ValueError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
     q = await db.execute(select(User).where(User.id == uid))
     user = q.scalar_one_or_none()
@@ -13,6 +13,7 @@ from app.services.backup import (
     get_backup_file_path, delete_backup_file
 )
 from app.schemas.backup import BackupListItem, RestoreResult
+from app.core.metrics import BACKUPS
 
 router = APIRouter()
 
@@ -25,12 +26,14 @@ async def create_system_backup(
     """Create a complete system backup"""
     try:
         backup_id = await create_backup(db, user.id)
+        BACKUPS.labels(operation="create", status="success").inc()
         return {
             "success": True,
             "message": "Backup created successfully",
             "backup_id": backup_id
         }
     except Exception as e:
+        BACKUPS.labels(operation="create", status="error").inc()
         raise HTTPException(status_code=500, detail=f"Backup creation failed: {str(e)}")
 
 
@@ -75,11 +78,13 @@ async def restore_system_backup(
         backup_data = json.loads(content.decode('utf-8'))
         
         result = await restore_backup(db, backup_data)
+        BACKUPS.labels(operation="restore", status="success").inc()
         return result
         
     except json.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid JSON file")
     except Exception as e:
+        BACKUPS.labels(operation="restore", status="error").inc()
         raise HTTPException(status_code=500, detail=f"Restore failed: {str(e)}")
 
 
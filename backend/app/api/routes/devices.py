@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete, func
-from sqlalchemy.orm import selectinload
 from app.api.deps import get_current_user
 from app.db.session import get_db
 from app.db.models import Device
@@ -9,9 +8,14 @@ from app.schemas.device import DeviceCreate, DeviceOut, DeviceUpdate
 from app.schemas.pagination import PaginatedResponse
 from app.schemas.bulk import BulkDeleteRequest, BulkDeleteResponse, BulkExportRequest
 from app.services.audit import record_audit
+from app.services.reference_cache import vlans_cache, racks_cache, find_vlan_by_number, find_rack_by_label
+from app.utils.json_response import lean_columns, rows_to_dicts, paginated_response
+from app.core.metrics import IMPORTS
 
 router = APIRouter()
 
+DEVICE_OUT_COLUMNS = lean_columns(Device, DeviceOut)
+
 
 @router.get("", response_model=PaginatedResponse[DeviceOut])
 async def list_devices(
@@ -25,11 +29,10 @@ async def list_devices(
     
     offset = (page - 1) * limit
     res = await db.execute(
-        select(Device).options(selectinload(Device.vlan)).order_by(Device.id.desc()).offset(offset).limit(limit)
+        select(*DEVICE_OUT_COLUMNS).order_by(Device.id.desc()).offset(offset).limit(limit)
     )
-    devices = res.scalars().all()
     
-    return PaginatedResponse.create(devices, total, page, limit)
+    return paginated_response(rows_to_dicts(res.all(), DEVICE_OUT_COLUMNS), total, page, limit)
 
 
 @router.post("", response_model=DeviceOut)
@@ -121,11 +124,15 @@ async def delete_device(device_id: int, db: AsyncSession = Depends(get_db), user
 async def export_devices_csv(db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
     from app.utils.csv_export import create_csv_response
     
-    res = await db.execute(select(Device).options(selectinload(Device.vlan), selectinload(Device.rack)))
+    res = await db.execute(select(Device))
     devices = res.scalars().all()
+    vlans = {vlan.id: vlan for vlan in await vlans_cache.all(db)}
+    racks = {rack.id: rack for rack in await racks_cache.all(db)}
     
     data = []
     for device in devices:
+        vlan = vlans.get(device.vlan_id)
+        rack = racks.get(device.rack_id)
         data.append({
             "name": device.name or "",
             "hostname": device.hostname or "",
@@ -133,8 +140,8 @@ async def export_devices_csv(db: AsyncSession = Depends(get_db), user=Depends(ge
             "location": device.location or "",
             "vendor": device.vendor or "",
             "serial_number": device.serial_number or "",
-            "vlan": f"{device.vlan.vlan_id} - {device.vlan.name}" if device.vlan else "",
-            "rack": device.rack.name if device.rack else "",
+            "vlan": vlan.label if vlan else "",
+            "rack": rack.label if rack else "",
             "rack_position": str(device.rack_position) if device.rack_position else ""
         })
     
@@ -155,8 +162,8 @@ async def get_device_import_template():
 async def import_devices_csv(file: UploadFile, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
     import csv
     import io
-    from app.db.models import Vlan, Rack, Subnet, IpAssignment
-    from app.services.ipam import ip_in_cidr
+    from app.db.models import IpAssignment
+    from app.services.prefix_trie import get_prefix_index
     
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="File must be a CSV")
@@ -167,6 +174,7 @@ async def import_devices_csv(file: UploadFile, db: AsyncSession = Depends(get_db
     
     imported_count = 0
     errors = []
+    prefix_index = await get_prefix_index(db)
     
     for row_num, row in enumerate(reader, start=2):
         try:
@@ -179,17 +187,17 @@ async def import_devices_csv(file: UploadFile, db: AsyncSession = Depends(get_db
             if row.get('vlan') and ' - ' in row['vlan']:
                 vlan_id_str = row['vlan'].split(' - ')[0]
                 try:
-                    vlan_res = await db.execute(select(Vlan).where(Vlan.vlan_id == int(vlan_id_str)))
-                    vlan = vlan_res.scalar_one_or_none()
+                    vlan_number = int(vlan_id_str)
+                except ValueError:
+                    vlan_number = None
+                if vlan_number is not None:
+                    vlan = await find_vlan_by_number(db, vlan_number)
                     if vlan:
                         vlan_id = vlan.id
-                except ValueError:
-                    pass
             
             rack_id = None
             if row.get('rack'):
-                rack_res = await db.execute(select(Rack).where(Rack.name == row['rack']))
-                rack = rack_res.scalar_one_or_none()
+                rack = await find_rack_by_label(db, row['rack'])
                 if rack:
                     rack_id = rack.id
             
@@ -218,25 +226,18 @@ async def import_devices_csv(file: UploadFile, db: AsyncSession = Depends(get_db
             if row.get('ip_address'):
                 ip_address = row['ip_address'].strip()
                 if ip_address:
-                    subnets_res = await db.execute(select(Subnet))
-                    subnets = subnets_res.scalars().all()
-                    
-                    matching_subnet = None
-                    for subnet in subnets:
-                        if ip_in_cidr(ip_address, subnet.cidr):
-                            matching_subnet = subnet
-                            break
+                    matching_subnet = prefix_index.subnets.longest_match(ip_address)
                     
                     if matching_subnet:
                         existing_ip = await db.execute(
                             select(IpAssignment).where(
-                                IpAssignment.subnet_id == matching_subnet.id,
+                                IpAssignment.subnet_id == matching_subnet["id"],
                                 IpAssignment.ip_address == ip_address
                             )
                         )
                         if not existing_ip.scalar_one_or_none():
                             ip_assignment = IpAssignment(
-                                subnet_id=matching_subnet.id,
+                                subnet_id=matching_subnet["id"],
                                 device_id=device.id,
                                 ip_address=ip_address,
                                 interface=row.get('interface') or None,
@@ -256,6 +257,7 @@ async def import_devices_csv(file: UploadFile, db: AsyncSession = Depends(get_db
     if imported_count > 0:
         await db.commit()
     
+    IMPORTS.labels(entity="devices").inc(imported_count)
     return {
         "imported_count": imported_count,
         "errors": errors
@@ -268,14 +270,15 @@ async def import_devices_csv(file: UploadFile, db: AsyncSession = Depends(get_db
 async def export_selected_devices(payload: BulkExportRequest, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
     from app.utils.csv_export import create_csv_response
     
-    res = await db.execute(
-        select(Device).options(selectinload(Device.vlan), selectinload(Device.rack))
-        .where(Device.id.in_(payload.ids))
-    )
+    res = await db.execute(select(Device).where(Device.id.in_(payload.ids)))
     devices = res.scalars().all()
+    vlans = {vlan.id: vlan for vlan in await vlans_cache.all(db)}
+    racks = {rack.id: rack for rack in await racks_cache.all(db)}
     
     data = []
     for device in devices:
+        vlan = vlans.get(device.vlan_id)
+        rack = racks.get(device.rack_id)
         data.append({
             "name": device.name or "",
             "hostname": device.hostname or "",
@@ -283,8 +286,8 @@ async def export_selected_devices(payload: BulkExportRequest, db: AsyncSession =
             "location": device.location or "",
             "vendor": device.vendor or "",
             "serial_number": device.serial_number or "",
-            "vlan": f"{device.vlan.vlan_id} - {device.vlan.name}" if device.vlan else "",
-            "rack": device.rack.name if device.rack else "",
+            "vlan": vlan.label if vlan else "",
+            "rack": rack.label if rack else "",
             "rack_position": str(device.rack_position) if device.rack_position else ""
         })
     
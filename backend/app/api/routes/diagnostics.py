@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.api.deps import require_admin
+from app.db.models import User
+from app.core.config import settings
+from app.core.query_stats import query_window
+from app.core.profiling import sample_stacks
+
+router = APIRouter()
+
+
+@router.get("/queries")
+async def top_queries(limit: int = Query(20, ge=1, le=200), current_user: User = Depends(require_admin)):
+    """Statement fingerprints with the highest total database time in the rolling window"""
+    return {
+        "window_seconds": settings.SLOW_QUERY_WINDOW_SECONDS,
+        "slow_query_ms": settings.SLOW_QUERY_MS,
+        "statements": query_window.top(limit),
+    }
+
+
+@router.get("/profile")
+async def sample_profile(
+    seconds: float = Query(10.0, gt=0, le=60),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+    format: str = Query("collapsed", pattern="^(collapsed|speedscope)$"),
+    current_user: User = Depends(require_admin),
+):
+    """Sample the stacks of every thread in this worker for the given number of seconds"""
+    try:
+        sampler = await sample_stacks(seconds, interval_ms / 1000)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if format == "speedscope":
+        return JSONResponse(
+            sampler.speedscope(),
+            headers={"Content-Disposition": 'attachment; filename="profile.speedscope.json"'},
+        )
+    return PlainTextResponse(sampler.collapsed())
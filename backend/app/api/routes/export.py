@@ -4,9 +4,8 @@ from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 from app.api.deps import get_current_user
 from app.db.session import get_db
-from app.db.models import (
-    Supernet, Subnet, Device, Rack, Purpose, Vlan, AuditLog, IpAssignment
-)
+from app.db.models import Supernet, Subnet, Device, Rack, IpAssignment
+from app.services.reference_cache import categories_cache, purposes_cache, vlans_cache, racks_cache
 from app.utils.csv_export import create_excel_response
 
 router = APIRouter()
@@ -15,6 +14,10 @@ router = APIRouter()
 @router.get("/all")
 async def export_all_data(db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
     worksheets = {}
+    categories = {category.id: category for category in await categories_cache.all(db)}
+    purposes = {purpose.id: purpose for purpose in await purposes_cache.all(db)}
+    vlans = {vlan.id: vlan for vlan in await vlans_cache.all(db)}
+    racks = {rack.id: rack for rack in await racks_cache.all(db)}
     
     supernets_res = await db.execute(select(Supernet))
     supernets = supernets_res.scalars().all()
@@ -31,12 +34,7 @@ async def export_all_data(db: AsyncSession = Depends(get_db), user=Depends(get_c
         ]
     }
     
-    subnets_res = await db.execute(
-        select(Subnet).options(
-            selectinload(Subnet.purpose),
-            selectinload(Subnet.vlan)
-        )
-    )
+    subnets_res = await db.execute(select(Subnet))
     subnets = subnets_res.scalars().all()
     worksheets["Subnets"] = {
         "headers": ["name", "cidr", "purpose", "assigned_to", "gateway_ip", "vlan", "site", "environment"],
@@ -44,10 +42,10 @@ async def export_all_data(db: AsyncSession = Depends(get_db), user=Depends(get_c
             {
                 "name": s.name or "",
                 "cidr": s.cidr,
-                "purpose": s.purpose.name if s.purpose else "",
+                "purpose": purposes[s.purpose_id].name if s.purpose_id in purposes else "",
                 "assigned_to": s.assigned_to or "",
                 "gateway_ip": s.gateway_ip or "",
-                "vlan": f"{s.vlan.vlan_id} - {s.vlan.name}" if s.vlan else "",
+                "vlan": vlans[s.vlan_id].label if s.vlan_id in vlans else "",
                 "site": s.site or "",
                 "environment": s.environment or ""
             }
@@ -55,12 +53,7 @@ async def export_all_data(db: AsyncSession = Depends(get_db), user=Depends(get_c
         ]
     }
     
-    devices_res = await db.execute(
-        select(Device).options(
-            selectinload(Device.vlan),
-            selectinload(Device.rack)
-        )
-    )
+    devices_res = await db.execute(select(Device))
     devices = devices_res.scalars().all()
     worksheets["Devices"] = {
         "headers": ["name", "hostname", "role", "location", "vendor", "serial_number", "vlan", "rack", "rack_position"],
@@ -72,16 +65,15 @@ async def export_all_data(db: AsyncSession = Depends(get_db), user=Depends(get_c
                 "location": d.location or "",
                 "vendor": d.vendor or "",
                 "serial_number": d.serial_number or "",
-                "vlan": f"{d.vlan.vlan_id} - {d.vlan.name}" if d.vlan else "",
-                "rack": f"{d.rack.aisle}-{d.rack.rack_number}" if d.rack else "",
+                "vlan": vlans[d.vlan_id].label if d.vlan_id in vlans else "",
+                "rack": racks[d.rack_id].label if d.rack_id in racks else "",
                 "rack_position": str(d.rack_position) if d.rack_position else ""
             }
             for d in devices
         ]
     }
     
-    racks_res = await db.execute(select(Rack))
-    racks = racks_res.scalars().all()
+    rack_rows = await db.execute(select(Rack).order_by(Rack.id))
     worksheets["Racks"] = {
         "headers": ["aisle", "rack_number", "position_count", "power_type", "power_capacity", "cooling_type", "location", "notes"],
         "data": [
@@ -95,7 +87,7 @@ async def export_all_data(db: AsyncSession = Depends(get_db), user=Depends(get_c
                 "location": r.location or "",
                 "notes": r.notes or ""
             }
-            for r in racks
+            for r in rack_rows.scalars().all()
         ]
     }
     
@@ -103,7 +95,7 @@ async def export_all_data(db: AsyncSession = Depends(get_db), user=Depends(get_c
         select(IpAssignment).options(
             selectinload(IpAssignment.subnet),
             selectinload(IpAssignment.device)
-        )
+        ).order_by(IpAssignment.subnet_id, IpAssignment.ip_value)
     )
     ip_assignments = ip_assignments_res.scalars().all()
     worksheets["IP Assignments"] = {
@@ -120,10 +112,6 @@ async def export_all_data(db: AsyncSession = Depends(get_db), user=Depends(get_c
         ]
     }
     
-    vlans_res = await db.execute(
-        select(Vlan).options(selectinload(Vlan.purpose))
-    )
-    vlans = vlans_res.scalars().all()
     worksheets["VLANs"] = {
         "headers": ["site", "environment", "vlan_id", "name", "purpose"],
         "data": [
@@ -132,23 +120,21 @@ async def export_all_data(db: AsyncSession = Depends(get_db), user=Depends(get_c
                 "environment": v.environment,
                 "vlan_id": str(v.vlan_id),
                 "name": v.name,
-                "purpose": v.purpose.name if v.purpose else ""
+                "purpose": purposes[v.purpose_id].name if v.purpose_id in purposes else ""
             }
-            for v in vlans
+            for v in vlans.values()
         ]
     }
     
-    purposes_res = await db.execute(select(Purpose).order_by(Purpose.name))
-    purposes = purposes_res.scalars().all()
     worksheets["Purposes"] = {
         "headers": ["name", "description", "category"],
         "data": [
             {
                 "name": p.name,
                 "description": p.description or "",
-                "category": p.category or ""
+                "category": categories[p.category_id].name if p.category_id in categories else ""
             }
-            for p in purposes
+            for p in sorted(purposes.values(), key=lambda p: p.name)
         ]
     }
     
@@ -1,12 +1,13 @@
 import time
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api.deps import get_current_user
+from app.api.deps import require_admin
 from app.db.models import User
 from app.db.session import AsyncSessionLocal
 from app.core.config import settings
+from app.services.reference_cache import reference_cache_stats
 import logging
 
 router = APIRouter()
@@ -14,17 +15,15 @@ logger = logging.getLogger(__name__)
 
 
 @router.get("/health/detailed")
-async def detailed_health_check(current_user: User = Depends(get_current_user)):
+async def detailed_health_check(current_user: User = Depends(require_admin)):
     """Detailed health check for authenticated admin users only"""
-    if not current_user.is_admin:
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
     health_data = {
         "status": "ok",
         "timestamp": datetime.utcnow().isoformat(),
         "database": {"status": "unknown"},
         "environment": settings.ENV,
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "reference_cache": reference_cache_stats()
     }
     
     try:
@@ -1,3 +1,4 @@
+import ipaddress
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete, func
@@ -8,8 +9,9 @@ from app.db.models import IpAssignment, Subnet, Device
 from app.schemas.ip_assignment import IpAssignmentCreate, IpAssignmentOut, IpAssignmentUpdate
 from app.schemas.pagination import PaginatedResponse
 from app.schemas.bulk import BulkDeleteRequest, BulkDeleteResponse, BulkExportRequest
-from app.services.ipam import ip_in_cidr, is_usable_ip_in_subnet
+from app.services.ipam import ip_in_cidr, is_usable_ip_in_subnet, ip_to_int
 from app.services.audit import record_audit
+from app.core.metrics import IMPORTS
 
 router = APIRouter()
 
@@ -18,17 +20,42 @@ router = APIRouter()
 async def list_ip_assignments(
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(75, ge=1, le=100, description="Items per page"),
+    subnet_id: int | None = Query(None, description="Only assignments in this subnet"),
+    start_ip: str | None = Query(None, description="Lowest IP address to include"),
+    end_ip: str | None = Query(None, description="Highest IP address to include"),
+    sort: str = Query("recent", pattern="^(recent|address)$", description="Sort by newest first or by IP address"),
     db: AsyncSession = Depends(get_db), 
     user=Depends(get_current_user)
 ):
-    count_result = await db.execute(select(func.count(IpAssignment.id)))
+    filters = []
+    if subnet_id is not None:
+        filters.append(IpAssignment.subnet_id == subnet_id)
+    try:
+        bounds = [ipaddress.ip_address(ip) for ip in (start_ip, end_ip) if ip]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid IP address in range filter")
+    if len({bound.version for bound in bounds}) > 1:
+        raise HTTPException(status_code=400, detail="start_ip and end_ip must be the same IP version")
+    if bounds:
+        filters.append(IpAssignment.ip_version == bounds[0].version)
+    if start_ip:
+        filters.append(IpAssignment.ip_value >= ip_to_int(start_ip))
+    if end_ip:
+        filters.append(IpAssignment.ip_value <= ip_to_int(end_ip))
+    
+    count_result = await db.execute(select(func.count(IpAssignment.id)).where(*filters))
     total = count_result.scalar()
     
+    if sort == "address":
+        order_by = (IpAssignment.subnet_id, IpAssignment.ip_value)
+    else:
+        order_by = (IpAssignment.id.desc(),)
+    
     offset = (page - 1) * limit
     res = await db.execute(
         select(IpAssignment).options(
             selectinload(IpAssignment.subnet), selectinload(IpAssignment.device)
-        ).order_by(IpAssignment.id.desc()).offset(offset).limit(limit)
+        ).where(*filters).order_by(*order_by).offset(offset).limit(limit)
     )
     ip_assignments = res.scalars().all()
     
@@ -138,7 +165,7 @@ async def export_ip_assignments_csv(db: AsyncSession = Depends(get_db), user=Dep
         select(IpAssignment).options(
             selectinload(IpAssignment.subnet),
             selectinload(IpAssignment.device)
-        )
+        ).order_by(IpAssignment.subnet_id, IpAssignment.ip_value)
     )
     ip_assignments = res.scalars().all()
     
@@ -265,6 +292,7 @@ async def import_ip_assignments_csv(file: UploadFile, db: AsyncSession = Depends
     if imported_count > 0:
         await db.commit()
     
+    IMPORTS.labels(entity="ip_assignments").inc(imported_count)
     return {
         "imported_count": imported_count,
         "errors": errors
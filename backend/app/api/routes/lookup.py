@@ -0,0 +1,25 @@
+import ipaddress
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_current_user
+from app.db.session import get_db
+from app.services.prefix_trie import get_prefix_index
+
+router = APIRouter()
+
+
+@router.get("")
+async def lookup(
+    ip: str = Query(..., description="IP address or CIDR to look up"),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Find the most specific supernet and subnet containing an IP address or prefix"""
+    try:
+        ipaddress.ip_network(ip.strip(), strict=False)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid IP address or CIDR: {ip}")
+    
+    index = await get_prefix_index(db)
+    result = index.lookup(ip.strip())
+    return {"ip": ip.strip(), **result}
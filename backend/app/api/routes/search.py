@@ -1,15 +1,65 @@
-from fastapi import APIRouter, Depends, Query
+import ipaddress
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, case, func, or_
 from sqlalchemy.orm import selectinload
 from app.api.deps import get_current_user
 from app.db.session import get_db
 from app.db.models import Subnet, Vlan, Device, Supernet, Purpose, IpAssignment
+from app.services.prefix_trie import get_prefix_index
+from app.services.suggest_index import SUGGEST_FIELDS, get_suggest_index
+from app.services.text_search import text_match, like_pattern, prefix_pattern
 
 router = APIRouter()
 
+SEARCH_ENTITIES = ["subnets", "supernets", "vlans", "devices", "ip_assignments"]
 
-@router.get("")
+
+def _parse_network_query(q: str):
+    """Return the network for an IP address or CIDR query, or None for free text"""
+    try:
+        return ipaddress.ip_network(q.strip(), strict=False)
+    except ValueError:
+        return None
+
+
+def _match_rank(columns, q: str):
+    """Rank rows by match quality: exact match first, then prefix, then substring"""
+    lowered = q.lower()
+    return case(
+        (or_(*(func.lower(column) == lowered for column in columns)), 0),
+        (or_(*(column.ilike(prefix_pattern(q), escape="\\") for column in columns)), 1),
+        else_=2,
+    )
+
+
+async def _fetch_page(db: AsyncSession, query, order_by: list, offset: int, limit: int):
+    res = await db.execute(query.order_by(*order_by).offset(offset).limit(limit + 1))
+    rows = res.scalars().all()
+    return rows[:limit], len(rows) > limit
+
+
+@router.get("/suggest", response_class=ORJSONResponse)
+async def suggest(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    types: str | None = Query(None, description="Comma separated entity types, e.g. subnet,device"),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Typeahead completions served from the in-memory suggestion index"""
+    kinds = None
+    if types:
+        kinds = {kind.strip() for kind in types.split(",") if kind.strip()}
+        invalid = kinds - SUGGEST_FIELDS.keys()
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid types. Must be among: {list(SUGGEST_FIELDS)}")
+    index = await get_suggest_index(db)
+    return index.complete(q.strip(), limit=limit, kinds=kinds)
+
+
+@router.get("", response_class=ORJSONResponse)
 async def search(
     q: str = Query(""),
     site: str | None = None,
@@ -19,6 +69,9 @@ async def search(
     vlan_id: str | None = None,
     assigned_to: str | None = None,
     has_gateway: str | None = None,
+    limit: int = Query(25, ge=1, le=100, description="Maximum results per entity type"),
+    entity: str | None = Query(None, description="Only search this entity type, e.g. to page through it"),
+    cursor: str | None = Query(None, description="next_cursor value from a previous response, requires entity"),
     db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user),
 ):
@@ -27,89 +80,165 @@ async def search(
     vlan_id_int = int(vlan_id) if vlan_id and vlan_id.strip() else None
     has_gateway_bool = None if not has_gateway or not has_gateway.strip() else has_gateway.lower() == 'true'
     
-    results = {"subnets": [], "vlans": [], "devices": [], "supernets": [], "ip_assignments": []}
+    if entity is not None and entity not in SEARCH_ENTITIES:
+        raise HTTPException(status_code=400, detail=f"Invalid entity. Must be one of: {SEARCH_ENTITIES}")
+    if cursor is not None and entity is None:
+        raise HTTPException(status_code=400, detail="cursor requires entity")
+    try:
+        offset = int(cursor) if cursor else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    entities = [entity] if entity else SEARCH_ENTITIES
     
-    subnet_query = select(Subnet).options(
-        selectinload(Subnet.supernet),
-        selectinload(Subnet.purpose),
-        selectinload(Subnet.vlan),
-    )
+    results = {name: [] for name in SEARCH_ENTITIES}
+    has_more = {name: False for name in SEARCH_ENTITIES}
     
-    if q:
-        subnet_query = subnet_query.where(Subnet.cidr.ilike(f"%{q}%") | Subnet.name.ilike(f"%{q}%"))
-    if site:
-        subnet_query = subnet_query.where(Subnet.site == site)
-    if environment:
-        subnet_query = subnet_query.where(Subnet.environment == environment)
-    if purpose_id_int:
-        subnet_query = subnet_query.where(Subnet.purpose_id == purpose_id_int)
-    if category_id_int:
-        subnet_query = subnet_query.join(Purpose, Subnet.purpose_id == Purpose.id).where(Purpose.category_id == category_id_int)
-    if vlan_id_int:
-        subnet_query = subnet_query.where(Subnet.vlan_id == vlan_id_int)
-    if assigned_to:
-        subnet_query = subnet_query.where(Subnet.assigned_to.ilike(f"%{assigned_to}%"))
-    if has_gateway_bool is not None:
-        if has_gateway_bool:
-            subnet_query = subnet_query.where(Subnet.gateway_ip.isnot(None))
-        else:
-            subnet_query = subnet_query.where(Subnet.gateway_ip.is_(None))
-    
-    subnets = await db.execute(subnet_query)
-    
-    supernet_query = select(Supernet)
-    if q:
-        supernet_query = supernet_query.where(Supernet.cidr.ilike(f"%{q}%") | Supernet.name.ilike(f"%{q}%"))
-    if site:
-        supernet_query = supernet_query.where(Supernet.site == site)
-    if environment:
-        supernet_query = supernet_query.where(Supernet.environment == environment)
-    
-    supernets = await db.execute(supernet_query)
+    # IP and CIDR queries are answered with containment lookups instead of
+    # substring matches: covering prefixes come from the shared prefix index
+    # and contained prefixes/addresses from the indexed range key columns,
+    # always within the query's address family.
+    network = _parse_network_query(q) if q else None
+    subnet_match = supernet_match = assignment_match = None
+    if network is not None:
+        range_start, range_end = int(network.network_address), int(network.broadcast_address)
+        index = await get_prefix_index(db)
+        covering_subnet_ids = [match["id"] for match in index.subnets.matches(str(network))]
+        covering_supernet_ids = [match["id"] for match in index.supernets.matches(str(network))]
+        subnet_match = (Subnet.ip_version == network.version) & (
+            Subnet.id.in_(covering_subnet_ids)
+            | ((Subnet.range_start >= range_start) & (Subnet.range_end <= range_end))
+        )
+        supernet_match = (Supernet.ip_version == network.version) & (
+            Supernet.id.in_(covering_supernet_ids)
+            | ((Supernet.range_start >= range_start) & (Supernet.range_end <= range_end))
+        )
+        assignment_match = (
+            IpAssignment.subnet_id.in_(select(Subnet.id).where(subnet_match))
+            & (IpAssignment.ip_version == network.version)
+            & (IpAssignment.ip_value >= range_start)
+            & (IpAssignment.ip_value <= range_end)
+        )
     
-    vlan_query = select(Vlan).options(selectinload(Vlan.purpose))
-    if q:
-        vlan_query = vlan_query.where(Vlan.name.ilike(f"%{q}%"))
-    if site:
-        vlan_query = vlan_query.where(Vlan.site == site)
-    if environment:
-        vlan_query = vlan_query.where(Vlan.environment == environment)
-    if purpose_id_int:
-        vlan_query = vlan_query.where(Vlan.purpose_id == purpose_id_int)
-    if category_id_int:
-        vlan_query = vlan_query.join(Purpose, Vlan.purpose_id == Purpose.id).where(Purpose.category_id == category_id_int)
+    if "subnets" in entities:
+        subnet_query = select(Subnet)
+        if network is not None:
+            subnet_query = subnet_query.where(subnet_match)
+            order_by = [Subnet.range_start, Subnet.id]
+        elif q:
+            subnet_query = subnet_query.where(await text_match(db, Subnet, [Subnet.cidr, Subnet.name], q))
+            order_by = [_match_rank([Subnet.cidr, Subnet.name], q), Subnet.range_start, Subnet.id]
+        else:
+            order_by = [Subnet.range_start, Subnet.id]
+        if site:
+            subnet_query = subnet_query.where(Subnet.site == site)
+        if environment:
+            subnet_query = subnet_query.where(Subnet.environment == environment)
+        if purpose_id_int:
+            subnet_query = subnet_query.where(Subnet.purpose_id == purpose_id_int)
+        if category_id_int:
+            subnet_query = subnet_query.join(Purpose, Subnet.purpose_id == Purpose.id).where(Purpose.category_id == category_id_int)
+        if vlan_id_int:
+            subnet_query = subnet_query.where(Subnet.vlan_id == vlan_id_int)
+        if assigned_to:
+            subnet_query = subnet_query.where(Subnet.assigned_to.ilike(like_pattern(assigned_to), escape="\\"))
+        if has_gateway_bool is not None:
+            if has_gateway_bool:
+                subnet_query = subnet_query.where(Subnet.gateway_ip.isnot(None))
+            else:
+                subnet_query = subnet_query.where(Subnet.gateway_ip.is_(None))
+        
+        subnets, has_more["subnets"] = await _fetch_page(db, subnet_query, order_by, offset, limit)
+        results["subnets"] = [{"id": s.id, "cidr": s.cidr, "name": s.name, "site": s.site, "environment": s.environment} for s in subnets]
     
-    vlans = await db.execute(vlan_query)
+    if "supernets" in entities:
+        supernet_query = select(Supernet)
+        if network is not None:
+            supernet_query = supernet_query.where(supernet_match)
+            order_by = [Supernet.range_start, Supernet.id]
+        elif q:
+            supernet_query = supernet_query.where(await text_match(db, Supernet, [Supernet.cidr, Supernet.name], q))
+            order_by = [_match_rank([Supernet.cidr, Supernet.name], q), Supernet.range_start, Supernet.id]
+        else:
+            order_by = [Supernet.range_start, Supernet.id]
+        if site:
+            supernet_query = supernet_query.where(Supernet.site == site)
+        if environment:
+            supernet_query = supernet_query.where(Supernet.environment == environment)
+        
+        supernets, has_more["supernets"] = await _fetch_page(db, supernet_query, order_by, offset, limit)
+        results["supernets"] = [{"id": s.id, "cidr": s.cidr, "name": s.name, "site": s.site, "environment": s.environment} for s in supernets]
     
-    device_query = select(Device).options(selectinload(Device.vlan), selectinload(Device.rack))
-    if q:
-        device_query = device_query.where(
-            Device.name.ilike(f"%{q}%") | 
-            Device.hostname.ilike(f"%{q}%") | 
-            Device.role.ilike(f"%{q}%") | 
-            Device.location.ilike(f"%{q}%") | 
-            Device.vendor.ilike(f"%{q}%") |
-            Device.serial_number.ilike(f"%{q}%")
-        )
+    if "vlans" in entities:
+        vlan_query = select(Vlan)
+        if network is not None:
+            vlan_query = vlan_query.where(Vlan.id.in_(select(Subnet.vlan_id).where(subnet_match)))
+            order_by = [Vlan.vlan_id, Vlan.id]
+        elif q:
+            vlan_query = vlan_query.where(await text_match(db, Vlan, [Vlan.name], q))
+            order_by = [_match_rank([Vlan.name], q), Vlan.vlan_id, Vlan.id]
+        else:
+            order_by = [Vlan.vlan_id, Vlan.id]
+        if site:
+            vlan_query = vlan_query.where(Vlan.site == site)
+        if environment:
+            vlan_query = vlan_query.where(Vlan.environment == environment)
+        if purpose_id_int:
+            vlan_query = vlan_query.where(Vlan.purpose_id == purpose_id_int)
+        if category_id_int:
+            vlan_query = vlan_query.join(Purpose, Vlan.purpose_id == Purpose.id).where(Purpose.category_id == category_id_int)
+        
+        vlans, has_more["vlans"] = await _fetch_page(db, vlan_query, order_by, offset, limit)
+        results["vlans"] = [{"id": v.id, "vlan_id": v.vlan_id, "name": v.name, "site": v.site, "environment": v.environment} for v in vlans]
     
-    devices = await db.execute(device_query)
+    if "devices" in entities:
+        device_columns = [Device.name, Device.hostname, Device.role, Device.location, Device.vendor, Device.serial_number]
+        device_query = select(Device)
+        if network is not None:
+            device_query = device_query.where(Device.id.in_(select(IpAssignment.device_id).where(assignment_match)))
+            order_by = [Device.name, Device.id]
+        elif q:
+            device_query = device_query.where(await text_match(db, Device, device_columns, q))
+            order_by = [_match_rank(device_columns, q), Device.name, Device.id]
+        else:
+            order_by = [Device.name, Device.id]
+        # Devices have no site of their own; they are filtered through their VLAN
+        if site or environment:
+            device_query = device_query.join(Vlan, Device.vlan_id == Vlan.id)
+            if site:
+                device_query = device_query.where(Vlan.site == site)
+            if environment:
+                device_query = device_query.where(Vlan.environment == environment)
+        
+        devices, has_more["devices"] = await _fetch_page(db, device_query, order_by, offset, limit)
+        results["devices"] = [{"id": d.id, "name": d.name, "hostname": d.hostname, "location": d.location, "role": d.role, "vendor": d.vendor} for d in devices]
     
-    ip_assignment_query = select(IpAssignment).options(
-        selectinload(IpAssignment.subnet),
-        selectinload(IpAssignment.device)
-    )
-    if q:
-        ip_assignment_query = ip_assignment_query.where(
-            IpAssignment.ip_address.ilike(f"%{q}%") |
-            IpAssignment.role.ilike(f"%{q}%") |
-            IpAssignment.interface.ilike(f"%{q}%")
+    if "ip_assignments" in entities:
+        assignment_columns = [IpAssignment.ip_address, IpAssignment.role, IpAssignment.interface]
+        ip_assignment_query = select(IpAssignment).options(
+            selectinload(IpAssignment.subnet),
+            selectinload(IpAssignment.device)
         )
+        if network is not None:
+            ip_assignment_query = ip_assignment_query.where(assignment_match)
+            order_by = [IpAssignment.ip_value, IpAssignment.id]
+        elif q:
+            ip_assignment_query = ip_assignment_query.where(await text_match(db, IpAssignment, assignment_columns, q))
+            order_by = [_match_rank(assignment_columns, q), IpAssignment.subnet_id, IpAssignment.ip_value]
+        else:
+            order_by = [IpAssignment.subnet_id, IpAssignment.ip_value]
+        # Assignments are filtered by the site and environment of their subnet
+        if site or environment:
+            ip_assignment_query = ip_assignment_query.join(Subnet, IpAssignment.subnet_id == Subnet.id)
+            if site:
+                ip_assignment_query = ip_assignment_query.where(Subnet.site == site)
+            if environment:
+                ip_assignment_query = ip_assignment_query.where(Subnet.environment == environment)
+        
+        ip_assignments, has_more["ip_assignments"] = await _fetch_page(db, ip_assignment_query, order_by, offset, limit)
+        results["ip_assignments"] = [{"id": ip.id, "ip_address": ip.ip_address, "role": ip.role or "", "interface": ip.interface or "", "subnet": ip.subnet.name if ip.subnet else None, "device": ip.device.name if ip.device else None} for ip in ip_assignments]
     
-    ip_assignments = await db.execute(ip_assignment_query)
-    
-    results["subnets"] = [{"id": s.id, "cidr": s.cidr, "name": s.name, "site": s.site, "environment": s.environment} for s in subnets.scalars().all()]
-    results["supernets"] = [{"id": s.id, "cidr": s.cidr, "name": s.name, "site": s.site, "environment": s.environment} for s in supernets.scalars().all()]
-    results["vlans"] = [{"id": v.id, "vlan_id": v.vlan_id, "name": v.name, "site": v.site, "environment": v.environment} for v in vlans.scalars().all()]
-    results["devices"] = [{"id": d.id, "name": d.name, "hostname": d.hostname, "location": d.location, "role": d.role, "vendor": d.vendor} for d in devices.scalars().all()]
-    results["ip_assignments"] = [{"id": ip.id, "ip_address": ip.ip_address, "role": ip.role or "", "interface": ip.interface or "", "subnet": ip.subnet.name if ip.subnet else None, "device": ip.device.name if ip.device else None} for ip in ip_assignments.scalars().all()]
+    results["has_more"] = has_more
+    results["next_cursor"] = {name: str(offset + limit) if has_more[name] else None for name in SEARCH_ENTITIES}
     return results
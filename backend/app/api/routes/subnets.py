@@ -1,19 +1,29 @@
+import ipaddress
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete, func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 from app.api.deps import get_current_user
 from app.db.session import get_db
-from app.db.models import Subnet, Purpose, Vlan, Supernet, IpAssignment
-from app.schemas.subnet import SubnetCreate, SubnetOut, SubnetUpdate
+from app.db.models import Subnet, Supernet, IpAssignment, Device, Purpose, Vlan
+from app.schemas.subnet import SubnetCreate, SubnetOut, SubnetUpdate, SubnetBatchRequest, SubnetBatchResponse, SubnetBatchPlanItem
+from app.schemas.ip_assignment import NextIpRequest, IpAssignmentOut
 from app.schemas.pagination import PaginatedResponse
 from app.schemas.bulk import BulkDeleteRequest, BulkDeleteResponse, BulkExportRequest
-from app.services.ipam import cidr_overlap, is_gateway_valid, calculate_subnet_utilization, get_valid_ip_range, calculate_supernet_utilization, cidr_contains, calculate_subnet_available_ips, calculate_subnet_spatial_segments
-from app.services.audit import record_audit
-from app.services.subnet_allocation import allocate_subnet_cidr, calculate_gateway_ip
+from app.services.ipam import cidr_overlap, is_gateway_valid, calculate_subnet_utilization, get_valid_ip_range, calculate_supernet_utilization, calculate_subnet_available_ips, calculate_subnet_spatial_segments, ip_to_int, summarize_supernet_allocation
+from app.services.audit import record_audit, record_audits
+from app.services.subnet_allocation import allocate_subnet_cidr, calculate_gateway_ip, hosts_to_prefix_length, lock_supernet, overlaps_cidr, plan_subnet_batch, ALLOCATION_ATTEMPTS
+from app.services.ip_allocation import find_free_addresses
+from app.services.prefix_trie import get_prefix_index
+from app.services.reference_cache import purposes_cache, vlans_cache, find_vlan_by_number
+from app.utils.json_response import lean_columns, rows_to_dicts, paginated_response
+from app.core.metrics import ALLOCATIONS, IMPORTS
 
 router = APIRouter()
 
+SUBNET_OUT_COLUMNS = lean_columns(Subnet, SubnetOut)
+
 
 @router.get("", response_model=PaginatedResponse[SubnetOut])
 async def list_subnets(
@@ -27,70 +37,102 @@ async def list_subnets(
     
     offset = (page - 1) * limit
     res = await db.execute(
-        select(Subnet).options(
-            selectinload(Subnet.supernet),
-            selectinload(Subnet.purpose),
-            selectinload(Subnet.vlan),
-            selectinload(Subnet.ip_assignments),
-        ).order_by(Subnet.id.desc()).offset(offset).limit(limit)
+        select(*SUBNET_OUT_COLUMNS).order_by(Subnet.id.desc()).offset(offset).limit(limit)
     )
-    subnets = res.scalars().all()
+    subnets = rows_to_dicts(res.all(), SUBNET_OUT_COLUMNS)
+    
+    assigned_by_subnet = {subnet["id"]: [] for subnet in subnets}
+    if assigned_by_subnet:
+        assignments = await db.execute(
+            select(IpAssignment.subnet_id, IpAssignment.ip_address).where(IpAssignment.subnet_id.in_(assigned_by_subnet))
+        )
+        for subnet_id, ip_address in assignments.all():
+            assigned_by_subnet[subnet_id].append(ip_address)
     
     for subnet in subnets:
-        assigned_ips = [assignment.ip_address for assignment in subnet.ip_assignments]
-        subnet.utilization_percentage = calculate_subnet_utilization(subnet.cidr, assigned_ips)
-        subnet.available_ips = calculate_subnet_available_ips(subnet.cidr, assigned_ips)
-        subnet.first_ip, subnet.last_ip = get_valid_ip_range(subnet.cidr)
-        subnet.spatial_segments = calculate_subnet_spatial_segments(subnet.cidr, assigned_ips)
+        assigned_ips = assigned_by_subnet[subnet["id"]]
+        subnet["utilization_percentage"] = calculate_subnet_utilization(subnet["cidr"], assigned_ips)
+        subnet["available_ips"] = calculate_subnet_available_ips(subnet["cidr"], assigned_ips)
+        subnet["first_ip"], subnet["last_ip"] = get_valid_ip_range(subnet["cidr"])
+        subnet["spatial_segments"] = calculate_subnet_spatial_segments(subnet["cidr"], assigned_ips)
     
-    return PaginatedResponse.create(subnets, total, page, limit)
+    return paginated_response(subnets, total, page, limit)
+
+
+async def _check_subnet_references(db: AsyncSession, purpose_ids, vlan_ids, supernet_ids=()):
+    """Reject missing purposes, VLANs or supernets with a 400 before the insert would fail on them"""
+    for model, ids, label in ((Purpose, purpose_ids, "Purpose"), (Vlan, vlan_ids, "VLAN"), (Supernet, supernet_ids, "Supernet")):
+        wanted = {value for value in ids if value is not None}
+        if not wanted:
+            continue
+        found = await db.execute(select(model.id).where(model.id.in_(wanted)))
+        if wanted - set(found.scalars().all()):
+            await db.rollback()
+            raise HTTPException(status_code=400, detail=f"{label} not found")
 
 
 @router.post("", response_model=SubnetOut)
 async def create_subnet(payload: SubnetCreate, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
-    try:
-        allocated_cidr = await allocate_subnet_cidr(
-            db=db,
-            allocation_mode=payload.allocation_mode,
+    await _check_subnet_references(db, [payload.purpose_id], [payload.vlan_id], [payload.supernet_id])
+    
+    # allocate_subnet_cidr locks the supernet row, so concurrent allocations in
+    # the same supernet run one at a time; a conflict that slips through
+    # (e.g. an overlapping subnet outside any supernet) is retried.
+    for attempt in range(ALLOCATION_ATTEMPTS):
+        try:
+            allocated_cidr = await allocate_subnet_cidr(
+                db=db,
+                allocation_mode=payload.allocation_mode,
+                supernet_id=payload.supernet_id,
+                manual_cidr=payload.cidr,
+                subnet_mask=payload.subnet_mask,
+                host_count=payload.host_count
+            )
+        except ValueError as e:
+            await db.rollback()
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        existing = await db.execute(select(Subnet).where(overlaps_cidr(Subnet, allocated_cidr)))
+        for s in existing.scalars().all():
+            if cidr_overlap(s.cidr, allocated_cidr):
+                await db.rollback()
+                raise HTTPException(status_code=400, detail="Overlapping subnet")
+        
+        gateway_ip = payload.gateway_ip
+        if payload.gateway_mode == "auto_first":
+            gateway_ip = calculate_gateway_ip(allocated_cidr, payload.gateway_mode)
+        elif payload.gateway_mode == "none":
+            gateway_ip = None
+        
+        if gateway_ip and not is_gateway_valid(gateway_ip, allocated_cidr):
+            await db.rollback()
+            raise HTTPException(status_code=400, detail="Invalid gateway for subnet")
+        
+        obj = Subnet(
+            cidr=allocated_cidr,
+            name=payload.name,
+            purpose_id=payload.purpose_id,
+            assigned_to=payload.assigned_to,
+            gateway_ip=gateway_ip,
+            vlan_id=payload.vlan_id,
+            site=payload.site,
+            environment=payload.environment,
             supernet_id=payload.supernet_id,
-            manual_cidr=payload.cidr,
+            allocation_mode=payload.allocation_mode,
+            gateway_mode=payload.gateway_mode,
             subnet_mask=payload.subnet_mask,
-            host_count=payload.host_count
+            host_count=payload.host_count,
         )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        db.add(obj)
+        try:
+            await db.commit()
+            break
+        except IntegrityError:
+            await db.rollback()
+            if payload.allocation_mode == "manual" or attempt == ALLOCATION_ATTEMPTS - 1:
+                raise HTTPException(status_code=409, detail="Subnet allocation conflict, please retry")
     
-    existing = await db.execute(select(Subnet))
-    for s in existing.scalars().all():
-        if cidr_overlap(s.cidr, allocated_cidr):
-            raise HTTPException(status_code=400, detail="Overlapping subnet")
-    
-    gateway_ip = payload.gateway_ip
-    if payload.gateway_mode == "auto_first":
-        gateway_ip = calculate_gateway_ip(allocated_cidr, payload.gateway_mode)
-    elif payload.gateway_mode == "none":
-        gateway_ip = None
-    
-    if gateway_ip and not is_gateway_valid(gateway_ip, allocated_cidr):
-        raise HTTPException(status_code=400, detail="Invalid gateway for subnet")
-    
-    obj = Subnet(
-        cidr=allocated_cidr,
-        name=payload.name,
-        purpose_id=payload.purpose_id,
-        assigned_to=payload.assigned_to,
-        gateway_ip=gateway_ip,
-        vlan_id=payload.vlan_id,
-        site=payload.site,
-        environment=payload.environment,
-        supernet_id=payload.supernet_id,
-        allocation_mode=payload.allocation_mode,
-        gateway_mode=payload.gateway_mode,
-        subnet_mask=payload.subnet_mask,
-        host_count=payload.host_count,
-    )
-    db.add(obj)
-    await db.commit()
+    ALLOCATIONS.labels(kind=f"subnet_{payload.allocation_mode}").inc()
     await db.refresh(obj)
     await record_audit(db, entity_type="subnet", entity_id=obj.id, action="create", before=None, after={"id": obj.id, "cidr": obj.cidr}, user_id=user.id)
     
@@ -105,6 +147,75 @@ async def create_subnet(payload: SubnetCreate, db: AsyncSession = Depends(get_db
     return obj
 
 
+@router.post("/batch", response_model=SubnetBatchResponse)
+async def create_subnet_batch(payload: SubnetBatchRequest, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+    """Plan and allocate many subnets of mixed sizes in one supernet in a single transaction"""
+    supernet = await lock_supernet(db, payload.supernet_id)
+    if not supernet:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Supernet not found")
+    await _check_subnet_references(db, [item.purpose_id for item in payload.subnets], [item.vlan_id for item in payload.subnets])
+    
+    try:
+        version = ipaddress.ip_network(supernet.cidr, strict=False).version
+        prefix_lengths = [
+            item.subnet_mask if item.subnet_mask is not None else hosts_to_prefix_length(item.host_count, version)
+            for item in payload.subnets
+        ]
+        existing = await db.execute(select(Subnet.cidr).where(overlaps_cidr(Subnet, supernet.cidr)))
+        planned_cidrs = plan_subnet_batch(supernet.cidr, existing.scalars().all(), prefix_lengths)
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    gateways = [calculate_gateway_ip(cidr, item.gateway_mode) for cidr, item in zip(planned_cidrs, payload.subnets)]
+    
+    if payload.dry_run:
+        await db.rollback()
+        return SubnetBatchResponse(
+            dry_run=True,
+            subnets=[
+                SubnetBatchPlanItem(name=item.name, cidr=cidr, gateway_ip=gateway)
+                for item, cidr, gateway in zip(payload.subnets, planned_cidrs, gateways)
+            ],
+        )
+    
+    objs = [
+        Subnet(
+            cidr=cidr,
+            name=item.name,
+            purpose_id=item.purpose_id,
+            assigned_to=item.assigned_to,
+            gateway_ip=gateway,
+            vlan_id=item.vlan_id,
+            site=item.site,
+            environment=item.environment,
+            supernet_id=supernet.id,
+            allocation_mode="auto_mask" if item.subnet_mask is not None else "auto_hosts",
+            gateway_mode=item.gateway_mode,
+            subnet_mask=item.subnet_mask,
+            host_count=item.host_count,
+        )
+        for item, cidr, gateway in zip(payload.subnets, planned_cidrs, gateways)
+    ]
+    db.add_all(objs)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Subnet allocation conflict, please retry")
+    ALLOCATIONS.labels(kind="subnet_batch").inc(len(objs))
+    
+    await record_audits(
+        db, entity_type="subnet", action="batch_create", entries=[(obj.id, None, {"id": obj.id, "cidr": obj.cidr}) for obj in objs], user_id=user.id
+    )
+    
+    return SubnetBatchResponse(
+        dry_run=False,
+        subnets=[SubnetBatchPlanItem(id=obj.id, name=obj.name, cidr=obj.cidr, gateway_ip=obj.gateway_ip) for obj in objs],
+    )
+
+
 @router.patch("/{subnet_id}", response_model=SubnetOut)
 async def update_subnet(subnet_id: int, payload: SubnetUpdate, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
     res = await db.execute(select(Subnet).where(Subnet.id == subnet_id))
@@ -209,7 +320,7 @@ async def bulk_delete_subnets(payload: BulkDeleteRequest, db: AsyncSession = Dep
                     supernet = supernet_res.scalar_one_or_none()
                     if supernet:
                         assigned_cidrs = [s.cidr for s in supernet.subnets if s.id != subnet_id]
-                        supernet.utilization_percentage = calculate_supernet_utilization(supernet.cidr, assigned_cidrs)
+                        supernet.utilization_percentage = summarize_supernet_allocation(supernet.cidr, assigned_cidrs)['utilization_percentage']
                         db.add(supernet)
             else:
                 errors.append(f"Subnet with ID {subnet_id} not found")
@@ -243,22 +354,69 @@ async def delete_subnet(subnet_id: int, db: AsyncSession = Depends(get_db), user
     return {"message": "deleted"}
 
 
+@router.post("/{subnet_id}/next-ip", response_model=list[IpAssignmentOut])
+async def reserve_next_ips(subnet_id: int, payload: NextIpRequest, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+    """Reserve the next free IP addresses in a subnet"""
+    # The row lock serializes concurrent reservations against the same subnet
+    # until the assignments below are committed.
+    subnet_res = await db.execute(select(Subnet).where(Subnet.id == subnet_id).with_for_update())
+    subnet = subnet_res.scalar_one_or_none()
+    if not subnet:
+        raise HTTPException(status_code=404, detail="Not found")
+    if payload.device_id is not None and await db.get(Device, payload.device_id) is None:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Device not found")
+    
+    taken_res = await db.execute(
+        select(IpAssignment.ip_value, IpAssignment.ip_address).where(IpAssignment.subnet_id == subnet_id)
+    )
+    taken = [value if value is not None else ip_to_int(address) for value, address in taken_res.all()]
+    if subnet.gateway_ip:
+        taken.append(ip_to_int(subnet.gateway_ip))
+    
+    free_ips = find_free_addresses(subnet.cidr, taken, payload.count)
+    if len(free_ips) < payload.count:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Not enough free IPs in subnet")
+    
+    assignments = [
+        IpAssignment(subnet_id=subnet_id, device_id=payload.device_id, ip_address=ip, role=payload.role, interface=payload.interface)
+        for ip in free_ips
+    ]
+    db.add_all(assignments)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="IP already assigned in subnet, retry the reservation")
+    ALLOCATIONS.labels(kind="next_ip").inc(len(assignments))
+    
+    await record_audits(
+        db, entity_type="ip_assignment", action="create", entries=[(obj.id, None, {"id": obj.id, "ip": obj.ip_address}) for obj in assignments], user_id=user.id
+    )
+    return assignments
+
+
 @router.get("/export/csv")
 async def export_subnets_csv(db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
     from app.utils.csv_export import create_csv_response
     
-    res = await db.execute(select(Subnet).options(selectinload(Subnet.purpose), selectinload(Subnet.vlan)))
+    res = await db.execute(select(Subnet))
     subnets = res.scalars().all()
+    purposes = {purpose.id: purpose for purpose in await purposes_cache.all(db)}
+    vlans = {vlan.id: vlan for vlan in await vlans_cache.all(db)}
     
     data = []
     for subnet in subnets:
+        purpose = purposes.get(subnet.purpose_id)
+        vlan = vlans.get(subnet.vlan_id)
         data.append({
             "name": subnet.name or "",
             "cidr": subnet.cidr,
-            "purpose": subnet.purpose.name if subnet.purpose else "",
+            "purpose": purpose.name if purpose else "",
             "assigned_to": subnet.assigned_to or "",
             "gateway_ip": subnet.gateway_ip or "",
-            "vlan": f"{subnet.vlan.vlan_id} - {subnet.vlan.name}" if subnet.vlan else "",
+            "vlan": vlan.label if vlan else "",
             "site": subnet.site or "",
             "environment": subnet.environment or ""
         })
@@ -272,9 +430,6 @@ async def list_available_subnets(db: AsyncSession = Depends(get_db), user=Depend
     """List subnets that have at least one available IP address for assignment"""
     res = await db.execute(
         select(Subnet).options(
-            selectinload(Subnet.supernet),
-            selectinload(Subnet.purpose),
-            selectinload(Subnet.vlan),
             selectinload(Subnet.ip_assignments),
         ).order_by(Subnet.id.desc())
     )
@@ -312,15 +467,17 @@ async def export_selected_subnets(payload: BulkExportRequest, db: AsyncSession =
     res = await db.execute(
         select(Subnet).options(
             selectinload(Subnet.supernet),
-            selectinload(Subnet.purpose),
-            selectinload(Subnet.vlan),
             selectinload(Subnet.ip_assignments),
         ).where(Subnet.id.in_(payload.ids))
     )
     subnets = res.scalars().all()
+    purposes = {purpose.id: purpose for purpose in await purposes_cache.all(db)}
+    vlans = {vlan.id: vlan for vlan in await vlans_cache.all(db)}
     
     data = []
     for subnet in subnets:
+        purpose = purposes.get(subnet.purpose_id)
+        vlan = vlans.get(subnet.vlan_id)
         assigned_ips = [assignment.ip_address for assignment in subnet.ip_assignments]
         utilization = calculate_subnet_utilization(subnet.cidr, assigned_ips)
         available_ips = calculate_subnet_available_ips(subnet.cidr, assigned_ips)
@@ -328,10 +485,10 @@ async def export_selected_subnets(payload: BulkExportRequest, db: AsyncSession =
         data.append({
             "name": subnet.name or "",
             "cidr": subnet.cidr or "",
-            "purpose": subnet.purpose.name if subnet.purpose else "",
+            "purpose": purpose.name if purpose else "",
             "site": subnet.site or "",
             "environment": subnet.environment or "",
-            "vlan": f"{subnet.vlan.vlan_id} - {subnet.vlan.name}" if subnet.vlan else "",
+            "vlan": vlan.label if vlan else "",
             "supernet": f"{subnet.supernet.name} - {subnet.supernet.cidr}" if subnet.supernet else "",
             "gateway": subnet.gateway or "",
             "utilization": f"{utilization:.1f}%",
@@ -356,6 +513,7 @@ async def import_subnets_csv(file: UploadFile, db: AsyncSession = Depends(get_db
     
     imported_count = 0
     errors = []
+    prefix_index = await get_prefix_index(db)
     
     for row_num, row in enumerate(reader, start=2):
         try:
@@ -366,8 +524,7 @@ async def import_subnets_csv(file: UploadFile, db: AsyncSession = Depends(get_db
             
             purpose_id = None
             if row.get('purpose'):
-                purpose_res = await db.execute(select(Purpose).where(Purpose.name == row['purpose']))
-                purpose = purpose_res.scalar_one_or_none()
+                purpose = await purposes_cache.find_one(db, "name", row['purpose'])
                 if purpose:
                     purpose_id = purpose.id
             
@@ -375,22 +532,19 @@ async def import_subnets_csv(file: UploadFile, db: AsyncSession = Depends(get_db
             if row.get('vlan') and ' - ' in row['vlan']:
                 vlan_id_str = row['vlan'].split(' - ')[0]
                 try:
-                    vlan_res = await db.execute(select(Vlan).where(Vlan.vlan_id == int(vlan_id_str)))
-                    vlan = vlan_res.scalar_one_or_none()
+                    vlan_number = int(vlan_id_str)
+                except ValueError:
+                    vlan_number = None
+                if vlan_number is not None:
+                    vlan = await find_vlan_by_number(db, vlan_number)
                     if vlan:
                         vlan_id = vlan.id
-                except ValueError:
-                    pass
             
             supernet_id = None
             if row['cidr']:
-                supernets_res = await db.execute(select(Supernet))
-                supernets = supernets_res.scalars().all()
-                
-                for supernet in supernets:
-                    if cidr_contains(supernet.cidr, row['cidr']):
-                        supernet_id = supernet.id
-                        break
+                supernet_match = prefix_index.supernets.longest_match(row['cidr'])
+                if supernet_match:
+                    supernet_id = supernet_match["id"]
             
             subnet = Subnet(
                 name=row.get('name') or None,
@@ -424,6 +578,7 @@ async def import_subnets_csv(file: UploadFile, db: AsyncSession = Depends(get_db
         if supernets:
             await db.commit()
     
+    IMPORTS.labels(entity="subnets").inc(imported_count)
     return {
         "imported_count": imported_count,
         "errors": errors
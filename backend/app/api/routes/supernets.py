@@ -7,7 +7,7 @@ from app.db.session import get_db
 from app.db.models import Supernet, Subnet, IpAssignment
 from app.schemas.supernet import SupernetCreate, SupernetOut, SupernetUpdate
 from app.schemas.bulk import BulkDeleteRequest, BulkDeleteResponse, BulkExportRequest
-from app.services.ipam import cidr_overlap, calculate_supernet_utilization, calculate_subnet_utilization, calculate_supernet_available_ips, calculate_spatial_allocation_segments
+from app.services.ipam import cidr_overlap, summarize_supernet_allocation
 import ipaddress
 from app.services.audit import record_audit
 
@@ -20,9 +20,10 @@ async def list_supernets(db: AsyncSession = Depends(get_db), user=Depends(get_cu
     supernets = res.scalars().all()
     
     for supernet in supernets:
-        supernet.utilization_percentage = await calculate_supernet_utilization(supernet.subnets, db)
-        supernet.available_ips = calculate_supernet_available_ips(supernet.cidr, supernet.subnets)
-        supernet.spatial_segments = calculate_spatial_allocation_segments(supernet.cidr, supernet.subnets)
+        summary = summarize_supernet_allocation(supernet.cidr, [subnet.cidr for subnet in supernet.subnets])
+        supernet.utilization_percentage = summary['utilization_percentage']
+        supernet.available_ips = summary['available_ips']
+        supernet.spatial_segments = summary['spatial_segments']
     
     return supernets
 
@@ -116,7 +117,7 @@ async def export_selected_supernets(payload: BulkExportRequest, db: AsyncSession
     data = []
     for supernet in supernets:
         assigned_cidrs = [s.cidr for s in supernet.subnets]
-        utilization = calculate_supernet_utilization(supernet.cidr, assigned_cidrs)
+        utilization = summarize_supernet_allocation(supernet.cidr, assigned_cidrs)['utilization_percentage']
         
         data.append({
             "name": supernet.name or "",
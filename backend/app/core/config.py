@@ -12,6 +12,15 @@ class Settings(BaseSettings):
     CORS_ORIGINS: str = ""
     CORS_ORIGIN_REGEX: str = ""
     LOG_LEVEL: str = "info"
+    QUERY_COUNT_WARN_THRESHOLD: int = 50
+    SLOW_QUERY_MS: float = 200.0
+    SLOW_QUERY_WINDOW_SECONDS: int = 900
+    WEB_CONCURRENCY: int = 0
+    GRACEFUL_SHUTDOWN_SECONDS: int = 30
+    MIGRATION_ATTEMPTS: int = 10
+    METRICS_MULTIPROC_DIR: str = ""
+    METRICS_TOKEN: str = ""
+    TABLE_VERSION_POLL_SECONDS: float = 1.0
     ENV: str = "production"
     
     ADMIN_USERNAME: str = "admin"
@@ -0,0 +1,77 @@
+import hashlib
+from fastapi import Request, Response
+from app.core.config import settings
+from app.core.security import decode_token
+from app.services.table_versions import get_table_version, refresh_table_versions, watch_tables
+
+# GET endpoints under these prefixes are cached by the versions of the tables their responses read
+CACHED_PREFIXES = {
+    "/api/purposes": ("purposes", "categories"),
+    "/api/categories": ("categories",),
+    "/api/racks": ("racks",),
+    "/api/vlans": ("vlans",),
+    "/api/supernets": ("supernets", "subnets"),
+}
+watch_tables(table for tables in CACHED_PREFIXES.values() for table in tables)
+
+
+def _tables_for_path(path: str):
+    for prefix, tables in CACHED_PREFIXES.items():
+        if path == prefix or path.startswith(prefix + "/"):
+            return tables
+    return None
+
+
+def compute_etag(request: Request, tables) -> str:
+    versions = ",".join(f"{table}:{get_table_version(table)}" for table in tables)
+    key = f"{versions}|{request.url.path}?{request.url.query}"
+    # Weak: GZipMiddleware runs inside this one, so the gzip and identity
+    # encodings of a response share the tag while their bytes differ
+    return 'W/"' + hashlib.sha1(key.encode()).hexdigest() + '"'
+
+
+def _has_valid_token(request: Request) -> bool:
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        decode_token(token, settings.JWT_SECRET_KEY)
+    except ValueError:
+        return False
+    return True
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires"""
+    candidates = [_opaque_tag(tag) for tag in if_none_match.split(",")]
+    return "*" in candidates or _opaque_tag(etag) in candidates
+
+
+async def etag_middleware(request: Request, call_next):
+    """Answer conditional GETs on reference endpoints with 304 while their tables are unchanged"""
+    tables = _tables_for_path(request.url.path) if request.method == "GET" else None
+    if tables is None:
+        return await call_next(request)
+
+    # Computed before the handler runs, so a concurrent write can only make the tag older
+    await refresh_table_versions()
+    etag = compute_etag(request, tables)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag) and _has_valid_token(request):
+        return Response(status_code=304, headers={
+            "ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding",
+        })
+
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "private, no-cache"
+        if "accept-encoding" not in response.headers.get("vary", "").lower():
+            response.headers.append("Vary", "Accept-Encoding")
+    return response
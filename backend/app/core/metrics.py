@@ -0,0 +1,260 @@
+import asyncio
+import json
+import os
+import time
+from bisect import bisect_left
+from pathlib import Path
+from fastapi import Request
+from starlette.routing import Match
+from app.core.config import settings
+
+# Latency buckets in seconds, as used by the Prometheus client libraries
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_INF_BUCKET = 'le="+Inf"'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, *extra: str) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(label for label in extra if label)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple, object] = {}
+        REGISTRY.append(self)
+
+    def labels(self, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _default(self):
+        return self.labels()
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+    def samples(self, worker: str = "") -> list[str]:
+        lines = []
+        for key, child in sorted(self._children.items()):
+            lines.extend(child.render(self.name, self.labelnames, key, worker))
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def render(self, name, labelnames, key, worker=""):
+        return [f"{name}{_format_labels(labelnames, key, worker)} {_format_value(self.value)}"]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+    _new_child = _CounterChild
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+    _new_child = _GaugeChild
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labelnames, key, worker=""):
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            cumulative += bucket_count
+            le = f'le="{_format_value(float(bound))}"'
+            lines.append(f"{name}_bucket{_format_labels(labelnames, key, worker, le)} {cumulative}")
+        lines.append(f"{name}_bucket{_format_labels(labelnames, key, worker, _INF_BUCKET)} {self.count}")
+        lines.append(f"{name}_sum{_format_labels(labelnames, key, worker)} {_format_value(self.sum)}")
+        lines.append(f"{name}_count{_format_labels(labelnames, key, worker)} {self.count}")
+        return lines
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+
+REGISTRY: list[_Metric] = []
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+HTTP_REQUESTS_IN_FLIGHT.set(0)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a database connection from the pool",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+IMPORTS = Counter("ipam_imported_rows_total", "Rows imported from CSV files", ("entity",))
+EXPORTS = Counter("ipam_exports_total", "Export files generated", ("format",))
+BACKUPS = Counter("ipam_backups_total", "Backups created and restored", ("operation", "status"))
+ALLOCATIONS = Counter("ipam_allocations_total", "Subnet and address allocations", ("kind",))
+
+
+def _worker_snapshot_path() -> Path:
+    return Path(settings.METRICS_MULTIPROC_DIR) / f"worker-{os.getpid()}.json"
+
+
+def write_worker_snapshot() -> None:
+    """Publish this worker's samples for the other workers' /metrics responses"""
+    if not settings.METRICS_MULTIPROC_DIR:
+        return
+    worker = f'worker="{os.getpid()}"'
+    snapshot = {metric.name: metric.samples(worker) for metric in REGISTRY}
+    path = _worker_snapshot_path()
+    temporary = path.with_suffix(".tmp")
+    temporary.write_text(json.dumps(snapshot))
+    temporary.replace(path)
+
+
+async def publish_worker_snapshots(interval: float = 5.0) -> None:
+    """Keep this worker's snapshot fresh for scrapes served by the other workers"""
+    while True:
+        write_worker_snapshot()
+        await asyncio.sleep(interval)
+
+
+def remove_worker_snapshot() -> None:
+    if settings.METRICS_MULTIPROC_DIR:
+        _worker_snapshot_path().unlink(missing_ok=True)
+
+
+def _read_worker_snapshots() -> list[dict]:
+    snapshots = []
+    for path in sorted(Path(settings.METRICS_MULTIPROC_DIR).glob("worker-*.json")):
+        try:
+            snapshots.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            # The worker exited or is mid-write; its series are picked up on the next scrape
+            continue
+    return snapshots
+
+
+def render_metrics() -> str:
+    """
+    Render the registry in the Prometheus text format. Under several workers
+    every series carries a worker label, this worker's samples are current
+    and the others' are as fresh as their last published snapshot.
+    """
+    if not settings.METRICS_MULTIPROC_DIR:
+        lines = []
+        for metric in REGISTRY:
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    write_worker_snapshot()
+    snapshots = _read_worker_snapshots()
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.header())
+        for snapshot in snapshots:
+            lines.extend(snapshot.get(metric.name, []))
+    return "\n".join(lines) + "\n"
+
+
+def _route_template(request: Request) -> str:
+    # The router stores the matched route in the shared scope. Responses sent by
+    # middleware before routing, such as ETag 304s, are matched here instead;
+    # unmatched paths are grouped so arbitrary URLs cannot create unbounded label values.
+    route = request.scope.get("route")
+    if route is None:
+        for candidate in request.app.router.routes:
+            match, _ = candidate.matches(request.scope)
+            if match == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", None) or "unmatched"
+
+
+async def metrics_middleware(request: Request, call_next):
+    """Record request count, latency and concurrency per route template"""
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+        template = _route_template(request)
+        HTTP_REQUEST_DURATION.labels(method=request.method, route=template).observe(elapsed)
+        HTTP_REQUESTS.labels(method=request.method, route=template, status=status).inc()
@@ -0,0 +1,149 @@
+import asyncio
+import cProfile
+import io
+import pstats
+import sys
+import threading
+from collections import Counter
+from fastapi import Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.core.config import settings
+from app.core.security import decode_token
+from app.db.models import User
+from app.db.session import AsyncSessionLocal
+
+# cProfile and the sampler are process-wide, so only one of each may run at a time
+_sampler_lock = asyncio.Lock()
+_cprofile_lock = threading.Lock()
+
+
+def _frame_key(frame) -> tuple[str, str, int]:
+    code = frame.f_code
+    return code.co_name, code.co_filename, code.co_firstlineno
+
+
+class StackSampler(threading.Thread):
+    """Samples the stacks of every other thread at a fixed interval using sys._current_frames"""
+
+    def __init__(self, interval: float):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.interval = interval
+        self.samples: Counter[tuple] = Counter()
+        self.sample_count = 0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_key(frame))
+                    frame = frame.f_back
+                thread_name = names.get(thread_id, str(thread_id))
+                self.samples[(thread_name, tuple(reversed(stack)))] += 1
+            self.sample_count += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def collapsed(self) -> str:
+        """Collapsed stack format, one "thread;root;...;leaf count" line per stack"""
+        lines = []
+        for (thread_name, stack), count in self.samples.most_common():
+            names = ";".join(f"{name} ({filename}:{line})" for name, filename, line in stack)
+            lines.append(f"{thread_name};{names} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> dict:
+        """Speedscope file format with one sampled profile per thread, weighted in seconds"""
+        frames: list[dict] = []
+        frame_index: dict[tuple, int] = {}
+        profiles: dict[str, dict] = {}
+        for (thread_name, stack), count in self.samples.items():
+            indexes = []
+            for key in stack:
+                if key not in frame_index:
+                    frame_index[key] = len(frames)
+                    name, filename, line = key
+                    frames.append({"name": name, "file": filename, "line": line})
+                indexes.append(frame_index[key])
+            profile = profiles.setdefault(thread_name, {
+                "type": "sampled",
+                "name": thread_name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": 0,
+                "samples": [],
+                "weights": [],
+            })
+            profile["samples"].append(indexes)
+            profile["weights"].append(count * self.interval)
+            profile["endValue"] += count * self.interval
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": list(profiles.values()),
+            "name": "ipam-api",
+            "exporter": "ipam-api",
+        }
+
+
+async def sample_stacks(seconds: float, interval: float) -> StackSampler:
+    """Sample all threads for the given duration while the event loop keeps serving requests"""
+    if _sampler_lock.locked():
+        raise RuntimeError("A profiling session is already running")
+    async with _sampler_lock:
+        sampler = StackSampler(interval)
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            await asyncio.to_thread(sampler.stop)
+        return sampler
+
+
+async def _is_admin_request(request: Request) -> bool:
+    """Authenticate the bearer token up front, before anything is profiled"""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        user_id = int(decode_token(token, settings.JWT_SECRET_KEY).get("sub"))
+    except (ValueError, TypeError):
+        return False
+    async with AsyncSessionLocal() as db:
+        user = await db.get(User, user_id)
+    return user is not None and user.is_admin
+
+
+async def request_profile_middleware(request: Request, call_next):
+    """
+    With ?profile=1 from an admin, run the request under cProfile and return
+    the stats instead of the response. Other coroutines interleaved on the
+    event loop during the call are included. While another profile runs the
+    request is refused with 409, like /profile.
+    """
+    if request.query_params.get("profile") != "1" or not await _is_admin_request(request):
+        return await call_next(request)
+    if not _cprofile_lock.acquire(blocking=False):
+        return JSONResponse({"detail": "A profiling session is already running"}, status_code=409)
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        response = await call_next(request)
+        # Drain the body inside the profile so streamed exports are measured too
+        async for _ in response.body_iterator:
+            pass
+    finally:
+        profiler.disable()
+        _cprofile_lock.release()
+
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(60)
+    return PlainTextResponse(output.getvalue(), headers={"X-Profiled-Status": str(response.status_code)})
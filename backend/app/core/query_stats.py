@@ -0,0 +1,182 @@
+import re
+import time
+from collections import Counter, deque
+from functools import lru_cache
+from contextvars import ContextVar
+from typing import Optional
+import structlog
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = structlog.get_logger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_NUMBERED_PARAM = re.compile(r"\$\d+|%\(\w+\)s|%s|:\w+")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Normalize a SQL statement so executions differing only in parameters compare equal"""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NUMBERED_PARAM.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("IN (?)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+class QueryStats:
+    """SQL statements executed while serving one request"""
+
+    __slots__ = ("count", "duration", "fingerprints", "scope", "user_id")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints: Counter[str] = Counter()
+        self.scope = scope
+        self.user_id: Optional[int] = None
+
+    @property
+    def route(self) -> Optional[str]:
+        if self.scope is None:
+            return None
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.scope.get("path")
+
+    def record(self, statement_fingerprint: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.fingerprints[statement_fingerprint] += 1
+
+
+class FingerprintWindow:
+    """Per-fingerprint statement totals over a rolling window of fixed-size time buckets"""
+
+    def __init__(self, window_seconds: float, bucket_seconds: float = 60.0):
+        self.bucket_seconds = bucket_seconds
+        self.bucket_count = max(1, int(window_seconds // bucket_seconds))
+        self._buckets: deque[tuple[int, dict[str, list]]] = deque()
+
+    def _current_bucket(self, now: float) -> dict[str, list]:
+        index = int(now // self.bucket_seconds)
+        if not self._buckets or self._buckets[-1][0] != index:
+            self._buckets.append((index, {}))
+        while self._buckets[0][0] <= index - self.bucket_count:
+            self._buckets.popleft()
+        return self._buckets[-1][1]
+
+    def record(self, statement_fingerprint: str, duration: float, slow: bool, now: Optional[float] = None) -> None:
+        bucket = self._current_bucket(time.monotonic() if now is None else now)
+        totals = bucket.get(statement_fingerprint)
+        if totals is None:
+            totals = bucket[statement_fingerprint] = [0, 0.0, 0.0, 0]
+        totals[0] += 1
+        totals[1] += duration
+        totals[2] = max(totals[2], duration)
+        totals[3] += slow
+
+    def top(self, limit: int = 20, now: Optional[float] = None) -> list[dict]:
+        """Return the fingerprints with the highest total time in the window"""
+        self._current_bucket(time.monotonic() if now is None else now)
+        merged: dict[str, list] = {}
+        for _, bucket in self._buckets:
+            for statement_fingerprint, (count, total, longest, slow) in bucket.items():
+                totals = merged.setdefault(statement_fingerprint, [0, 0.0, 0.0, 0])
+                totals[0] += count
+                totals[1] += total
+                totals[2] = max(totals[2], longest)
+                totals[3] += slow
+        ranked = sorted(merged.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [
+            {
+                "fingerprint": statement_fingerprint,
+                "calls": count,
+                "total_ms": round(total * 1000, 2),
+                "mean_ms": round(total * 1000 / count, 3),
+                "max_ms": round(longest * 1000, 2),
+                "slow_calls": slow,
+            }
+            for statement_fingerprint, (count, total, longest, slow) in ranked
+        ]
+
+
+query_window = FingerprintWindow(settings.SLOW_QUERY_WINDOW_SECONDS)
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+# The start time lives on the execution context rather than the connection:
+# after_cursor_execute never runs for a statement that raises, and a
+# per-connection stack would keep the stale entry for the pooled connection's lifetime.
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_query_start", None)
+    if start is None:
+        return
+    duration = time.perf_counter() - start
+    statement_fingerprint = fingerprint(statement)
+    slow = duration * 1000 >= settings.SLOW_QUERY_MS
+    query_window.record(statement_fingerprint, duration, slow)
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement_fingerprint, duration)
+    if slow:
+        rowcount = getattr(cursor, "rowcount", -1)
+        logger.warning(
+            "slow_query",
+            duration_ms=round(duration * 1000, 1),
+            rows=rowcount if rowcount is not None and rowcount >= 0 else None,
+            route=stats.route if stats else None,
+            user_id=stats.user_id if stats else None,
+            fingerprint=statement_fingerprint,
+        )
+
+
+async def query_stats_middleware(request: Request, call_next):
+    """Count SQL statements per request, report them in Server-Timing and warn on query storms"""
+    stats = QueryStats(request.scope)
+    token = _current_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        _current_stats.reset(token)
+
+    response.headers["Server-Timing"] = f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'
+    template = stats.route
+    if stats.count > settings.QUERY_COUNT_WARN_THRESHOLD:
+        statement, repeats = stats.fingerprints.most_common(1)[0]
+        logger.warning(
+            "query_count_exceeded",
+            method=request.method,
+            route=template,
+            queries=stats.count,
+            threshold=settings.QUERY_COUNT_WARN_THRESHOLD,
+            db_ms=round(stats.duration * 1000, 1),
+            repeated_statement=statement,
+            repeats=repeats,
+        )
+    elif stats.count:
+        logger.debug(
+            "request_queries",
+            method=request.method,
+            route=template,
+            queries=stats.count,
+            db_ms=round(stats.duration * 1000, 1),
+        )
+    return response
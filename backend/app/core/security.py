@@ -1,28 +1,45 @@
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Optional
 
-from jose import jwt
-from passlib.context import CryptContext
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# passlib and jose are imported on first use, they add ~100ms to every worker start
+@lru_cache(maxsize=None)
+def _pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context().verify(plain_password, hashed_password)
 
 
 def create_token(subject: str, expires_delta: timedelta, secret_key: str) -> str:
     now = datetime.now(timezone.utc)
     expire = now + expires_delta
     to_encode = {"sub": subject, "iat": int(now.timestamp()), "exp": int(expire.timestamp())}
+    from jose import jwt
+
     return jwt.encode(to_encode, secret_key, algorithm="HS256")
 
 
+def decode_token(token: str, secret_key: str) -> dict:
+    """Verify an HS256 token and return its claims, raising ValueError when it is invalid or expired"""
+    from jose import JWTError, jwt
+
+    try:
+        return jwt.decode(token, secret_key, algorithms=["HS256"])
+    except JWTError as e:
+        raise ValueError(str(e)) from e
+
+
 def create_access_token(user_id: int) -> str:
     delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return create_token(str(user_id), delta, settings.JWT_SECRET_KEY)
@@ -1,6 +1,7 @@
 import ipaddress
 from typing import Any
 from pydantic import validator
+from app.services.ipam import is_usable_ip_in_subnet
 
 
 def validate_cidr_format(cidr: str) -> str:
@@ -34,13 +35,7 @@ def validate_ip_in_cidr(ip: str, cidr: str) -> bool:
 def validate_gateway_in_subnet(gateway: str, cidr: str) -> bool:
     """Validate that gateway IP is within subnet and usable"""
     try:
-        network = ipaddress.ip_network(cidr, strict=False)
-        addr = ipaddress.ip_address(gateway)
-        
-        if network.prefixlen == network.max_prefixlen:
-            return addr in network
-        
-        return addr in list(network.hosts())
+        return is_usable_ip_in_subnet(gateway, cidr)
     except (ipaddress.AddressValueError, ValueError):
         return False
 
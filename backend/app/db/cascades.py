@@ -0,0 +1,21 @@
+from functools import lru_cache
+from app.db.session import Base
+
+
+@lru_cache(maxsize=None)
+def cascade_targets(table_name: str) -> frozenset[str]:
+    """Tables the database deletes rows from, directly or transitively, when rows of table_name are deleted"""
+    import app.db.models  # noqa: F401  every table must be registered before the walk
+
+    targets = set()
+    pending = [table_name]
+    while pending:
+        parent = pending.pop()
+        for table in Base.metadata.tables.values():
+            if table.name in targets:
+                continue
+            if any(fk.ondelete == "CASCADE" and fk.column.table.name == parent for fk in table.foreign_keys):
+                targets.add(table.name)
+                pending.append(table.name)
+    targets.discard(table_name)
+    return frozenset(targets)
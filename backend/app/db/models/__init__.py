@@ -8,6 +8,7 @@ from .device import Device
 from .rack import Rack
 from .ip_assignment import IpAssignment
 from .audit_log import AuditLog
+from .table_version import TableVersion
 
 __all__ = [
     "User",
@@ -20,4 +21,5 @@ __all__ = [
     "Rack",
     "IpAssignment",
     "AuditLog",
+    "TableVersion",
 ]
@@ -15,7 +15,7 @@ class AuditLog(Base):
     action: Mapped[str] = mapped_column(String(50))
     before: Mapped[str | None] = mapped_column(Text, nullable=True)
     after: Mapped[str | None] = mapped_column(Text, nullable=True)
-    user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True)
+    user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
     timestamp: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     user: Mapped[Optional["User"]] = relationship("User", back_populates="audit_logs")
@@ -18,7 +18,7 @@ class Device(Base):
     location: Mapped[str | None] = mapped_column(String(100), nullable=True)
     vendor: Mapped[str | None] = mapped_column(String(100), nullable=True)
     serial_number: Mapped[str | None] = mapped_column(String(100), nullable=True)
-    vlan_id: Mapped[int | None] = mapped_column(ForeignKey("vlans.id"), nullable=True)
+    vlan_id: Mapped[int | None] = mapped_column(ForeignKey("vlans.id", ondelete="CASCADE"), nullable=True)
     rack_id: Mapped[int | None] = mapped_column(ForeignKey("racks.id"), nullable=True)
     rack_position: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
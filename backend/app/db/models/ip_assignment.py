@@ -1,19 +1,36 @@
+import ipaddress
 from typing import Optional
-from sqlalchemy import String, Integer, UniqueConstraint, ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, Integer, SmallInteger, UniqueConstraint, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from app.db.session import Base
+from app.db.types import IpKey
+from app.services.ipam import ip_to_int
 
 
 class IpAssignment(Base):
     __tablename__ = "ip_assignments"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    subnet_id: Mapped[int] = mapped_column(ForeignKey("subnets.id"), index=True)
-    device_id: Mapped[int | None] = mapped_column(ForeignKey("devices.id"), nullable=True)
+    subnet_id: Mapped[int] = mapped_column(ForeignKey("subnets.id", ondelete="CASCADE"), index=True)
+    device_id: Mapped[int | None] = mapped_column(ForeignKey("devices.id", ondelete="CASCADE"), nullable=True)
     ip_address: Mapped[str] = mapped_column(String(64))
     role: Mapped[str | None] = mapped_column(String(100), nullable=True)
     interface: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    ip_version: Mapped[int | None] = mapped_column(SmallInteger, nullable=True)
+    ip_value: Mapped[int | None] = mapped_column(IpKey, nullable=True)
 
-    __table_args__ = (UniqueConstraint("subnet_id", "ip_address", name="uq_subnet_ip"),)
+    __table_args__ = (
+        UniqueConstraint("subnet_id", "ip_address", name="uq_subnet_ip"),
+        Index("ix_ip_assignments_subnet_ip_value", "subnet_id", "ip_value"),
+    )
 
     subnet: Mapped["Subnet"] = relationship("Subnet", back_populates="ip_assignments")
     device: Mapped[Optional["Device"]] = relationship("Device", back_populates="ip_assignments")
+
+    @validates("ip_address")
+    def _sync_ip_value(self, key, value):
+        try:
+            self.ip_value = ip_to_int(value)
+            self.ip_version = ipaddress.ip_address(value).version
+        except (ValueError, TypeError):
+            self.ip_value = self.ip_version = None
+        return value
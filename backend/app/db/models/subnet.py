@@ -1,7 +1,9 @@
 from typing import Optional
-from sqlalchemy import String, Integer, ForeignKey, Enum
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, Integer, SmallInteger, ForeignKey, Enum, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from app.db.session import Base
+from app.db.types import IpKey
+from app.services.ipam import cidr_to_range, cidr_version
 import enum
 
 
@@ -20,13 +22,13 @@ class GatewayMode(enum.Enum):
 class Subnet(Base):
     __tablename__ = "subnets"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    supernet_id: Mapped[int | None] = mapped_column(ForeignKey("supernets.id"), nullable=True)
+    supernet_id: Mapped[int | None] = mapped_column(ForeignKey("supernets.id", ondelete="CASCADE"), nullable=True)
     cidr: Mapped[str] = mapped_column(String(64), unique=True, index=True)
     name: Mapped[str | None] = mapped_column(String(100), nullable=True)
-    purpose_id: Mapped[int | None] = mapped_column(ForeignKey("purposes.id"), nullable=True)
+    purpose_id: Mapped[int | None] = mapped_column(ForeignKey("purposes.id", ondelete="CASCADE"), nullable=True)
     assigned_to: Mapped[str | None] = mapped_column(String(100), nullable=True)
     gateway_ip: Mapped[str | None] = mapped_column(String(64), nullable=True)
-    vlan_id: Mapped[int | None] = mapped_column(ForeignKey("vlans.id"), nullable=True)
+    vlan_id: Mapped[int | None] = mapped_column(ForeignKey("vlans.id", ondelete="CASCADE"), nullable=True)
     site: Mapped[str | None] = mapped_column(String(50), nullable=True)
     environment: Mapped[str | None] = mapped_column(String(50), nullable=True)
     
@@ -42,6 +44,11 @@ class Subnet(Base):
     )
     subnet_mask: Mapped[int | None] = mapped_column(Integer, nullable=True)
     host_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    ip_version: Mapped[int | None] = mapped_column(SmallInteger, nullable=True)
+    range_start: Mapped[int | None] = mapped_column(IpKey, nullable=True)
+    range_end: Mapped[int | None] = mapped_column(IpKey, nullable=True)
+
+    __table_args__ = (Index("ix_subnets_range", "ip_version", "range_start", "range_end"),)
 
     supernet: Mapped[Optional["Supernet"]] = relationship("Supernet", back_populates="subnets")
     purpose: Mapped[Optional["Purpose"]] = relationship("Purpose", back_populates="subnets")
@@ -49,3 +56,12 @@ class Subnet(Base):
     ip_assignments: Mapped[list["IpAssignment"]] = relationship(
         "IpAssignment", back_populates="subnet", cascade="all, delete-orphan"
     )
+
+    @validates("cidr")
+    def _sync_range(self, key, value):
+        try:
+            self.range_start, self.range_end = cidr_to_range(value)
+            self.ip_version = cidr_version(value)
+        except (ValueError, TypeError):
+            self.range_start = self.range_end = self.ip_version = None
+        return value
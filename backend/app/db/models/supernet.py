@@ -1,6 +1,8 @@
-from sqlalchemy import String, Integer
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, Integer, SmallInteger, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from app.db.session import Base
+from app.db.types import IpKey
+from app.services.ipam import cidr_to_range, cidr_version
 
 
 class Supernet(Base):
@@ -10,5 +12,19 @@ class Supernet(Base):
     name: Mapped[str | None] = mapped_column(String(100), nullable=True)
     site: Mapped[str | None] = mapped_column(String(50), nullable=True)
     environment: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    ip_version: Mapped[int | None] = mapped_column(SmallInteger, nullable=True)
+    range_start: Mapped[int | None] = mapped_column(IpKey, nullable=True)
+    range_end: Mapped[int | None] = mapped_column(IpKey, nullable=True)
+
+    __table_args__ = (Index("ix_supernets_range", "ip_version", "range_start", "range_end"),)
 
     subnets: Mapped[list["Subnet"]] = relationship("Subnet", back_populates="supernet", cascade="all, delete-orphan")
+
+    @validates("cidr")
+    def _sync_range(self, key, value):
+        try:
+            self.range_start, self.range_end = cidr_to_range(value)
+            self.ip_version = cidr_version(value)
+        except (ValueError, TypeError):
+            self.range_start = self.range_end = self.ip_version = None
+        return value
@@ -0,0 +1,10 @@
+from sqlalchemy import String, BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.session import Base
+
+
+class TableVersion(Base):
+    """Change counter of one table, shared by every worker to invalidate their in-process caches"""
+    __tablename__ = "table_versions"
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, server_default="0")
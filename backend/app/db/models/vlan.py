@@ -11,7 +11,7 @@ class Vlan(Base):
     environment: Mapped[str] = mapped_column(String(50), index=True)
     vlan_id: Mapped[int] = mapped_column(Integer)
     name: Mapped[str] = mapped_column(String(100))
-    purpose_id: Mapped[int | None] = mapped_column(ForeignKey("purposes.id"), nullable=True)
+    purpose_id: Mapped[int | None] = mapped_column(ForeignKey("purposes.id", ondelete="CASCADE"), nullable=True)
 
     __table_args__ = (UniqueConstraint("site", "environment", "vlan_id", name="uq_vlan_site_env_id"),)
 
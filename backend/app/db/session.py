@@ -1,8 +1,14 @@
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, StaticPool
+from app.core.metrics import DB_POOL_CHECKOUT_WAIT
 from app.core.config import settings
+from functools import lru_cache
 from urllib.parse import urlsplit, urlunsplit
 import ssl
+import time
 
 
 def _strip_query(url: str) -> str:
@@ -35,21 +41,57 @@ def _create_ssl_context():
         
     return ssl_ctx
 
-_ssl_ctx = _create_ssl_context()
-connect_args = {"ssl": _ssl_ctx}
+class _CheckoutTimingMixin:
+    """Records how long each pool checkout waits, including connecting when the pool grows"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+
+class TimedQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class TimedNullPool(_CheckoutTimingMixin, NullPool):
+    pass
+
+
+class TimedStaticPool(_CheckoutTimingMixin, StaticPool):
+    pass
+
+
+@lru_cache(maxsize=None)
+def _ssl_context():
+    """Built on the first Postgres connect rather than at import, loading the CA bundle is slow"""
+    return _create_ssl_context()
+
 
 database_url = settings.DATABASE_URL
 if database_url.startswith("sqlite"):
+    # Keep the pool SQLAlchemy would pick: an in-memory database lives on a
+    # single connection, which StaticPool shares across checkouts
+    sqlite_url = make_url(database_url)
+    in_memory = sqlite_url.get_dialect().get_pool_class(sqlite_url) is StaticPool
     engine = create_async_engine(
         database_url,
         pool_pre_ping=True,
+        poolclass=TimedStaticPool if in_memory else TimedNullPool,
     )
 else:
     engine = create_async_engine(
         _strip_query(database_url),
         pool_pre_ping=True,
-        connect_args=connect_args,
+        poolclass=TimedQueuePool,
     )
+
+    @event.listens_for(engine.sync_engine, "do_connect")
+    def _use_ssl(dialect, conn_rec, cargs, cparams):
+        cparams.setdefault("ssl", _ssl_context())
+
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 Base = declarative_base()
 
@@ -0,0 +1,26 @@
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+IP_KEY_BYTES = 16
+
+
+class IpKey(TypeDecorator):
+    """An IPv4 or IPv6 address as a 16 byte big-endian key.
+
+    Byte order matches numeric order on every backend (bytea and BLOB both
+    compare with memcmp), and unlike a NUMERIC column SQLite neither rounds
+    128-bit values to REAL nor refuses to bind them. Keys of different address
+    families share a value space, so filter on ip_version alongside them.
+    """
+    impl = LargeBinary(IP_KEY_BYTES)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return int(value).to_bytes(IP_KEY_BYTES, "big")
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return int.from_bytes(value, "big")
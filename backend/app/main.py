@@ -1,12 +1,23 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
 from app.core.startup import validate_environment
+from app.core.http_cache import etag_middleware
+from app.core.metrics import metrics_middleware, render_metrics, publish_worker_snapshots, remove_worker_snapshot
+from app.core.query_stats import query_stats_middleware
+from app.core.profiling import request_profile_middleware
+from app.core.logging import configure_logging
 from app.db.session import engine
+from app.services.table_versions import bump_all_table_versions
+from app.api.deps import require_metrics_token
 from app.api.routes import auth, purposes, categories, supernets, subnets, vlans
-from app.api.routes import devices, racks, ip_assignments, audits, search, export, backup
+from app.api.routes import devices, racks, ip_assignments, audits, search, export, backup, lookup, diagnostics
 
 validate_environment()
 
@@ -24,16 +35,30 @@ def _parse_origins(origins_str: str) -> list[str]:
     return origins
 
 
-app = FastAPI(title="IPAM")
-
 import logging
-logging.basicConfig(level=logging.INFO)
+configure_logging(settings.LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await bump_all_table_versions()
+    publisher = asyncio.create_task(publish_worker_snapshots()) if settings.METRICS_MULTIPROC_DIR else None
+    yield
+    # Uvicorn runs this after in-flight requests have drained or the graceful timeout expired
+    if publisher is not None:
+        publisher.cancel()
+    remove_worker_snapshot()
+    await engine.dispose()
+    logger.info("Shutdown complete")
+
+
+app = FastAPI(title="IPAM", lifespan=lifespan)
+
 cors_kwargs = {
     "allow_credentials": True,
     "allow_methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],  # Explicit methods
-    "allow_headers": ["Authorization", "Content-Type", "Accept"],   # Explicit headers
+    "allow_headers": ["Authorization", "Content-Type", "Accept", "If-None-Match"],   # Explicit headers
     "allow_origins": [],  # No default - must be explicitly set
 }
 
@@ -55,7 +80,11 @@ if not origin_list and not settings.CORS_ORIGIN_REGEX:
     cors_kwargs["allow_origins"] = ["http://localhost:5173", "http://localhost:5174"]
     logger.info("Using default localhost CORS origins for development")
 
-app.add_middleware(CORSMiddleware, **cors_kwargs)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+app.middleware("http")(etag_middleware)
+app.middleware("http")(metrics_middleware)
+app.middleware("http")(query_stats_middleware)
+app.middleware("http")(request_profile_middleware)
 
 @app.middleware("http")
 async def add_security_headers(request, call_next):
@@ -71,6 +100,9 @@ async def add_security_headers(request, call_next):
     
     return response
 
+# Added last so it is the outermost layer and also decorates responses that
+# inner middleware answer on their own, such as the 304s from etag_middleware
+app.add_middleware(CORSMiddleware, **cors_kwargs)
 logger.info("CORS middleware configured successfully")
 
 
@@ -79,6 +111,11 @@ async def root():
     return {"service": "ipam-api", "docs": "/docs", "health": "/healthz"}
 
 
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/healthz")
 async def healthz():
     try:
@@ -114,8 +151,10 @@ app.include_router(racks.router, prefix="/api/racks", tags=["racks"])
 app.include_router(ip_assignments.router, prefix="/api/ip-assignments", tags=["ip-assignments"])
 app.include_router(audits.router, prefix="/api/audits", tags=["audits"])
 app.include_router(search.router, prefix="/api/search", tags=["search"])
+app.include_router(lookup.router, prefix="/api/lookup", tags=["lookup"])
 app.include_router(export.router, prefix="/api/export", tags=["export"])
 app.include_router(backup.router, prefix="/api/backup", tags=["backup"])
+app.include_router(diagnostics.router, prefix="/api/diagnostics", tags=["diagnostics"])
 
 from app.api.routes import health
 app.include_router(health.router, prefix="/api", tags=["health"])
@@ -36,3 +36,16 @@ class IpAssignmentOut(IpAssignmentBase):
 
     class Config:
         from_attributes = True
+
+
+class NextIpRequest(BaseModel):
+    count: int = 1
+    device_id: int | None = None
+    role: str | None = None
+    interface: str | None = None
+
+    @validator('count')
+    def validate_count(cls, v):
+        if v < 1 or v > 256:
+            raise ValueError("Count must be between 1 and 256")
+        return v
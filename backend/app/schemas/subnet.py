@@ -142,3 +142,56 @@ class SubnetOut(SubnetBase):
 
     class Config:
         from_attributes = True
+
+
+class SubnetBatchItem(BaseModel):
+    name: str | None = None
+    host_count: int | None = None
+    subnet_mask: int | None = None
+    purpose_id: int | None = None
+    assigned_to: str | None = None
+    vlan_id: int | None = None
+    site: str | None = None
+    environment: str | None = None
+    gateway_mode: str = "auto_first"
+
+    @model_validator(mode='after')
+    def validate_size(self):
+        if (self.host_count is None) == (self.subnet_mask is None):
+            raise ValueError("Exactly one of host_count or subnet_mask is required")
+        if self.host_count is not None and self.host_count <= 0:
+            raise ValueError("Host count must be positive")
+        return self
+
+    @validator('gateway_mode')
+    def validate_gateway_mode(cls, v):
+        valid_modes = ["auto_first", "none"]
+        if v not in valid_modes:
+            raise ValueError(f"Invalid gateway mode. Must be one of: {valid_modes}")
+        return v
+
+
+class SubnetBatchRequest(BaseModel):
+    supernet_id: int
+    subnets: list[SubnetBatchItem]
+    dry_run: bool = False
+
+    @validator('subnets')
+    def validate_subnets(cls, v):
+        if not v:
+            raise ValueError("At least one subnet is required")
+        if len(v) > 1024:
+            raise ValueError("At most 1024 subnets can be allocated per batch")
+        return v
+
+
+class SubnetBatchPlanItem(BaseModel):
+    id: int | None = None
+    name: str | None = None
+    cidr: str
+    gateway_ip: str | None = None
+
+
+class SubnetBatchResponse(BaseModel):
+    dry_run: bool
+    subnets: list[SubnetBatchPlanItem]
@@ -0,0 +1,318 @@
+"""
+Generate a synthetic dataset for scale and performance testing.
+
+Rows are written with bulk Core INSERT statements and explicit primary keys,
+so foreign keys can be wired up without reading rows back.
+
+Run from the backend directory:
+    python -m app.seed_dataset --supernets 16 --subnets 2000 --devices 5000 --assignments 1000000
+"""
+import argparse
+import asyncio
+import ipaddress
+import random
+import time
+from dataclasses import dataclass
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import AsyncSessionLocal
+from app.db.models import Purpose, Category, Vlan, Supernet, Subnet, Device, Rack, IpAssignment
+from app.services.ipam import cidr_overlap, get_usable_host_range
+
+SITES = ("dc1", "dc2", "dc3")
+ENVIRONMENTS = ("prod", "staging", "dev")
+VENDORS = ("Cisco", "Arista", "Juniper", "Dell", "HPE", "Supermicro")
+DEVICE_ROLES = ("server", "switch", "firewall", "load-balancer", "storage")
+ASSIGNMENT_ROLES = ("primary", "secondary", "management", "vip")
+
+# Share of generated subnets per prefix length, roughly what a datacenter IPAM holds
+PREFIX_MIX = {22: 2, 23: 3, 24: 45, 25: 10, 26: 15, 27: 10, 28: 6, 29: 5, 30: 2, 31: 1, 32: 1}
+RACK_UNITS = 42
+BATCH_SIZE = 10000
+
+
+@dataclass
+class DatasetSpec:
+    supernets: int = 4
+    subnets: int = 500
+    devices: int = 1000
+    assignments: int = 10000
+    utilization: float = 0.5
+    vlans_per_site: int = 50
+    purposes: int = 10
+    base_network: str = "10.0.0.0/8"
+    supernet_prefix: int = 16
+    seed: int = 42
+
+
+async def _next_id(db: AsyncSession, model) -> int:
+    return (await db.execute(select(func.coalesce(func.max(model.id), 0)))).scalar_one() + 1
+
+
+async def _bulk_insert(db: AsyncSession, model, rows: list[dict]) -> None:
+    for start in range(0, len(rows), BATCH_SIZE):
+        await db.execute(insert(model), rows[start:start + BATCH_SIZE])
+
+
+async def _sync_sequences(db: AsyncSession, models) -> None:
+    """Explicit ids bypass Postgres sequences, so move them past the inserted rows"""
+    if db.bind.dialect.name != "postgresql":
+        return
+    for model in models:
+        table = model.__tablename__
+        await db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+        ))
+
+
+def _plan_supernets(spec: DatasetSpec, existing_cidrs: list[str]) -> list[ipaddress.IPv4Network]:
+    base = ipaddress.ip_network(spec.base_network)
+    if spec.supernet_prefix < base.prefixlen:
+        raise ValueError(f"Supernet prefix /{spec.supernet_prefix} is larger than {base}")
+    available = 2 ** (spec.supernet_prefix - base.prefixlen)
+    if spec.supernets > available:
+        raise ValueError(f"{base} only holds {available} /{spec.supernet_prefix} supernets")
+    planned = []
+    for network in base.subnets(new_prefix=spec.supernet_prefix):
+        if len(planned) == spec.supernets:
+            break
+        if not any(cidr_overlap(str(network), cidr) for cidr in existing_cidrs):
+            planned.append(network)
+    if len(planned) < spec.supernets:
+        raise ValueError(f"Not enough free space in {base} for {spec.supernets} supernets")
+    return planned
+
+
+def _plan_subnets(spec: DatasetSpec, supernets: list, rng: random.Random) -> list[tuple[int, ipaddress.IPv4Network]]:
+    """Carve subnets with a weighted prefix mix, filling supernets in turn with aligned first-fit"""
+    prefixes, weights = zip(*PREFIX_MIX.items())
+    cursors = [int(network.network_address) for network in supernets]
+    planned = []
+    index = 0
+    while len(planned) < spec.subnets:
+        if index == len(supernets):
+            raise ValueError(f"Supernets are full after {len(planned)} of {spec.subnets} subnets")
+        supernet = supernets[index]
+        prefix = rng.choices(prefixes, weights)[0]
+        size = 2 ** (32 - prefix)
+        start = -(-cursors[index] // size) * size
+        if start + size - 1 > int(supernet.broadcast_address):
+            index += 1
+            continue
+        planned.append((index, ipaddress.IPv4Network((start, prefix))))
+        cursors[index] = start + size
+    return planned
+
+
+async def generate_dataset(db: AsyncSession, spec: DatasetSpec) -> dict:
+    """Insert a synthetic dataset described by spec and return the number of rows per table"""
+    if not 0 < spec.utilization <= 1:
+        raise ValueError("Utilization must be greater than 0 and at most 1")
+    rng = random.Random(spec.seed)
+    counts = {}
+
+    existing_cidrs = list((await db.execute(select(Supernet.cidr))).scalars().all())
+    supernet_networks = _plan_supernets(spec, existing_cidrs)
+    subnet_networks = _plan_subnets(spec, supernet_networks, rng)
+
+    # Purposes spread over the categories, reused when an earlier run created them
+    category_ids = list((await db.execute(select(Category.id).order_by(Category.id))).scalars().all())
+    existing_purposes = dict((await db.execute(select(Purpose.name, Purpose.id))).all())
+    purpose_id = await _next_id(db, Purpose)
+    purpose_rows = []
+    purpose_ids = []
+    for number in range(1, spec.purposes + 1):
+        name = f"synthetic-purpose-{number:03d}"
+        if name in existing_purposes:
+            purpose_ids.append(existing_purposes[name])
+            continue
+        purpose_ids.append(purpose_id + len(purpose_rows))
+        purpose_rows.append({
+            "id": purpose_id + len(purpose_rows),
+            "name": name,
+            "description": "Generated for scale testing",
+            "category_id": category_ids[number % len(category_ids)] if category_ids else None,
+        })
+    await _bulk_insert(db, Purpose, purpose_rows)
+    purpose_ids = purpose_ids or [None]
+    counts["purposes"] = len(purpose_rows)
+
+    # VLANs per site and environment, skipping VLAN ids already taken there
+    existing_vlans = set((await db.execute(select(Vlan.site, Vlan.environment, Vlan.vlan_id))).all())
+    vlan_id = await _next_id(db, Vlan)
+    vlan_rows = []
+    vlans_by_location: dict[tuple[str, str], list[int]] = {}
+    for site in SITES:
+        for environment in ENVIRONMENTS:
+            number = 100
+            created = vlans_by_location.setdefault((site, environment), [])
+            while len(created) < spec.vlans_per_site and number < 4095:
+                if (site, environment, number) not in existing_vlans:
+                    row_id = vlan_id + len(vlan_rows)
+                    vlan_rows.append({
+                        "id": row_id,
+                        "site": site,
+                        "environment": environment,
+                        "vlan_id": number,
+                        "name": f"{site}-{environment}-vlan{number}",
+                        "purpose_id": rng.choice(purpose_ids),
+                    })
+                    created.append(row_id)
+                number += 1
+    await _bulk_insert(db, Vlan, vlan_rows)
+    counts["vlans"] = len(vlan_rows)
+
+    supernet_id = await _next_id(db, Supernet)
+    supernet_rows = []
+    for index, network in enumerate(supernet_networks):
+        first, last = int(network.network_address), int(network.broadcast_address)
+        supernet_rows.append({
+            "id": supernet_id + index,
+            "cidr": str(network),
+            "name": f"synthetic-supernet-{index + 1:03d}",
+            "site": SITES[index % len(SITES)],
+            "environment": ENVIRONMENTS[index // len(SITES) % len(ENVIRONMENTS)],
+            "ip_version": 4,
+            "range_start": first,
+            "range_end": last,
+        })
+    await _bulk_insert(db, Supernet, supernet_rows)
+    counts["supernets"] = len(supernet_rows)
+
+    subnet_id = await _next_id(db, Subnet)
+    subnet_rows = []
+    for number, (index, network) in enumerate(subnet_networks):
+        supernet = supernet_rows[index]
+        usable_first, _ = get_usable_host_range(network)
+        vlans = vlans_by_location.get((supernet["site"], supernet["environment"])) or [None]
+        subnet_rows.append({
+            "id": subnet_id + number,
+            "supernet_id": supernet["id"],
+            "cidr": str(network),
+            "name": f"synthetic-subnet-{number + 1:06d}",
+            "purpose_id": rng.choice(purpose_ids),
+            "assigned_to": f"team-{rng.randint(1, 40):02d}",
+            "gateway_ip": str(ipaddress.IPv4Address(usable_first)) if network.prefixlen < 31 else None,
+            "vlan_id": rng.choice(vlans),
+            "site": supernet["site"],
+            "environment": supernet["environment"],
+            "allocation_mode": "manual",
+            "gateway_mode": "auto_first" if network.prefixlen < 31 else "none",
+            "subnet_mask": network.prefixlen,
+            "ip_version": 4,
+            "range_start": int(network.network_address),
+            "range_end": int(network.broadcast_address),
+        })
+    await _bulk_insert(db, Subnet, subnet_rows)
+    counts["subnets"] = len(subnet_rows)
+
+    rack_id = await _next_id(db, Rack)
+    existing_racks = set((await db.execute(select(Rack.aisle, Rack.rack_number))).all())
+    rack_rows = []
+    rack_number = 1
+    while len(rack_rows) * RACK_UNITS < spec.devices:
+        aisle = f"S{(rack_number - 1) // 20 + 1:02d}"
+        label = (aisle, f"{(rack_number - 1) % 20 + 1:02d}")
+        rack_number += 1
+        if label in existing_racks:
+            continue
+        rack_rows.append({
+            "id": rack_id + len(rack_rows),
+            "aisle": label[0],
+            "rack_number": label[1],
+            "position_count": RACK_UNITS,
+            "location": SITES[len(rack_rows) % len(SITES)],
+        })
+    await _bulk_insert(db, Rack, rack_rows)
+    counts["racks"] = len(rack_rows)
+
+    device_id = await _next_id(db, Device)
+    device_rows = []
+    all_vlans = [vid for vids in vlans_by_location.values() for vid in vids] or [None]
+    for number in range(spec.devices):
+        rack = rack_rows[number // RACK_UNITS]
+        vendor = rng.choice(VENDORS)
+        device_rows.append({
+            "id": device_id + number,
+            "name": f"synthetic-dev-{number + 1:06d}",
+            "role": rng.choice(DEVICE_ROLES),
+            "hostname": f"synthetic-dev-{number + 1:06d}.{rack['location']}.example.net",
+            "location": rack["location"],
+            "vendor": vendor,
+            "serial_number": f"{vendor[:3].upper()}{rng.getrandbits(40):012X}",
+            "vlan_id": rng.choice(all_vlans),
+            "rack_id": rack["id"],
+            "rack_position": number % RACK_UNITS + 1,
+        })
+    await _bulk_insert(db, Device, device_rows)
+    counts["devices"] = len(device_rows)
+
+    # Fill each subnet from its first usable host up to the target utilization
+    assignment_id = await _next_id(db, IpAssignment)
+    device_ids = [row["id"] for row in device_rows] or [None]
+    assignments = 0
+    batch = []
+    for row, (_, network) in zip(subnet_rows, subnet_networks):
+        if assignments >= spec.assignments:
+            break
+        usable_first, usable_last = get_usable_host_range(network)
+        if row["gateway_ip"]:
+            usable_first += 1
+        wanted = int((usable_last - usable_first + 1) * spec.utilization)
+        for value in range(usable_first, usable_first + min(wanted, spec.assignments - assignments)):
+            batch.append({
+                "id": assignment_id + assignments,
+                "subnet_id": row["id"],
+                "device_id": device_ids[assignments % len(device_ids)],
+                "ip_address": str(ipaddress.IPv4Address(value)),
+                "role": ASSIGNMENT_ROLES[assignments % len(ASSIGNMENT_ROLES)],
+                "interface": f"eth{assignments % 4}",
+                "ip_version": 4,
+                "ip_value": value,
+            })
+            assignments += 1
+            if len(batch) == BATCH_SIZE:
+                await db.execute(insert(IpAssignment), batch)
+                batch = []
+    if batch:
+        await db.execute(insert(IpAssignment), batch)
+    counts["ip_assignments"] = assignments
+
+    await _sync_sequences(db, (Purpose, Vlan, Supernet, Subnet, Rack, Device, IpAssignment))
+    await db.commit()
+    return counts
+
+
+def _parse_args() -> DatasetSpec:
+    defaults = DatasetSpec()
+    parser = argparse.ArgumentParser(description="Generate a synthetic IPAM dataset for scale testing")
+    parser.add_argument("--supernets", type=int, default=defaults.supernets)
+    parser.add_argument("--subnets", type=int, default=defaults.subnets)
+    parser.add_argument("--devices", type=int, default=defaults.devices)
+    parser.add_argument("--assignments", type=int, default=defaults.assignments)
+    parser.add_argument("--utilization", type=float, default=defaults.utilization,
+                        help="Share of usable addresses to assign in each subnet before moving to the next")
+    parser.add_argument("--vlans-per-site", type=int, default=defaults.vlans_per_site)
+    parser.add_argument("--purposes", type=int, default=defaults.purposes)
+    parser.add_argument("--base-network", default=defaults.base_network)
+    parser.add_argument("--supernet-prefix", type=int, default=defaults.supernet_prefix)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    return DatasetSpec(**vars(parser.parse_args()))
+
+
+async def main() -> None:
+    spec = _parse_args()
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        counts = await generate_dataset(session, spec)
+    elapsed = time.perf_counter() - start
+    summary = ", ".join(f"{count} {table}" for table, count in counts.items())
+    print(f"Synthetic dataset generated in {elapsed:.1f}s ({summary})")
+    if counts["ip_assignments"] < spec.assignments:
+        print(f"Subnets at {spec.utilization:.0%} utilization only hold {counts['ip_assignments']} assignments; "
+              f"add subnets or raise --utilization to reach {spec.assignments}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+Production launcher: run migrations to completion, seed the admin user, then
+serve the app from several uvicorn worker processes and shut down gracefully
+on SIGTERM.
+
+Each worker has its own database pool, so the database must accept
+workers x (pool_size + max_overflow) connections. The in-process caches
+(ETags, reference data, prefix trie, suggestion index) follow the
+table_versions counters in the database, so a write made by one worker
+reaches the others within TABLE_VERSION_POLL_SECONDS.
+
+Run from the backend directory:
+    python -m app.serve
+"""
+import asyncio
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import uvicorn
+from app.core.config import settings
+from app.core.logging import configure_logging
+
+logger = logging.getLogger(__name__)
+
+
+def worker_count() -> int:
+    """WEB_CONCURRENCY when set, otherwise one worker per CPU"""
+    if settings.WEB_CONCURRENCY > 0:
+        return settings.WEB_CONCURRENCY
+    return max(1, os.cpu_count() or 1)
+
+
+def run_migrations() -> None:
+    """Upgrade to head, retrying while the database comes up, and stop the launch if it never does"""
+    for attempt in range(1, settings.MIGRATION_ATTEMPTS + 1):
+        proc = subprocess.run(["alembic", "upgrade", "head"], check=False)
+        if proc.returncode == 0:
+            logger.info(f"Migrations applied on attempt {attempt}")
+            return
+        delay = min(2 ** attempt, 30)
+        logger.warning(f"Migration attempt {attempt}/{settings.MIGRATION_ATTEMPTS} failed, retrying in {delay}s")
+        time.sleep(delay)
+    raise SystemExit(f"Migrations failed after {settings.MIGRATION_ATTEMPTS} attempts, not starting the server")
+
+
+def seed_admin() -> None:
+    from app.seed_admin import ensure_admin
+
+    try:
+        asyncio.run(ensure_admin())
+    except Exception:
+        logger.exception("Admin seeding failed, the admin user may need to be created manually")
+
+
+def main() -> None:
+    configure_logging(settings.LOG_LEVEL)
+    run_migrations()
+    seed_admin()
+
+    workers = worker_count()
+    metrics_dir = None
+    if workers > 1 and not settings.METRICS_MULTIPROC_DIR:
+        # Workers inherit the environment, so they all publish metrics snapshots here
+        metrics_dir = tempfile.mkdtemp(prefix="ipam-metrics-")
+        os.environ["METRICS_MULTIPROC_DIR"] = metrics_dir
+
+    logger.info(f"Starting {workers} worker(s) on port {os.environ.get('PORT', '8001')}")
+    try:
+        uvicorn.run(
+            "app.main:app",
+            host="0.0.0.0",
+            port=int(os.environ.get("PORT", "8001")),
+            workers=workers,
+            proxy_headers=True,
+            forwarded_allow_ips=os.environ.get("FORWARDED_ALLOW_IPS", "*"),
+            timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_SECONDS,
+            log_level=settings.LOG_LEVEL.lower(),
+        )
+    finally:
+        if metrics_dir:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
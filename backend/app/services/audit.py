@@ -3,8 +3,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models import AuditLog
 
 
-async def record_audit(db: AsyncSession, *, entity_type: str, entity_id: int, action: str, before: dict | None, after: dict | None, user_id: int | None):
-    log = AuditLog(
+def _build_audit_log(*, entity_type: str, entity_id: int, action: str, before: dict | None, after: dict | None, user_id: int | None) -> AuditLog:
+    return AuditLog(
         entity_type=entity_type,
         entity_id=entity_id,
         action=action,
@@ -12,5 +12,15 @@ async def record_audit(db: AsyncSession, *, entity_type: str, entity_id: int, ac
         after=json.dumps(after) if after is not None else None,
         user_id=user_id,
     )
-    db.add(log)
+
+
+async def record_audit(db: AsyncSession, *, entity_type: str, entity_id: int, action: str, before: dict | None, after: dict | None, user_id: int | None):
+    db.add(_build_audit_log(entity_type=entity_type, entity_id=entity_id, action=action, before=before, after=after, user_id=user_id))
+    await db.commit()
+
+
+async def record_audits(db: AsyncSession, *, entity_type: str, action: str, entries: list[tuple[int, dict | None, dict | None]], user_id: int | None):
+    """Record one audit entry per (entity_id, before, after) tuple in a single commit"""
+    for entity_id, before, after in entries:
+        db.add(_build_audit_log(entity_type=entity_type, entity_id=entity_id, action=action, before=before, after=after, user_id=user_id))
     await db.commit()
@@ -1,6 +1,7 @@
 import json
 import os
 import uuid
+import structlog
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from pathlib import Path
@@ -12,8 +13,11 @@ from app.db.models import (
     User, Category, Purpose, Rack, Supernet, Vlan, 
     Subnet, Device, IpAssignment
 )
+from app.services.reference_cache import find_rack_by_label
 from app.schemas.backup import BackupFile, BackupMetadata, BackupData, BackupListItem, RestoreResult
 
+logger = structlog.get_logger(__name__)
+
 
 BACKUP_DIR = Path("Backup")
 BACKUP_VERSION = "1.0"
@@ -21,46 +25,38 @@ BACKUP_VERSION = "1.0"
 
 async def create_backup(db: AsyncSession, user_id: int) -> str:
     """Create a complete backup of all system data"""
-    print(f"DEBUG: Starting backup creation for user_id: {user_id}")
     backup_id = str(uuid.uuid4())
     timestamp = datetime.utcnow()
-    print(f"DEBUG: Generated backup_id: {backup_id}")
+    logger.info("backup_started", backup_id=backup_id, user_id=user_id)
     
-    print("DEBUG: Querying users...")
     users_result = await db.execute(select(User))
     users = users_result.scalars().all()
-    print(f"DEBUG: Found {len(users)} users")
+    logger.debug("backup_rows_loaded", table="users", rows=len(users))
     
-    print("DEBUG: Querying categories...")
     categories_result = await db.execute(select(Category))
     categories = categories_result.scalars().all()
-    print(f"DEBUG: Found {len(categories)} categories")
+    logger.debug("backup_rows_loaded", table="categories", rows=len(categories))
     
-    print("DEBUG: Querying purposes...")
     purposes_result = await db.execute(
         select(Purpose).options(selectinload(Purpose.category))
     )
     purposes = purposes_result.scalars().all()
-    print(f"DEBUG: Found {len(purposes)} purposes")
+    logger.debug("backup_rows_loaded", table="purposes", rows=len(purposes))
     
-    print("DEBUG: Querying racks...")
     racks_result = await db.execute(select(Rack))
     racks = racks_result.scalars().all()
-    print(f"DEBUG: Found {len(racks)} racks")
+    logger.debug("backup_rows_loaded", table="racks", rows=len(racks))
     
-    print("DEBUG: Querying supernets...")
     supernets_result = await db.execute(select(Supernet))
     supernets = supernets_result.scalars().all()
-    print(f"DEBUG: Found {len(supernets)} supernets")
+    logger.debug("backup_rows_loaded", table="supernets", rows=len(supernets))
     
-    print("DEBUG: Querying vlans...")
     vlans_result = await db.execute(
         select(Vlan).options(selectinload(Vlan.purpose))
     )
     vlans = vlans_result.scalars().all()
-    print(f"DEBUG: Found {len(vlans)} vlans")
+    logger.debug("backup_rows_loaded", table="vlans", rows=len(vlans))
     
-    print("DEBUG: Querying subnets...")
     subnets_result = await db.execute(
         select(Subnet).options(
             selectinload(Subnet.purpose),
@@ -69,9 +65,8 @@ async def create_backup(db: AsyncSession, user_id: int) -> str:
         )
     )
     subnets = subnets_result.scalars().all()
-    print(f"DEBUG: Found {len(subnets)} subnets")
+    logger.debug("backup_rows_loaded", table="subnets", rows=len(subnets))
     
-    print("DEBUG: Querying devices...")
     devices_result = await db.execute(
         select(Device).options(
             selectinload(Device.vlan),
@@ -79,9 +74,8 @@ async def create_backup(db: AsyncSession, user_id: int) -> str:
         )
     )
     devices = devices_result.scalars().all()
-    print(f"DEBUG: Found {len(devices)} devices")
+    logger.debug("backup_rows_loaded", table="devices", rows=len(devices))
     
-    print("DEBUG: Querying ip_assignments...")
     ip_assignments_result = await db.execute(
         select(IpAssignment).options(
             selectinload(IpAssignment.subnet),
@@ -89,68 +83,58 @@ async def create_backup(db: AsyncSession, user_id: int) -> str:
         )
     )
     ip_assignments = ip_assignments_result.scalars().all()
-    print(f"DEBUG: Found {len(ip_assignments)} ip_assignments")
+    logger.debug("backup_rows_loaded", table="ip_assignments", rows=len(ip_assignments))
     
-    print("DEBUG: Starting data serialization...")
     try:
         users_data = [_serialize_user(user) for user in users]
-        print("DEBUG: Users serialized")
-    except Exception as e:
-        print(f"DEBUG: Error serializing users: {e}")
+    except Exception:
+        logger.exception("backup_serialization_failed", table="users")
         raise
     
     try:
         categories_data = [_serialize_category(category) for category in categories]
-        print("DEBUG: Categories serialized")
-    except Exception as e:
-        print(f"DEBUG: Error serializing categories: {e}")
+    except Exception:
+        logger.exception("backup_serialization_failed", table="categories")
         raise
     
     try:
         purposes_data = [_serialize_purpose(purpose) for purpose in purposes]
-        print("DEBUG: Purposes serialized")
-    except Exception as e:
-        print(f"DEBUG: Error serializing purposes: {e}")
+    except Exception:
+        logger.exception("backup_serialization_failed", table="purposes")
         raise
     try:
         racks_data = [_serialize_rack(rack) for rack in racks]
-        print("DEBUG: Racks serialized")
-    except Exception as e:
-        print(f"DEBUG: Error serializing racks: {e}")
+    except Exception:
+        logger.exception("backup_serialization_failed", table="racks")
         raise
     
     try:
         supernets_data = [_serialize_supernet(supernet) for supernet in supernets]
-        print("DEBUG: Supernets serialized")
-    except Exception as e:
-        print(f"DEBUG: Error serializing supernets: {e}")
+    except Exception:
+        logger.exception("backup_serialization_failed", table="supernets")
         raise
     
     try:
         vlans_data = [_serialize_vlan(vlan) for vlan in vlans]
-        print("DEBUG: VLANs serialized")
-    except Exception as e:
-        print(f"DEBUG: Error serializing vlans: {e}")
+    except Exception:
+        logger.exception("backup_serialization_failed", table="vlans")
         raise
     try:
         subnets_data = [_serialize_subnet(subnet) for subnet in subnets]
-        print("DEBUG: Subnets serialized")
-    except Exception as e:
-        print(f"DEBUG: Error serializing subnets: {e}")
+    except Exception:
+        logger.exception("backup_serialization_failed", table="subnets")
         raise
     
     try:
         devices_data = [_serialize_device(device) for device in devices]
-        print("DEBUG: Devices serialized")
-    except Exception as e:
-        print(f"DEBUG: Error serializing devices: {e}")
+    except Exception:
+        logger.exception("backup_serialization_failed", table="devices")
         raise
     
     try:
         ip_assignments_data = [_serialize_ip_assignment(ip) for ip in ip_assignments]
-        print("DEBUG: IP assignments serialized")
-    except Exception as e:
-        print(f"DEBUG: Error serializing ip_assignments: {e}")
+    except Exception:
+        logger.exception("backup_serialization_failed", table="ip_assignments")
         raise
     
     total_records = (
@@ -182,17 +166,13 @@ async def create_backup(db: AsyncSession, user_id: int) -> str:
     
     filename = f"ipam_backup_{timestamp.strftime('%Y-%m-%d_%H-%M-%S')}.json"
     filepath = BACKUP_DIR / filename
-    print(f"DEBUG: Creating backup file: {filepath}")
     
     BACKUP_DIR.mkdir(exist_ok=True)
-    print("DEBUG: Backup directory created/verified")
     
-    print("DEBUG: Writing backup file...")
     with open(filepath, 'w') as f:
         json.dump(backup_data.dict(), f, indent=2, default=str)
-    print("DEBUG: Backup file written successfully")
     
-    print(f"DEBUG: Backup creation completed, returning backup_id: {backup_id}")
+    logger.info("backup_written", backup_id=backup_id, path=str(filepath))
     return backup_id
 
 
@@ -375,10 +355,7 @@ async def restore_backup(db: AsyncSession, backup_data: Dict[str, Any]) -> Resto
                     device_dict['vlan_id'] = vlan.id
             
             if device_data.get('rack_name'):
-                rack_result = await db.execute(
-                    select(Rack).where(Rack.name == device_data['rack_name'])
-                )
-                rack = rack_result.scalar_one_or_none()
+                rack = await find_rack_by_label(db, device_data['rack_name'])
                 if rack:
                     device_dict['rack_id'] = rack.id
             
@@ -487,9 +464,14 @@ def _serialize_purpose(purpose: Purpose) -> Dict[str, Any]:
 def _serialize_rack(rack: Rack) -> Dict[str, Any]:
     return {
         'id': rack.id,
-        'name': rack.name,
+        'aisle': rack.aisle,
+        'rack_number': rack.rack_number,
+        'position_count': rack.position_count,
+        'power_type': rack.power_type,
+        'power_capacity': rack.power_capacity,
+        'cooling_type': rack.cooling_type,
         'location': rack.location,
-        'height': rack.height
+        'notes': rack.notes
     }
 
 
@@ -549,7 +531,7 @@ def _serialize_device(device: Device) -> Dict[str, Any]:
         'vlan_id': device.vlan_id,
         'vlan_name': device.vlan.name if device.vlan else None,
         'rack_id': device.rack_id,
-        'rack_name': device.rack.name if device.rack else None,
+        'rack_name': f"{device.rack.aisle}-{device.rack.rack_number}" if device.rack else None,
         'rack_position': device.rack_position
     }
 
@@ -594,9 +576,14 @@ def _deserialize_purpose(data: Dict[str, Any]) -> Dict[str, Any]:
 
 def _deserialize_rack(data: Dict[str, Any]) -> Dict[str, Any]:
     return {
-        'name': data['name'],
+        'aisle': data['aisle'],
+        'rack_number': data['rack_number'],
+        'position_count': data.get('position_count') or 42,
+        'power_type': data.get('power_type'),
+        'power_capacity': data.get('power_capacity'),
+        'cooling_type': data.get('cooling_type'),
         'location': data.get('location'),
-        'height': data.get('height')
+        'notes': data.get('notes')
     }
 
 
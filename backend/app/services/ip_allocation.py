@@ -0,0 +1,59 @@
+import ipaddress
+from typing import Iterable, Iterator
+from app.services.ipam import get_usable_host_range
+
+_WORD_BYTES = 8
+_FULL_WORD = (1 << (_WORD_BYTES * 8)) - 1
+
+
+class OccupancyBitmap:
+    """Compact bitmap of occupied host slots, scanned a 64-bit word at a time"""
+
+    def __init__(self, size: int):
+        self.size = size
+        padded = (size + _WORD_BYTES * 8 - 1) // (_WORD_BYTES * 8) * _WORD_BYTES
+        self._bits = bytearray(padded)
+        for index in range(size, padded * 8):
+            self._bits[index >> 3] |= 1 << (index & 7)
+
+    def set(self, index: int) -> None:
+        if 0 <= index < self.size:
+            self._bits[index >> 3] |= 1 << (index & 7)
+
+    def is_set(self, index: int) -> bool:
+        return bool(self._bits[index >> 3] & (1 << (index & 7)))
+
+    def iter_free(self) -> Iterator[int]:
+        view = memoryview(self._bits)
+        for offset in range(0, len(self._bits), _WORD_BYTES):
+            word = int.from_bytes(view[offset:offset + _WORD_BYTES], "little")
+            if word == _FULL_WORD:
+                continue
+            free = ~word & _FULL_WORD
+            base = offset * 8
+            while free:
+                lowest = free & -free
+                yield base + lowest.bit_length() - 1
+                free ^= lowest
+
+
+def find_free_addresses(cidr: str, taken: Iterable[int], count: int = 1) -> list[str]:
+    """Return the lowest `count` usable addresses in a subnet that are not taken"""
+    network = ipaddress.ip_network(cidr, strict=False)
+    first, last = get_usable_host_range(network)
+    taken = [value for value in taken if first <= value <= last]
+
+    # Only the first len(taken) + count slots can hold the answer, so the
+    # bitmap stays small even for very large (IPv6) subnets.
+    size = min(last - first + 1, len(taken) + count)
+    bitmap = OccupancyBitmap(size)
+    for value in taken:
+        bitmap.set(value - first)
+
+    address_type = type(network.network_address)
+    free = []
+    for index in bitmap.iter_free():
+        free.append(str(address_type(first + index)))
+        if len(free) == count:
+            break
+    return free
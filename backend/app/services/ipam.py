@@ -19,37 +19,53 @@ def cidr_contains(supernet_cidr: str, subnet_cidr: str) -> bool:
         return False
 
 
+def ip_to_int(ip: str) -> int:
+    """Convert an IP address to its numeric value"""
+    return int(ipaddress.ip_address(ip))
+
+
+def cidr_to_range(cidr: str) -> tuple[int, int]:
+    """Get the numeric first and last address of a CIDR block"""
+    network = ipaddress.ip_network(cidr, strict=False)
+    return int(network.network_address), int(network.broadcast_address)
+
+
+def cidr_version(cidr: str) -> int:
+    return ipaddress.ip_network(cidr, strict=False).version
+
+
 def ip_in_cidr(ip: str, cidr: str) -> bool:
     return ipaddress.ip_address(ip) in ipaddress.ip_network(cidr, strict=False)
 
 
+def get_usable_host_range(network: ipaddress._BaseNetwork) -> tuple[int, int]:
+    """Get the numeric first and last usable host address of a network"""
+    first = int(network.network_address)
+    last = int(network.broadcast_address)
+    if network.prefixlen >= network.max_prefixlen - 1:
+        return first, last
+    if network.version == 4:
+        return first + 1, last - 1
+    return first + 1, last
+
+
 def is_usable_ip_in_subnet(ip: str, cidr: str) -> bool:
     net = ipaddress.ip_network(cidr, strict=False)
     addr = ipaddress.ip_address(ip)
-    if net.prefixlen == net.max_prefixlen:
-        return addr in net
-    return addr in list(net.hosts())
+    if addr.version != net.version:
+        return False
+    first, last = get_usable_host_range(net)
+    return first <= int(addr) <= last
 
 
 def is_gateway_valid(gateway: str, cidr: str) -> bool:
-    net = ipaddress.ip_network(cidr, strict=False)
-    addr = ipaddress.ip_address(gateway)
-    return addr in net and (net.prefixlen == net.max_prefixlen or addr in list(net.hosts()))
+    return is_usable_ip_in_subnet(gateway, cidr)
 
 
 def get_usable_address_count(network: ipaddress._BaseNetwork) -> int:
-    """Get count of usable IP addresses in a network, optimized for performance"""
-    if network.prefixlen == network.max_prefixlen:
-        return 1
-    elif network.version == 4 and network.prefixlen == 31:
-        return 2
-    elif network.version == 6 and network.prefixlen == 127:
-        return 2
-    
-    if network.version == 4:
-        return network.num_addresses - 2
-    else:
-        return network.num_addresses
+    """Get count of usable IP addresses in a network without enumerating hosts"""
+    first, last = get_usable_host_range(network)
+    return last - first + 1
 
 
 def calculate_subnet_utilization(cidr: str, assigned_ips: list[str]) -> float:
@@ -63,11 +79,61 @@ def calculate_subnet_utilization(cidr: str, assigned_ips: list[str]) -> float:
     return (len(assigned_ips) / total_usable) * 100
 
 
-async def calculate_supernet_utilization(subnets: Sequence, db: AsyncSession) -> float:
+def summarize_supernet_allocation(supernet_cidr: str, subnet_cidrs: Sequence[str]) -> dict:
     """
-    Calculate supernet utilization percentage based on allocated subnet space.
-    Uses bulk queries for performance optimization.
+    Calculate utilization, available addresses and spatial segments for a
+    supernet in one pass. Child CIDRs are parsed once into integer ranges,
+    clipped to the supernet and merged, so overlapping or out-of-range
+    children are never double counted. Utilization is the share of the
+    supernet's address space covered by its subnets.
     """
+    supernet_network = ipaddress.ip_network(supernet_cidr, strict=False)
+    supernet_start = int(supernet_network.network_address)
+    supernet_end = int(supernet_network.broadcast_address)
+    total_addresses = supernet_network.num_addresses
+    
+    ranges = []
+    for cidr in subnet_cidrs:
+        try:
+            subnet_network = ipaddress.ip_network(cidr, strict=False)
+        except (ValueError, TypeError):
+            continue
+        if subnet_network.version != supernet_network.version:
+            continue
+        start = max(int(subnet_network.network_address), supernet_start)
+        end = min(int(subnet_network.broadcast_address), supernet_end)
+        if start <= end:
+            ranges.append((start - supernet_start, end - supernet_start + 1))
+    ranges.sort()
+    
+    merged = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    
+    allocated_addresses = sum(end - start for start, end in merged)
+    
+    segments = []
+    current = 0
+    for start, end in merged:
+        if current < start:
+            segments.append({'start': current / total_addresses * 100, 'end': start / total_addresses * 100, 'type': 'available'})
+        segments.append({'start': start / total_addresses * 100, 'end': end / total_addresses * 100, 'type': 'allocated'})
+        current = end
+    if current < total_addresses:
+        segments.append({'start': current / total_addresses * 100, 'end': 100, 'type': 'available'})
+    
+    return {
+        'utilization_percentage': (allocated_addresses / total_addresses) * 100,
+        'available_ips': max(0, get_usable_address_count(supernet_network) - allocated_addresses),
+        'spatial_segments': segments,
+    }
+
+
+async def calculate_supernet_utilization(subnets: Sequence, db: AsyncSession) -> float:
+    """Calculate supernet utilization percentage based on allocated subnet space"""
     if not subnets:
         return 0.0
     
@@ -80,20 +146,8 @@ async def calculate_supernet_utilization(subnets: Sequence, db: AsyncSession) ->
     if not supernet_cidr:
         return 0.0
     
-    supernet_network = ipaddress.ip_network(supernet_cidr, strict=False)
-    total_supernet_ips = get_usable_address_count(supernet_network)
-    
-    if total_supernet_ips == 0:
-        return 0.0
-    
-    total_allocated_ips = 0
-    
-    for subnet in subnets:
-        subnet_network = ipaddress.ip_network(subnet.cidr, strict=False)
-        subnet_ips = get_usable_address_count(subnet_network)
-        total_allocated_ips += subnet_ips
-    
-    return (total_allocated_ips / total_supernet_ips) * 100
+    summary = summarize_supernet_allocation(supernet_cidr, [subnet.cidr for subnet in subnets])
+    return summary['utilization_percentage']
 
 
 def calculate_subnet_available_ips(cidr: str, assigned_ips: list[str]) -> int:
@@ -105,112 +159,108 @@ def calculate_subnet_available_ips(cidr: str, assigned_ips: list[str]) -> int:
 
 def calculate_supernet_available_ips(supernet_cidr: str, subnets: Sequence) -> int:
     """Calculate available IP addresses for a supernet"""
-    supernet_network = ipaddress.ip_network(supernet_cidr, strict=False)
-    total_supernet_ips = get_usable_address_count(supernet_network)
-    
-    total_allocated_ips = 0
-    for subnet in subnets:
-        subnet_network = ipaddress.ip_network(subnet.cidr, strict=False)
-        subnet_ips = get_usable_address_count(subnet_network)
-        total_allocated_ips += subnet_ips
-    
-    return max(0, total_supernet_ips - total_allocated_ips)
+    summary = summarize_supernet_allocation(supernet_cidr, [subnet.cidr for subnet in subnets])
+    return summary['available_ips']
 
 
 def get_valid_ip_range(cidr: str) -> tuple[str, str]:
     """Get first and last valid IP addresses in subnet (excluding network/broadcast)"""
     network = ipaddress.ip_network(cidr, strict=False)
-    if network.prefixlen == network.max_prefixlen:
-        return str(network.network_address), str(network.network_address)
-    elif network.prefixlen == 31:
-        return str(network.network_address), str(network.broadcast_address)
-    else:
-        hosts = list(network.hosts())
-        return str(hosts[0]), str(hosts[-1])
+    first, last = get_usable_host_range(network)
+    address_type = type(network.network_address)
+    return str(address_type(first)), str(address_type(last))
 
 
 def calculate_spatial_allocation_segments(supernet_cidr: str, subnets: Sequence) -> list[dict]:
     """Calculate spatial allocation segments for supernet visualization"""
-    supernet_network = ipaddress.ip_network(supernet_cidr, strict=False)
-    total_addresses = supernet_network.num_addresses
+    summary = summarize_supernet_allocation(supernet_cidr, [subnet.cidr for subnet in subnets])
+    return summary['spatial_segments']
+
+
+def _coalesce_address_runs(values: list[int]) -> list[tuple[int, int]]:
+    """Coalesce sorted, distinct integers into inclusive (start, end) runs"""
+    runs = []
+    for value in values:
+        if runs and value == runs[-1][1] + 1:
+            runs[-1][1] = value
+        else:
+            runs.append([value, value])
+    return [(start, end) for start, end in runs]
+
+
+def calculate_subnet_spatial_segments(subnet_cidr: str, assigned_ips: list[str], max_segments: int = 64) -> list[dict]:
+    """
+    Calculate spatial allocation segments for subnet IP visualization.
+    Assigned addresses are sorted as integers and coalesced into runs, so the
+    segments show where in the subnet addresses are used. When the runs would
+    produce more than max_segments segments, the subnet is split into
+    max_segments equal buckets and each bucket with any address in use is
+    marked allocated, labelled with the share of it that is in use.
+    """
+    network = ipaddress.ip_network(subnet_cidr, strict=False)
+    first, last = get_usable_host_range(network)
+    total_hosts = last - first + 1
     
-    if total_addresses == 0:
-        return [{'start': 0, 'end': 100, 'type': 'available'}]
+    values = set()
+    for ip in assigned_ips:
+        try:
+            value = int(ipaddress.ip_address(ip))
+        except ValueError:
+            continue
+        if first <= value <= last:
+            values.add(value - first)
+    runs = _coalesce_address_runs(sorted(values))
     
     segments = []
-    allocated_ranges = []
+    current = 0
+    for start, end in runs:
+        if start > current:
+            segments.append({'start': current, 'end': start, 'type': 'available'})
+        segments.append({'start': start, 'end': end + 1, 'type': 'allocated'})
+        current = end + 1
+    if current < total_hosts:
+        segments.append({'start': current, 'end': total_hosts, 'type': 'available'})
     
-    for subnet in subnets:
-        subnet_network = ipaddress.ip_network(subnet.cidr, strict=False)
-        start_offset = int(subnet_network.network_address) - int(supernet_network.network_address)
-        end_offset = start_offset + subnet_network.num_addresses
-        
-        start_percent = (start_offset / total_addresses) * 100
-        end_percent = (end_offset / total_addresses) * 100
-        
-        allocated_ranges.append((start_percent, end_percent))
-    
-    allocated_ranges.sort()
-    merged_ranges = []
-    for start, end in allocated_ranges:
-        if merged_ranges and start <= merged_ranges[-1][1]:
-            merged_ranges[-1] = (merged_ranges[-1][0], max(merged_ranges[-1][1], end))
-        else:
-            merged_ranges.append((start, end))
-    
-    current_pos = 0
-    for start, end in merged_ranges:
-        if current_pos < start:
-            segments.append({
-                'start': current_pos,
-                'end': start,
-                'type': 'available'
-            })
-        segments.append({
-            'start': start,
-            'end': end,
-            'type': 'allocated'
-        })
-        current_pos = end
-    
-    if current_pos < 100:
-        segments.append({
-            'start': current_pos,
-            'end': 100,
-            'type': 'available'
-        })
+    if len(segments) > max_segments:
+        segments = _bucket_spatial_segments(runs, total_hosts, max_segments)
     
+    for segment in segments:
+        segment['start'] = (segment['start'] / total_hosts) * 100
+        segment['end'] = (segment['end'] / total_hosts) * 100
     return segments
 
 
-def calculate_subnet_spatial_segments(subnet_cidr: str, assigned_ips: list[str]) -> list[dict]:
-    """Calculate spatial allocation segments for subnet IP visualization"""
-    network = ipaddress.ip_network(subnet_cidr, strict=False)
-    
-    if network.prefixlen == network.max_prefixlen:
-        return [{'start': 0, 'end': 100, 'type': 'allocated' if assigned_ips else 'available'}]
-    
-    hosts = list(network.hosts()) if network.prefixlen < network.max_prefixlen else [network.network_address]
-    total_hosts = len(hosts)
+def _bucket_spatial_segments(runs: list[tuple[int, int]], total_hosts: int, bucket_count: int) -> list[dict]:
+    """Summarize address runs into at most bucket_count segments (offsets, not percentages)"""
+    bounds = [i * total_hosts // bucket_count for i in range(bucket_count + 1)]
+    used = [0] * bucket_count
     
-    if total_hosts == 0:
-        return [{'start': 0, 'end': 100, 'type': 'available'}]
+    bucket = 0
+    for start, end in runs:
+        while bounds[bucket + 1] <= start:
+            bucket += 1
+        position = start
+        index = bucket
+        while position <= end:
+            bucket_end = bounds[index + 1] - 1
+            chunk_end = min(end, bucket_end)
+            used[index] += chunk_end - position + 1
+            position = chunk_end + 1
+            index += 1
     
-    utilization_percent = (len(assigned_ips) / total_hosts) * 100
     segments = []
+    for index in range(bucket_count):
+        size = bounds[index + 1] - bounds[index]
+        if size == 0:
+            continue
+        segment_type = 'allocated' if used[index] > 0 else 'available'
+        if segments and segments[-1]['type'] == segment_type:
+            segments[-1]['end'] = bounds[index + 1]
+            segments[-1]['used'] += used[index]
+        else:
+            segments.append({'start': bounds[index], 'end': bounds[index + 1], 'type': segment_type, 'used': used[index]})
     
-    if utilization_percent > 0:
-        segments.append({
-            'start': 0,
-            'end': utilization_percent,
-            'type': 'allocated'
-        })
-    
-    if utilization_percent < 100:
-        segments.append({
-            'start': utilization_percent,
-            'end': 100,
-            'type': 'available'
-        })
-    
+    for segment in segments:
+        size = segment['end'] - segment['start']
+        segment['label'] = f"{segment['type']} ({segment.pop('used') / size * 100:.1f}% in use)"
     return segments
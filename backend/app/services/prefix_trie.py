@@ -0,0 +1,123 @@
+import asyncio
+import ipaddress
+from typing import Any, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import Subnet, Supernet
+from app.services.table_versions import get_table_version, refresh_table_versions, session_wrote_table, watch_tables
+
+# Table versions also move when a cascading delete (e.g. of a purpose or
+# VLAN) removes subnets, so the index only has to watch its own tables
+_INDEXED_TABLES = (Supernet.__tablename__, Subnet.__tablename__)
+watch_tables(_INDEXED_TABLES)
+
+
+class _Node:
+    __slots__ = ("children", "value", "has_value")
+
+    def __init__(self):
+        self.children: list[Optional["_Node"]] = [None, None]
+        self.value: Any = None
+        self.has_value = False
+
+
+class PrefixTrie:
+    """Binary radix trie keyed by IP prefix, one root per IP version"""
+
+    def __init__(self):
+        self._roots = {4: _Node(), 6: _Node()}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, cidr: str, value: Any) -> None:
+        network = ipaddress.ip_network(cidr, strict=False)
+        address = int(network.network_address)
+        node = self._roots[network.version]
+        for depth in range(network.prefixlen):
+            bit = (address >> (network.max_prefixlen - 1 - depth)) & 1
+            if node.children[bit] is None:
+                node.children[bit] = _Node()
+            node = node.children[bit]
+        if not node.has_value:
+            self._size += 1
+        node.value = value
+        node.has_value = True
+
+    def matches(self, prefix: str) -> list:
+        """Return values of all prefixes covering an address or CIDR, least specific first"""
+        network = ipaddress.ip_network(prefix, strict=False)
+        address = int(network.network_address)
+        node = self._roots[network.version]
+        found = [node.value] if node.has_value else []
+        for depth in range(network.prefixlen):
+            bit = (address >> (network.max_prefixlen - 1 - depth)) & 1
+            node = node.children[bit]
+            if node is None:
+                break
+            if node.has_value:
+                found.append(node.value)
+        return found
+
+    def longest_match(self, prefix: str) -> Any:
+        """Return the value of the most specific prefix covering an address or CIDR"""
+        found = self.matches(prefix)
+        return found[-1] if found else None
+
+
+class PrefixIndex:
+    """Prefix tries over all supernets and subnets"""
+
+    def __init__(self):
+        self.supernets = PrefixTrie()
+        self.subnets = PrefixTrie()
+
+    def lookup(self, prefix: str) -> dict:
+        return {
+            "supernet": self.supernets.longest_match(prefix),
+            "subnet": self.subnets.longest_match(prefix),
+        }
+
+
+_index: Optional[PrefixIndex] = None
+_index_versions: Optional[tuple[int, ...]] = None
+_build_lock = asyncio.Lock()
+
+
+def _current_versions() -> tuple[int, ...]:
+    return tuple(get_table_version(table) for table in _INDEXED_TABLES)
+
+
+async def get_prefix_index(db: AsyncSession) -> PrefixIndex:
+    """Return the shared prefix index, rebuilding it from the database if it is stale"""
+    global _index, _index_versions
+    await refresh_table_versions()
+    # A session with uncommitted subnet or supernet writes must see its own changes
+    wrote = session_wrote_table(db, Subnet) or session_wrote_table(db, Supernet)
+    if _index is not None and _index_versions == _current_versions() and not wrote:
+        return _index
+
+    async with _build_lock:
+        # Read before loading, so a write committed while we load makes this build stale
+        versions = _current_versions()
+        if _index is not None and _index_versions == versions and not wrote:
+            return _index
+
+        index = PrefixIndex()
+        supernets = await db.execute(select(Supernet.id, Supernet.cidr, Supernet.name))
+        for supernet_id, cidr, name in supernets.all():
+            try:
+                index.supernets.insert(cidr, {"id": supernet_id, "cidr": cidr, "name": name})
+            except ValueError:
+                continue
+        subnets = await db.execute(select(Subnet.id, Subnet.cidr, Subnet.name, Subnet.supernet_id))
+        for subnet_id, cidr, name, supernet_id in subnets.all():
+            try:
+                index.subnets.insert(cidr, {"id": subnet_id, "cidr": cidr, "name": name, "supernet_id": supernet_id})
+            except ValueError:
+                continue
+
+        if not wrote:
+            _index, _index_versions = index, versions
+        return index
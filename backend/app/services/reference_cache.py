@@ -0,0 +1,163 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from typing import Any, Generic, Optional, TypeVar
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import Purpose, Category, Vlan, Rack
+from app.services.table_versions import get_table_version, refresh_table_versions, session_wrote_table, watch_tables
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class CategoryRef:
+    id: int
+    name: str
+    description: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class PurposeRef:
+    id: int
+    name: str
+    description: str | None
+    category_id: int | None
+
+
+@dataclass(frozen=True, slots=True)
+class VlanRef:
+    id: int
+    site: str
+    environment: str
+    vlan_id: int
+    name: str
+    purpose_id: int | None
+
+    @property
+    def label(self) -> str:
+        return f"{self.vlan_id} - {self.name}"
+
+
+@dataclass(frozen=True, slots=True)
+class RackRef:
+    id: int
+    aisle: str
+    rack_number: str
+    position_count: int
+    location: str | None
+
+    @property
+    def label(self) -> str:
+        return f"{self.aisle}-{self.rack_number}"
+
+
+class ReferenceCache(Generic[T]):
+    """
+    Read-through LRU cache of immutable snapshots of a small reference table.
+    Entries are tagged with the table version they were loaded at, so any
+    committed write to the table, from this or another worker, invalidates
+    them; the TTL is a backstop for writes made outside the app.
+    """
+
+    def __init__(self, model, ref_type: type[T], max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self.model = model
+        self.ref_type = ref_type
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._columns = [getattr(model, field.name) for field in fields(ref_type)]
+        self._entries: OrderedDict[Any, tuple[int, float, tuple[T, ...]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def table(self) -> str:
+        return self.model.__tablename__
+
+    def invalidate(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    async def _get(self, db: AsyncSession, key, criteria) -> tuple[T, ...]:
+        # A session with uncommitted writes to the table must see its own changes
+        if session_wrote_table(db, self.model):
+            return await self._load(db, criteria)
+
+        await refresh_table_versions()
+        version = get_table_version(self.table)
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry_version, loaded_at, refs = entry
+            if entry_version == version and time.monotonic() - loaded_at < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return refs
+            del self._entries[key]
+
+        self.misses += 1
+        refs = await self._load(db, criteria)
+        self._entries[key] = (version, time.monotonic(), refs)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return refs
+
+    async def _load(self, db: AsyncSession, criteria) -> tuple[T, ...]:
+        query = select(*self._columns)
+        if criteria is not None:
+            query = query.where(criteria)
+        result = await db.execute(query.order_by(self.model.id))
+        return tuple(self.ref_type(*row) for row in result.all())
+
+    async def all(self, db: AsyncSession) -> tuple[T, ...]:
+        return await self._get(db, ("*",), None)
+
+    async def find(self, db: AsyncSession, field: str, value) -> tuple[T, ...]:
+        """Return every row whose field equals value"""
+        return await self._get(db, (field, value), getattr(self.model, field) == value)
+
+    async def find_one(self, db: AsyncSession, field: str, value) -> Optional[T]:
+        refs = await self.find(db, field, value)
+        return refs[0] if refs else None
+
+    async def get(self, db: AsyncSession, ref_id: int) -> Optional[T]:
+        return await self.find_one(db, "id", ref_id)
+
+
+categories_cache = ReferenceCache(Category, CategoryRef)
+purposes_cache = ReferenceCache(Purpose, PurposeRef)
+vlans_cache = ReferenceCache(Vlan, VlanRef)
+racks_cache = ReferenceCache(Rack, RackRef)
+
+REFERENCE_CACHES = {
+    cache.table: cache for cache in (categories_cache, purposes_cache, vlans_cache, racks_cache)
+}
+watch_tables(REFERENCE_CACHES)
+
+
+async def find_vlan_by_number(db: AsyncSession, vlan_number: int) -> Optional[VlanRef]:
+    """Return the VLAN with this 802.1Q id, raising ValueError if several sites use it"""
+    vlans = await vlans_cache.find(db, "vlan_id", vlan_number)
+    if len(vlans) > 1:
+        raise ValueError(f"VLAN {vlan_number} exists more than once, cannot tell which one is meant")
+    return vlans[0] if vlans else None
+
+
+async def find_rack_by_label(db: AsyncSession, label: str) -> Optional[RackRef]:
+    """Return the rack whose "aisle-rack_number" label matches, as written by the exports"""
+    for rack in await racks_cache.all(db):
+        if rack.label == label:
+            return rack
+    return None
+
+
+def reference_cache_stats() -> dict:
+    return {table: cache.stats() for table, cache in REFERENCE_CACHES.items()}
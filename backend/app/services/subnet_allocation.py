@@ -1,54 +1,106 @@
 import ipaddress
-import math
 from typing import List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, and_
 from app.db.models.subnet import Subnet
 from app.db.models.supernet import Supernet
+from app.services.ipam import cidr_to_range, cidr_version
 
+ALLOCATION_ATTEMPTS = 3
 
-def hosts_to_prefix_length(host_count: int) -> int:
-    """Convert required host count to subnet prefix length"""
+
+def hosts_to_prefix_length(host_count: int, version: int = 4) -> int:
+    """Convert required host count to subnet prefix length for the given IP version"""
     if host_count <= 0:
         raise ValueError("Host count must be positive")
     
+    max_prefixlen = 32 if version == 4 else 128
     if host_count == 1:
-        return 32  # Single host
+        return max_prefixlen  # Single host
     elif host_count == 2:
-        return 31  # Point-to-point link
-    else:
-        total_addresses = host_count + 2
-        prefix_length = 32 - math.ceil(math.log2(total_addresses))
+        return max_prefixlen - 1  # Point-to-point link
+    elif version == 4:
+        # Network and broadcast addresses are not usable
+        prefix_length = 32 - (host_count + 1).bit_length()
         return max(1, min(30, prefix_length))
+    else:
+        # Only the subnet-router anycast address is reserved
+        prefix_length = 128 - host_count.bit_length()
+        return max(1, min(126, prefix_length))
 
 
-async def find_available_subnet(
-    db: AsyncSession,
+def _occupied_ranges(supernet: ipaddress._BaseNetwork, existing_cidrs: List[str]) -> List[Tuple[int, int]]:
+    """Merge existing CIDRs of the supernet's IP version into sorted, disjoint integer ranges"""
+    occupied = []
+    for cidr in existing_cidrs:
+        existing = ipaddress.ip_network(cidr, strict=False)
+        if existing.version == supernet.version:
+            occupied.append((int(existing.network_address), int(existing.broadcast_address)))
+    occupied.sort()
+    
+    merged: List[Tuple[int, int]] = []
+    for start, end in occupied:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def first_free_subnet(
     supernet_cidr: str,
+    existing_cidrs: List[str],
     prefix_length: int
 ) -> Optional[str]:
-    """Find first available subnet of given prefix length within supernet"""
+    """
+    Find the first free aligned block of the given prefix length in a supernet.
+    Works on merged integer ranges and jumps past occupied space, so the cost
+    depends on the number of existing subnets rather than the number of
+    candidate blocks (a /48 holds 65536 /64s).
+    """
     supernet = ipaddress.ip_network(supernet_cidr, strict=False)
-    
-    result = await db.execute(select(Subnet))
-    existing_subnets = [
-        ipaddress.ip_network(subnet.cidr, strict=False) 
-        for subnet in result.scalars().all()
-    ]
-    
-    try:
-        for subnet in supernet.subnets(new_prefix=prefix_length):
-            overlaps = any(
-                subnet.overlaps(existing) for existing in existing_subnets
-            )
-            if not overlaps:
-                return str(subnet)
-    except ValueError:
+    if prefix_length < supernet.prefixlen or prefix_length > supernet.max_prefixlen:
         return None
     
+    merged = _occupied_ranges(supernet, existing_cidrs)
+    size = 1 << (supernet.max_prefixlen - prefix_length)
+    candidate = int(supernet.network_address)
+    supernet_end = int(supernet.broadcast_address)
+    index = 0
+    while candidate + size - 1 <= supernet_end:
+        while index < len(merged) and merged[index][1] < candidate:
+            index += 1
+        if index < len(merged) and merged[index][0] <= candidate + size - 1:
+            next_start = merged[index][1] + 1
+            candidate = (next_start + size - 1) // size * size
+            continue
+        return str(ipaddress.ip_network((candidate, prefix_length)))
+    
     return None
 
 
+def overlaps_cidr(model, cidr: str):
+    """Filter rows of a range-keyed model (Subnet, Supernet) whose block overlaps cidr in the same address family"""
+    range_start, range_end = cidr_to_range(cidr)
+    return and_(model.ip_version == cidr_version(cidr), model.range_start <= range_end, model.range_end >= range_start)
+
+
+async def find_available_subnet(
+    db: AsyncSession,
+    supernet_cidr: str,
+    prefix_length: int
+) -> Optional[str]:
+    """Find first available subnet of given prefix length within supernet"""
+    result = await db.execute(select(Subnet.cidr).where(overlaps_cidr(Subnet, supernet_cidr)))
+    return first_free_subnet(supernet_cidr, result.scalars().all(), prefix_length)
+
+
+async def lock_supernet(db: AsyncSession, supernet_id: int) -> Optional[Supernet]:
+    """Lock a supernet row so allocations inside it are serialized until commit"""
+    result = await db.execute(select(Supernet).where(Supernet.id == supernet_id).with_for_update())
+    return result.scalar_one_or_none()
+
+
 async def allocate_subnet_cidr(
     db: AsyncSession,
     allocation_mode: str,
@@ -62,13 +114,14 @@ async def allocate_subnet_cidr(
     if allocation_mode == "manual":
         if not manual_cidr:
             raise ValueError("Manual CIDR required for manual allocation mode")
+        if supernet_id:
+            await lock_supernet(db, supernet_id)
         return manual_cidr
     
     if not supernet_id:
         raise ValueError("Supernet ID required for auto allocation modes")
     
-    result = await db.execute(select(Supernet).where(Supernet.id == supernet_id))
-    supernet = result.scalar_one_or_none()
+    supernet = await lock_supernet(db, supernet_id)
     if not supernet:
         raise ValueError("Supernet not found")
     
@@ -80,7 +133,8 @@ async def allocate_subnet_cidr(
     elif allocation_mode == "auto_hosts":
         if not host_count:
             raise ValueError("Host count required for auto hosts allocation mode")
-        prefix_length = hosts_to_prefix_length(host_count)
+        version = ipaddress.ip_network(supernet.cidr, strict=False).version
+        prefix_length = hosts_to_prefix_length(host_count, version)
         allocated_cidr = await find_available_subnet(db, supernet.cidr, prefix_length)
         
     else:
@@ -92,6 +146,53 @@ async def allocate_subnet_cidr(
     return allocated_cidr
 
 
+def plan_subnet_batch(
+    supernet_cidr: str,
+    existing_cidrs: List[str],
+    prefix_lengths: List[int]
+) -> List[str]:
+    """
+    Pack subnets of the given prefix lengths into the free space of a supernet.
+    Requests are placed largest first, each into the smallest free aligned block
+    that can hold it, so smaller subnets fill the gaps left by larger ones.
+    Returns the allocated CIDRs in request order.
+    """
+    supernet = ipaddress.ip_network(supernet_cidr, strict=False)
+    address_type = type(supernet.network_address)
+    
+    free_blocks = []
+    cursor = int(supernet.network_address)
+    supernet_end = int(supernet.broadcast_address)
+    for start, end in _occupied_ranges(supernet, existing_cidrs) + [(supernet_end + 1, supernet_end + 1)]:
+        if start > cursor:
+            gap_end = min(start - 1, supernet_end)
+            free_blocks.extend(ipaddress.summarize_address_range(address_type(cursor), address_type(gap_end)))
+        cursor = max(cursor, end + 1)
+        if cursor > supernet_end:
+            break
+    
+    order = sorted(range(len(prefix_lengths)), key=lambda i: (prefix_lengths[i], i))
+    allocated: List[Optional[str]] = [None] * len(prefix_lengths)
+    
+    for index in order:
+        prefix_length = prefix_lengths[index]
+        if prefix_length < supernet.prefixlen or prefix_length > supernet.max_prefixlen:
+            raise ValueError(f"Prefix length /{prefix_length} does not fit in supernet {supernet}")
+        
+        candidates = [block for block in free_blocks if block.prefixlen <= prefix_length]
+        if not candidates:
+            raise ValueError(f"No space left in supernet for a /{prefix_length} subnet")
+        block = max(candidates, key=lambda b: (b.prefixlen, -int(b.network_address)))
+        
+        free_blocks.remove(block)
+        subnet = next(block.subnets(new_prefix=prefix_length))
+        if subnet != block:
+            free_blocks.extend(block.address_exclude(subnet))
+        allocated[index] = str(subnet)
+    
+    return allocated
+
+
 def calculate_gateway_ip(cidr: str, gateway_mode: str) -> Optional[str]:
     """Calculate gateway IP based on gateway assignment mode"""
     if gateway_mode == "none":
@@ -100,9 +201,7 @@ def calculate_gateway_ip(cidr: str, gateway_mode: str) -> Optional[str]:
         return None
     elif gateway_mode == "auto_first":
         network = ipaddress.ip_network(cidr, strict=False)
-        if network.prefixlen == 32:
-            return str(network.network_address)
-        elif network.prefixlen == 31:
+        if network.prefixlen >= network.max_prefixlen - 1:
             return str(network.network_address)
         else:
             return str(network.network_address + 1)
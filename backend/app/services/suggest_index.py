@@ -0,0 +1,178 @@
+import asyncio
+from bisect import bisect_left, insort
+from itertools import chain
+from typing import Optional
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.db.cascades import cascade_targets
+from app.db.models import Subnet, Supernet, Vlan, Device
+from app.services.table_versions import committed_versions, get_table_version, refresh_table_versions, watch_tables
+
+# Indexed columns per entity type; the first column is the display label
+SUGGEST_FIELDS = {
+    "subnet": (Subnet, ("name", "cidr")),
+    "supernet": (Supernet, ("name", "cidr")),
+    "vlan": (Vlan, ("name",)),
+    "device": (Device, ("name", "hostname", "serial_number")),
+}
+_KIND_BY_MODEL = {model: kind for kind, (model, _) in SUGGEST_FIELDS.items()}
+_INDEXED_TABLES = frozenset(model.__tablename__ for model in _KIND_BY_MODEL)
+watch_tables(_INDEXED_TABLES)
+_PENDING_KEY = "suggest_index_pending"
+_STALE_KEY = "suggest_index_stale"
+
+
+class SuggestIndex:
+    """Sorted list of lowercased keys answering prefix queries with bisect"""
+
+    def __init__(self):
+        self._keys: list[tuple[str, str, int, str]] = []
+        self._entries: dict[tuple[str, int], list[tuple[str, str, int, str]]] = {}
+        self._labels: dict[tuple[str, int], str] = {}
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def put(self, kind: str, entity_id: int, values: dict) -> None:
+        """Insert or replace the keys of one entity"""
+        self.remove(kind, entity_id)
+        _, fields = SUGGEST_FIELDS[kind]
+        entries = []
+        for field in fields:
+            value = values.get(field)
+            if value:
+                entry = (str(value).lower(), kind, entity_id, str(value))
+                insort(self._keys, entry)
+                entries.append(entry)
+        self._entries[(kind, entity_id)] = entries
+        self._labels[(kind, entity_id)] = str(values.get(fields[0]) or "")
+
+    def remove(self, kind: str, entity_id: int) -> None:
+        for entry in self._entries.pop((kind, entity_id), []):
+            position = bisect_left(self._keys, entry)
+            if position < len(self._keys) and self._keys[position] == entry:
+                del self._keys[position]
+        self._labels.pop((kind, entity_id), None)
+
+    def complete(self, prefix: str, limit: int = 10, kinds: Optional[set[str]] = None) -> list[dict]:
+        """
+        Return up to limit entities with a key starting with prefix, in key order.
+        Entities are listed once, at their first matching key, and the scan stops
+        after limit of them so a short prefix never walks the whole index.
+        """
+        prefix = prefix.lower()
+        position = bisect_left(self._keys, (prefix,))
+        seen = set()
+        found = []
+        while position < len(self._keys) and len(found) < limit:
+            key, kind, entity_id, text = self._keys[position]
+            position += 1
+            if not key.startswith(prefix):
+                break
+            if (kinds and kind not in kinds) or (kind, entity_id) in seen:
+                continue
+            seen.add((kind, entity_id))
+            found.append({"type": kind, "id": entity_id, "label": self._labels[(kind, entity_id)], "match": text})
+        return found
+
+
+_index: Optional[SuggestIndex] = None
+_index_versions: dict[str, int] = {}
+_build_lock = asyncio.Lock()
+
+
+def _current_versions() -> dict[str, int]:
+    return {table: get_table_version(table) for table in _INDEXED_TABLES}
+
+
+def invalidate_suggest_index() -> None:
+    global _index
+    _index = None
+
+
+async def get_suggest_index(db: AsyncSession) -> SuggestIndex:
+    """Return the shared suggestion index, rebuilding it once another worker has written an indexed table"""
+    global _index, _index_versions
+    await refresh_table_versions()
+    if _index is not None and _index_versions == _current_versions():
+        return _index
+
+    async with _build_lock:
+        # Read before loading, so a write committed while we load makes this build stale
+        versions = _current_versions()
+        if _index is not None and _index_versions == versions:
+            return _index
+
+        index = SuggestIndex()
+        for kind, (model, fields) in SUGGEST_FIELDS.items():
+            columns = [getattr(model, field) for field in fields]
+            rows = await db.execute(select(model.id, *columns))
+            for entity_id, *values in rows.all():
+                index.put(kind, entity_id, dict(zip(fields, values)))
+
+        _index, _index_versions = index, versions
+        return index
+
+
+def _apply_changes(changes: list[tuple[str, int, Optional[dict]]], published: dict[str, int]) -> None:
+    """Apply this worker's committed changes in place, unless another commit got in between"""
+    if _index is None:
+        return
+    published = {table: version for table, version in published.items() if table in _INDEXED_TABLES}
+    if any(version != _index_versions.get(table, 0) + 1 for table, version in published.items()):
+        invalidate_suggest_index()
+        return
+    for kind, entity_id, values in changes:
+        if values is None:
+            _index.remove(kind, entity_id)
+        else:
+            _index.put(kind, entity_id, values)
+    _index_versions.update(published)
+
+
+def _cascades_into_index(model) -> bool:
+    """Whether deleting a row of model makes the database delete indexed rows, e.g. a purpose's VLANs and subnets"""
+    return bool(cascade_targets(model.__tablename__) & _INDEXED_TABLES)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_changes(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for obj in chain(session.new, session.dirty):
+        kind = _KIND_BY_MODEL.get(type(obj))
+        if kind is not None:
+            _, fields = SUGGEST_FIELDS[kind]
+            pending.append((kind, obj.id, {field: getattr(obj, field) for field in fields}))
+    for obj in session.deleted:
+        kind = _KIND_BY_MODEL.get(type(obj))
+        if kind is not None:
+            pending.append((kind, obj.id, None))
+        if _cascades_into_index(type(obj)):
+            session.info[_STALE_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_changes(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None:
+        return
+    if mapper.class_ in _KIND_BY_MODEL or (orm_execute_state.is_delete and _cascades_into_index(mapper.class_)):
+        orm_execute_state.session.info[_STALE_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if session.info.pop(_STALE_KEY, False):
+        invalidate_suggest_index()
+    elif pending:
+        _apply_changes(pending, committed_versions(session))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_STALE_KEY, None)
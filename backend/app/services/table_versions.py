@@ -0,0 +1,169 @@
+"""
+Per-table change counters behind the ETags and the in-process caches.
+
+Every commit bumps the table_versions row of each watched table it wrote,
+in the same transaction as the write, so the counters are shared by all
+worker processes and machines. Only tables a cache registered with
+watch_tables() are counted, so writes to the others (audit logs, IP
+assignments, users) never queue on a version row. Each process mirrors the
+counters in memory: its own commits update the mirror right away, and
+refresh_table_versions() picks up the other workers' commits at most
+TABLE_VERSION_POLL_SECONDS late.
+"""
+import logging
+import time
+from itertools import chain
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.cascades import cascade_targets
+from app.db.models import TableVersion
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+_WRITTEN_KEY = "written_tables"
+_PUBLISHING_KEY = "publishing_table_versions"
+_COMMITTED_KEY = "committed_table_versions"
+
+_versions: dict[str, int] = {}
+_refreshed_at = float("-inf")
+_watched_tables: set[str] = set()
+
+
+def watch_tables(tables) -> None:
+    """Count commits to tables, which a cache reads; called at import time, before the startup bump"""
+    _watched_tables.update(tables)
+
+
+def get_table_version(table: str) -> int:
+    return _versions.get(table, 0)
+
+
+def _merge_versions(versions: dict[str, int]) -> None:
+    # Counters only grow, so an older read never moves the mirror back
+    for table, version in versions.items():
+        if version > _versions.get(table, 0):
+            _versions[table] = version
+
+
+def publish_table_versions(conn, tables) -> dict[str, int]:
+    """Bump the shared counters of tables on conn and return their new values"""
+    tables = sorted(set(tables) - {TableVersion.__tablename__})
+    if not tables:
+        return {}
+    insert = postgresql.insert if conn.dialect.name == "postgresql" else sqlite.insert
+    # One statement, rows in name order, so concurrent commits lock them in the same order
+    conn.execute(
+        insert(TableVersion)
+        .values([{"name": table, "version": 1} for table in tables])
+        .on_conflict_do_update(index_elements=[TableVersion.name], set_={"version": TableVersion.version + 1})
+    )
+    rows = conn.execute(select(TableVersion.name, TableVersion.version).where(TableVersion.name.in_(tables)))
+    return dict(rows.all())
+
+
+async def bump_all_table_versions() -> None:
+    """
+    Invalidate every cached version at startup, e.g. after a migration or a
+    restored database changed rows behind the session events
+    """
+    try:
+        async with engine.begin() as conn:
+            versions = await conn.run_sync(publish_table_versions, _watched_tables)
+    except Exception:
+        logger.exception("Could not bump table versions, are the migrations applied?")
+        return
+    _merge_versions(versions)
+
+
+async def refresh_table_versions() -> None:
+    """Pick up commits from other workers, reading the shared counters at most once per poll interval"""
+    global _refreshed_at
+    now = time.monotonic()
+    if now - _refreshed_at < settings.TABLE_VERSION_POLL_SECONDS:
+        return
+    _refreshed_at = now
+    try:
+        async with engine.connect() as conn:
+            rows = await conn.execute(select(TableVersion.name, TableVersion.version))
+            versions = dict(rows.all())
+    except Exception as e:
+        logger.warning(f"Could not read table versions: {e}")
+        return
+    _merge_versions(versions)
+
+
+def committed_versions(session) -> dict[str, int]:
+    """Tables the last commit of session wrote, with the versions it published for them"""
+    return session.info.get(_COMMITTED_KEY, {})
+
+
+def session_wrote_table(db, model) -> bool:
+    """Whether db has flushed or pending, uncommitted writes to the table of model"""
+    session = db.sync_session if hasattr(db, "sync_session") else db
+    if model.__tablename__ in session.info.get(_WRITTEN_KEY, ()):
+        return True
+    return any(isinstance(obj, model) for obj in chain(session.new, session.dirty, session.deleted))
+
+
+def _table_name(obj_or_mapper) -> str | None:
+    table = getattr(obj_or_mapper, "__table__", None)
+    if table is None:
+        table = getattr(obj_or_mapper, "local_table", None)
+    return getattr(table, "name", None)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_tables(session, flush_context):
+    written = session.info.setdefault(_WRITTEN_KEY, set())
+    for obj in chain(session.new, session.dirty):
+        name = _table_name(obj)
+        if name:
+            written.add(name)
+    for obj in session.deleted:
+        name = _table_name(obj)
+        if name:
+            # Rows removed by ON DELETE CASCADE change their tables too
+            written.add(name)
+            written.update(cascade_targets(name))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_tables(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    mapper = orm_execute_state.bind_mapper
+    name = _table_name(mapper) if mapper is not None else None
+    if name:
+        written = orm_execute_state.session.info.setdefault(_WRITTEN_KEY, set())
+        written.add(name)
+        if orm_execute_state.is_delete:
+            written.update(cascade_targets(name))
+
+
+@event.listens_for(Session, "before_commit")
+def _publish_before_commit(session):
+    # commit() only flushes pending objects after this hook, so flush here to see every write
+    session.flush()
+    watched = session.info.get(_WRITTEN_KEY, set()) & _watched_tables
+    if watched:
+        session.info[_PUBLISHING_KEY] = publish_table_versions(session.connection(), watched)
+
+
+# Registered before the listeners of the modules importing committed_versions,
+# so they run after the mirror and _COMMITTED_KEY are updated for this commit
+@event.listens_for(Session, "after_commit")
+def _bump_after_commit(session):
+    session.info.pop(_WRITTEN_KEY, None)
+    published = session.info.pop(_PUBLISHING_KEY, {})
+    session.info[_COMMITTED_KEY] = published
+    _merge_versions(published)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_WRITTEN_KEY, None)
+    session.info.pop(_PUBLISHING_KEY, None)
+    session.info.pop(_COMMITTED_KEY, None)
@@ -0,0 +1,53 @@
+from typing import Sequence
+from sqlalchemy import or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# FTS5 trigram queries need at least three characters
+_MIN_FTS_QUERY_LENGTH = 3
+
+_sqlite_fts_tables: set[str] | None = None
+
+
+def _escape_like(q: str) -> str:
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def like_pattern(q: str) -> str:
+    """Build a substring LIKE pattern with LIKE wildcards in q escaped"""
+    return f"%{_escape_like(q)}%"
+
+
+def prefix_pattern(q: str) -> str:
+    """Build a prefix LIKE pattern with LIKE wildcards in q escaped"""
+    return f"{_escape_like(q)}%"
+
+
+async def _get_sqlite_fts_tables(db: AsyncSession) -> set[str]:
+    global _sqlite_fts_tables
+    if _sqlite_fts_tables is None:
+        result = await db.execute(text("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE '%fts'"))
+        _sqlite_fts_tables = {row[0] for row in result.all()}
+    return _sqlite_fts_tables
+
+
+async def text_match(db: AsyncSession, model, columns: Sequence, q: str):
+    """
+    Build a case-insensitive substring filter for q over columns of model.
+    On Postgres this is ILIKE, which the pg_trgm GIN indexes from migration
+    0011 serve. On SQLite the FTS5 trigram table for the model is used when
+    it exists; otherwise this falls back to a plain ILIKE scan.
+    """
+    if db.bind.dialect.name == "sqlite" and len(q) >= _MIN_FTS_QUERY_LENGTH:
+        fts_table = f"{model.__tablename__}_fts"
+        if fts_table in await _get_sqlite_fts_tables(db):
+            column_filter = " ".join(column.key for column in columns)
+            phrase = q.replace('"', '""')
+            fts_rowids = select(text("rowid")).select_from(text(fts_table)).where(
+                text(f"{fts_table} MATCH :{fts_table}_query").bindparams(
+                    **{f"{fts_table}_query": f'{{{column_filter}}} : "{phrase}"'}
+                )
+            )
+            return model.id.in_(fts_rowids)
+
+    pattern = like_pattern(q)
+    return or_(*(column.ilike(pattern, escape="\\") for column in columns))
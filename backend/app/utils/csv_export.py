@@ -1,8 +1,8 @@
 import csv
 import io
 from fastapi.responses import StreamingResponse
-import openpyxl
 from typing import Dict, List, Any
+from app.core.metrics import EXPORTS
 
 def create_csv_response(data: List[Dict[str, Any]], headers: List[str], filename: str) -> StreamingResponse:
     """Create a CSV streaming response from data"""
@@ -14,6 +14,7 @@ def create_csv_response(data: List[Dict[str, Any]], headers: List[str], filename
         writer.writerow([row.get(header, "") for header in headers])
     
     output.seek(0)
+    EXPORTS.labels(format="csv").inc()
     return StreamingResponse(
         io.BytesIO(output.getvalue().encode()),
         media_type="text/csv",
@@ -36,6 +37,9 @@ def create_csv_template(headers: List[str], sample_data: List[str], filename: st
 
 
 def create_excel_response(worksheets: Dict[str, Dict], filename: str) -> StreamingResponse:
+    # openpyxl takes ~150ms to import, so only pay for it when a workbook is requested
+    import openpyxl
+
     workbook = openpyxl.Workbook()
     
     workbook.remove(workbook.active)
@@ -55,6 +59,7 @@ def create_excel_response(worksheets: Dict[str, Dict], filename: str) -> Streami
     output = io.BytesIO()
     workbook.save(output)
     output.seek(0)
+    EXPORTS.labels(format="xlsx").inc()
     
     return StreamingResponse(
         io.BytesIO(output.getvalue()),
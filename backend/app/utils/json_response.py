@@ -0,0 +1,30 @@
+from typing import Any, Iterable
+import orjson
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel
+
+
+def lean_columns(model, schema: type[BaseModel]) -> list:
+    """Mapped columns of model that schema serializes, for column-tuple queries"""
+    return [getattr(model, name) for name in model.__table__.columns.keys() if name in schema.model_fields]
+
+
+def rows_to_dicts(rows: Iterable, columns: list) -> list[dict[str, Any]]:
+    keys = [column.key for column in columns]
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def paginated_response(items: list, total: int, page: int, limit: int) -> JSONResponse:
+    """
+    Encode a PaginatedResponse-shaped payload of plain dicts with orjson,
+    skipping response_model validation. Routes opt in to this fast path
+    when they build their items from column tuples.
+    """
+    total_pages = (total + limit - 1) // limit
+    payload = {"items": items, "total": total, "page": page, "limit": limit, "total_pages": total_pages}
+    try:
+        return ORJSONResponse(payload)
+    except orjson.JSONEncodeError:
+        # orjson only encodes 64-bit integers, and IPv6 address counts (e.g. the
+        # available_ips of a /56) go past that; the stdlib encoder has no limit
+        return JSONResponse(payload)
@@ -0,0 +1,312 @@
+"""
+Benchmark the hot API endpoints against a generated dataset.
+
+The app runs in-process behind httpx's ASGITransport, so the numbers cover
+routing, validation, database access and serialization but no network.
+Each endpoint reports p50/p95/p99 latency and the peak memory traced while
+serving one request. Results can be saved as a JSON baseline, and a later
+run compared against it fails when an endpoint regressed by more than the
+threshold.
+
+The schema is created with Base.metadata.create_all, so on SQLite the FTS5
+search tables from migration 0011 are absent and search uses its ILIKE
+fallback.
+
+Run from the backend directory:
+    python -m benchmarks.endpoints --scale small --output baseline.json
+    python -m benchmarks.endpoints --scale small --compare baseline.json --threshold 25
+"""
+import argparse
+import asyncio
+import ipaddress
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from benchmarks.stats import percentile
+
+SCALES = {
+    "small": {"supernets": 4, "subnets": 500, "devices": 1000, "assignments": 10000},
+    "medium": {"supernets": 16, "subnets": 4000, "devices": 5000, "assignments": 200000},
+    "large": {"supernets": 96, "subnets": 20000, "devices": 20000, "assignments": 1000000, "utilization": 0.9},
+}
+# Endpoints that take seconds on larger datasets run a fifth of the iterations
+HEAVY_ENDPOINTS = {"export_all", "create_backup"}
+COMPARED_METRICS = ("p50_ms", "p95_ms", "p99_ms", "peak_alloc_kib")
+ALLOCATION_SAMPLES = 5
+CSV_ROWS = 50
+
+# Address space outside the generator's 10.0.0.0/8 for rows the benchmark creates
+ALLOCATION_SUPERNET = "172.16.0.0/12"
+ASSIGNMENT_SUBNET = "172.31.0.0/16"
+IMPORT_SPACE = ipaddress.ip_network("100.64.0.0/10")
+
+
+@dataclass
+class Context:
+    client: object
+    allocation_supernet_id: int = 0
+    assignment_subnet_id: int = 0
+    assignment_offset: int = 10
+    import_block: int = 0
+    backups: list = field(default_factory=list)
+
+
+def _next_assignment_ip(ctx: Context) -> str:
+    ctx.assignment_offset += 1
+    return str(ipaddress.ip_network(ASSIGNMENT_SUBNET).network_address + ctx.assignment_offset)
+
+
+def _next_import_block(ctx: Context) -> ipaddress.IPv4Network:
+    block = ipaddress.ip_network((int(IMPORT_SPACE.network_address) + ctx.import_block * 256, 24))
+    ctx.import_block += 1
+    return block
+
+
+def _csv(headers: list[str], rows: list[dict]) -> bytes:
+    lines = [",".join(headers)]
+    lines.extend(",".join(str(row.get(header, "")) for header in headers) for row in rows)
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def _list_subnets(ctx: Context, i: int):
+    return await ctx.client.get("/api/subnets", params={"page": i % 5 + 1})
+
+
+async def _list_supernets(ctx: Context, i: int):
+    return await ctx.client.get("/api/supernets")
+
+
+async def _search(ctx: Context, i: int):
+    queries = ("synthetic-subnet-0001", "10.0.1", "dc2", "synthetic-dev-00042", "team-07")
+    return await ctx.client.get("/api/search", params={"q": queries[i % len(queries)]})
+
+
+async def _create_subnet(ctx: Context, i: int):
+    return await ctx.client.post("/api/subnets", json={
+        "allocation_mode": "auto_mask",
+        "subnet_mask": 28,
+        "supernet_id": ctx.allocation_supernet_id,
+        "gateway_mode": "auto_first",
+        "name": f"bench-auto-{i}",
+    })
+
+
+async def _create_ip_assignment(ctx: Context, i: int):
+    return await ctx.client.post("/api/ip-assignments", json={
+        "subnet_id": ctx.assignment_subnet_id,
+        "ip_address": _next_assignment_ip(ctx),
+        "role": "bench",
+    })
+
+
+async def _import_subnets(ctx: Context, i: int):
+    block = _next_import_block(ctx)
+    rows = [
+        {"name": f"bench-import-{block.network_address}-{n}", "cidr": str(cidr), "site": "dc1", "environment": "prod"}
+        for n, cidr in enumerate(list(block.subnets(new_prefix=30))[:CSV_ROWS])
+    ]
+    content = _csv(["name", "cidr", "purpose", "vlan", "assigned_to", "gateway_ip", "site", "environment"], rows)
+    return await ctx.client.post("/api/subnets/import/csv", files={"file": ("subnets.csv", content, "text/csv")})
+
+
+async def _import_ip_assignments(ctx: Context, i: int):
+    subnet = f"bench-assignments ({ASSIGNMENT_SUBNET})"
+    rows = [{"subnet": subnet, "ip_address": _next_assignment_ip(ctx), "role": "bench"} for _ in range(CSV_ROWS)]
+    content = _csv(["subnet", "ip_address", "device", "role", "interface"], rows)
+    return await ctx.client.post("/api/ip-assignments/import/csv", files={"file": ("assignments.csv", content, "text/csv")})
+
+
+async def _export_all(ctx: Context, i: int):
+    return await ctx.client.get("/api/export/all")
+
+
+async def _create_backup(ctx: Context, i: int):
+    response = await ctx.client.post("/api/backup/create")
+    if response.status_code == 200:
+        ctx.backups.append(response.json()["backup_id"])
+    return response
+
+
+ENDPOINTS = {
+    "list_subnets": _list_subnets,
+    "list_supernets": _list_supernets,
+    "search": _search,
+    "create_subnet_auto": _create_subnet,
+    "create_ip_assignment": _create_ip_assignment,
+    "import_subnets_csv": _import_subnets,
+    "import_ip_assignments_csv": _import_ip_assignments,
+    "export_all": _export_all,
+    "create_backup": _create_backup,
+}
+
+
+async def _run_endpoint(ctx: Context, name: str, iterations: int, warmup: int) -> dict:
+    func = ENDPOINTS[name]
+    errors = 0
+    for i in range(warmup):
+        await func(ctx, i)
+
+    timings = []
+    for i in range(warmup, warmup + iterations):
+        start = time.perf_counter()
+        response = await func(ctx, i)
+        timings.append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+
+    # Measured separately since tracing slows every allocation down
+    peaks = []
+    tracemalloc.start()
+    try:
+        for i in range(warmup + iterations, warmup + iterations + min(ALLOCATION_SAMPLES, iterations)):
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            await func(ctx, i)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - baseline)
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "iterations": iterations,
+        "errors": errors,
+        "mean_ms": round(sum(timings) / len(timings), 3),
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "peak_alloc_kib": round(max(peaks) / 1024, 1),
+    }
+
+
+async def _setup(ctx: Context, spec) -> dict:
+    from app.db.session import engine, Base, AsyncSessionLocal
+    from app.db.models import User, Supernet, Subnet
+    from app.core.security import create_access_token
+    from app.seed_dataset import generate_dataset
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as session:
+        # Requests authenticate with a token, so the user never needs a usable password
+        user = User(email=f"benchmark-{time.time_ns()}@example.com", hashed_password="!", is_admin=True)
+        session.add(user)
+        await session.commit()
+        user_id = user.id
+        counts = await generate_dataset(session, spec)
+        allocation_supernet = Supernet(cidr=ALLOCATION_SUPERNET, name="bench-allocations")
+        assignment_subnet = Subnet(cidr=ASSIGNMENT_SUBNET, name="bench-assignments", gateway_mode="none")
+        session.add_all([allocation_supernet, assignment_subnet])
+        await session.commit()
+        ctx.allocation_supernet_id = allocation_supernet.id
+        ctx.assignment_subnet_id = assignment_subnet.id
+    ctx.client.headers["Authorization"] = f"Bearer {create_access_token(user_id)}"
+    return counts
+
+
+async def run(args) -> dict:
+    import httpx
+    from app.main import app
+    from app.services.backup import delete_backup_file
+    from app.seed_dataset import DatasetSpec
+
+    spec = DatasetSpec(**SCALES[args.scale])
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        ctx = Context(client=client)
+        counts = await _setup(ctx, spec)
+        results = {}
+        try:
+            for name in args.endpoints or ENDPOINTS:
+                iterations = args.iterations
+                if name in HEAVY_ENDPOINTS:
+                    iterations = max(3, iterations // 5)
+                results[name] = await _run_endpoint(ctx, name, iterations, args.warmup)
+                print(_format_row(name, results[name]), flush=True)
+        finally:
+            for backup_id in ctx.backups:
+                delete_backup_file(backup_id)
+
+    return {
+        "meta": {
+            "scale": args.scale,
+            "dataset": counts,
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+            "python": platform.python_version(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "endpoints": results,
+    }
+
+
+def _format_row(name: str, result: dict) -> str:
+    return (
+        f"{name:<28} p50 {result['p50_ms']:9.2f} ms  p95 {result['p95_ms']:9.2f} ms  "
+        f"p99 {result['p99_ms']:9.2f} ms  peak {result['peak_alloc_kib']:10.1f} KiB  errors {result['errors']}"
+    )
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Return a description of every metric that grew by more than threshold percent"""
+    regressions = []
+    for name, result in current["endpoints"].items():
+        previous = baseline["endpoints"].get(name)
+        if previous is None:
+            continue
+        if result["errors"] > previous.get("errors", 0):
+            regressions.append(f"{name}: {result['errors']} errors, baseline had {previous.get('errors', 0)}")
+        for metric in COMPARED_METRICS:
+            before, after = previous.get(metric), result[metric]
+            if before and after > before * (1 + threshold / 100):
+                regressions.append(f"{name}: {metric} {before} -> {after} (+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the hot API endpoints against a generated dataset")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, help="Only run these endpoints")
+    parser.add_argument("--database-url", help="Database to seed and benchmark against; defaults to a temporary SQLite file")
+    parser.add_argument("--output", type=Path, help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON to compare the results against")
+    parser.add_argument("--threshold", type=float, default=20.0, help="Allowed growth in percent before a metric counts as a regression")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = _parse_args()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Settings are read when app modules are first imported, so configure the environment before that
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite+aiosqlite:///{tmpdir}/benchmark.db"
+        os.environ.setdefault("JWT_SECRET_KEY", os.urandom(32).hex())
+        os.environ.setdefault("JWT_REFRESH_SECRET_KEY", os.urandom(32).hex())
+        os.environ.setdefault("ENV", "development")
+        os.environ.setdefault("LOG_LEVEL", "warning")
+        results = asyncio.run(run(args))
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline written to {args.output}")
+
+    if args.compare:
+        regressions = compare(json.loads(args.compare.read_text()), results, args.threshold)
+        if regressions:
+            print(f"Regressions beyond {args.threshold:g}%:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"No regressions beyond {args.threshold:g}% against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
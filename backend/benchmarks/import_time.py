@@ -0,0 +1,124 @@
+"""
+Digest `python -X importtime` for app.main, which is what every worker and
+every autoscaled machine pays before it can serve a request.
+
+The import is repeated in fresh interpreters and the median per module is
+kept, then summarized as the slowest packages and the app modules
+that pull the most in. Modules that are deliberately deferred to first use
+(openpyxl for Excel exports, passlib for password hashing, jose for tokens)
+must not be imported at startup; a module-level import that brings one back is
+reported as a regression, as is a total over --max-ms.
+
+Run from the backend directory:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 10 --max-ms 1500 --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from benchmarks.environment import REQUIRED_ENV
+
+TARGET = "app.main"
+DEFERRED_MODULES = ("openpyxl", "passlib", "jose")
+
+
+def _parse(stderr: str) -> dict[str, tuple[int, int]]:
+    """Map each module to (self_us, cumulative_us) from one importtime trace"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # the header row
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure(runs: int) -> list[dict[str, tuple[int, int]]]:
+    env = dict(os.environ)
+    for key, value in REQUIRED_ENV.items():
+        env.setdefault(key, value)
+    traces = []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {TARGET}"],
+            env=env, capture_output=True, text=True, check=False,
+        )
+        if proc.returncode != 0:
+            raise SystemExit(f"import {TARGET} failed:\n{proc.stderr[-2000:]}")
+        traces.append(_parse(proc.stderr))
+    return traces
+
+
+def digest(traces: list[dict[str, tuple[int, int]]], top: int) -> dict:
+    names = set().union(*traces)
+    self_ms = {name: statistics.median(t.get(name, (0, 0))[0] for t in traces) / 1000 for name in names}
+    cumulative_ms = {name: statistics.median(t.get(name, (0, 0))[1] for t in traces) / 1000 for name in names}
+
+    packages = defaultdict(float)
+    for name, ms in self_ms.items():
+        packages[name.split(".")[0]] += ms
+    app_modules = {name: ms for name, ms in cumulative_ms.items() if name.startswith("app.") and name != TARGET}
+
+    def ranked(values: dict[str, float]) -> list[dict]:
+        items = sorted(values.items(), key=lambda item: item[1], reverse=True)[:top]
+        return [{"module": name, "ms": round(ms, 1)} for name, ms in items]
+
+    return {
+        "target": TARGET,
+        "runs": len(traces),
+        "total_ms": round(cumulative_ms.get(TARGET, 0.0), 1),
+        "module_count": len(names),
+        "packages": ranked(packages),
+        "app_modules": ranked(app_modules),
+        "slowest_modules": ranked(self_ms),
+        "deferred_imported": sorted({name.split(".")[0] for name in names} & set(DEFERRED_MODULES)),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Summarize the import time of the app at startup")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure; the median is kept")
+    parser.add_argument("--top", type=int, default=15, help="Rows per table")
+    parser.add_argument("--max-ms", type=float, help=f"Fail when importing {TARGET} takes longer than this")
+    parser.add_argument("--json", type=str, help="Write the digest to this file")
+    args = parser.parse_args()
+
+    report = digest(measure(args.runs), args.top)
+    print(f"import {TARGET}: {report['total_ms']:.1f} ms median over {report['runs']} runs, {report['module_count']} modules")
+    for title, key in [
+        ("Packages by own import time", "packages"),
+        ("App modules by cumulative import time", "app_modules"),
+        ("Slowest individual modules", "slowest_modules"),
+    ]:
+        print(f"\n{title}")
+        for row in report[key]:
+            print(f"  {row['ms']:9.1f} ms  {row['module']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    violations = []
+    if report["deferred_imported"]:
+        violations.append(
+            f"imported at startup but should be deferred to first use: {', '.join(report['deferred_imported'])}"
+        )
+    if args.max_ms is not None and report["total_ms"] > args.max_ms:
+        violations.append(f"import {TARGET} took {report['total_ms']:.1f} ms, over the {args.max_ms:g} ms budget")
+    if violations:
+        print("\nStartup regressions:")
+        for violation in violations:
+            print(f"  {violation}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
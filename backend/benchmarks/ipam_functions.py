@@ -0,0 +1,179 @@
+"""
+Micro-benchmark the pure IPAM helpers across prefix lengths and subnet counts.
+
+Every case has a per-call budget that is the published performance envelope
+for that helper, set well above the cost on a laptop so only real regressions
+trip it. Helpers whose cost must not depend on network size are also checked
+for flatness across the sweep, which catches accidental host enumeration long
+before it times out: a /8 holds 16.7M hosts and an IPv6 /32 holds 2^96.
+
+find_available_subnet is benchmarked through first_free_subnet, its pure core;
+the wrapper only adds one range query.
+
+Run from the backend directory:
+    python -m benchmarks.ipam_functions
+    python -m benchmarks.ipam_functions --only first_free_subnet --json envelope.json
+"""
+import argparse
+import ipaddress
+import json
+import sys
+import timeit
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Callable
+
+from benchmarks.environment import use_placeholder_settings
+
+# Settings are read when app modules are first imported
+use_placeholder_settings()
+
+from app.services.ipam import (  # noqa: E402
+    calculate_spatial_allocation_segments,
+    cidr_overlap,
+    get_valid_ip_range,
+    is_usable_ip_in_subnet,
+)
+from app.services.subnet_allocation import first_free_subnet, hosts_to_prefix_length  # noqa: E402
+
+IPV4_PREFIXES = (8, 12, 16, 20, 24, 28, 30, 31, 32)
+IPV6_PREFIXES = (32, 48, 56, 64, 96, 126, 127, 128)
+SUBNET_COUNTS = (0, 100, 1000, 10000)
+# Largest allowed ratio between the slowest and fastest case of a size-independent helper
+FLAT_RATIO = 5.0
+
+
+@dataclass
+class Case:
+    function: str
+    label: str
+    func: Callable
+    budget_us: float
+    flat_group: str | None = None
+
+
+def _network(version: int, prefix: int) -> ipaddress._BaseNetwork:
+    base = "10.0.0.0/8" if version == 4 else "2001:db8::/32"
+    network = ipaddress.ip_network(base)
+    return ipaddress.ip_network((int(network.network_address), prefix))
+
+
+def _carved(supernet: ipaddress._BaseNetwork, prefix: int, count: int) -> list[str]:
+    """The first count blocks of a supernet, leaving every other block free to defeat run merging"""
+    size = 1 << (supernet.max_prefixlen - prefix)
+    start = int(supernet.network_address)
+    return [str(ipaddress.ip_network((start + 2 * i * size, prefix))) for i in range(count)]
+
+
+def _prefix_cases() -> list[Case]:
+    cases = []
+    sweeps = [(4, prefix) for prefix in IPV4_PREFIXES] + [(6, prefix) for prefix in IPV6_PREFIXES]
+    for version, prefix in sweeps:
+        cidr = str(_network(version, prefix))
+        other = str(_network(version, min(prefix + 1, 32 if version == 4 else 128)))
+        last_host = str(_network(version, prefix).broadcast_address)
+        label = f"IPv{version} /{prefix}"
+        cases.append(Case("cidr_overlap", label, lambda a=cidr, b=other: cidr_overlap(a, b), 50, f"cidr_overlap v{version}"))
+        cases.append(Case("is_usable_ip_in_subnet", label, lambda ip=last_host, c=cidr: is_usable_ip_in_subnet(ip, c), 50, f"is_usable_ip_in_subnet v{version}"))
+        cases.append(Case("get_valid_ip_range", label, lambda c=cidr: get_valid_ip_range(c), 60, f"get_valid_ip_range v{version}"))
+
+    for version, hosts in [(4, 1), (4, 2), (4, 254), (4, 1 << 20), (4, 1 << 31), (6, 2), (6, 1 << 64), (6, 1 << 120)]:
+        cases.append(Case(
+            "hosts_to_prefix_length", f"IPv{version} {hosts} hosts",
+            lambda h=hosts, v=version: hosts_to_prefix_length(h, v), 5,
+        ))
+    return cases
+
+
+def _subnet_count_cases() -> list[Case]:
+    cases = []
+    for version, supernet_prefix, prefix in [(4, 8, 24), (4, 16, 28), (6, 32, 64), (6, 48, 64)]:
+        supernet = _network(version, supernet_prefix)
+        available = 1 << (prefix - supernet_prefix)
+        for count in SUBNET_COUNTS:
+            if count * 2 > available:
+                continue
+            carved = _carved(supernet, prefix, count)
+            subnets = [SimpleNamespace(cidr=cidr) for cidr in carved]
+            label = f"IPv{version} /{prefix} in /{supernet_prefix}, {count} used"
+            per_subnet_us = 100
+            cases.append(Case(
+                "first_free_subnet", label,
+                lambda s=str(supernet), c=carved, p=prefix: first_free_subnet(s, c, p),
+                50 + per_subnet_us * count,
+            ))
+            cases.append(Case(
+                "calculate_spatial_allocation_segments", label,
+                lambda s=str(supernet), c=subnets: calculate_spatial_allocation_segments(s, c),
+                200 + per_subnet_us * count,
+            ))
+    return cases
+
+
+def _per_call_us(func: Callable, repeat: int, min_seconds: float = 0.05) -> float:
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < min_seconds:
+        number *= 2
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1_000_000
+
+
+def run(cases: list[Case], repeat: int) -> tuple[list[dict], list[str]]:
+    results = []
+    violations = []
+    for case in cases:
+        per_call = _per_call_us(case.func, repeat)
+        results.append({
+            "function": case.function,
+            "case": case.label,
+            "per_call_us": round(per_call, 3),
+            "budget_us": case.budget_us,
+            "flat_group": case.flat_group,
+        })
+        status = "ok" if per_call <= case.budget_us else "OVER BUDGET"
+        print(f"{case.function:<38} {case.label:<32} {per_call:12.2f} us  budget {case.budget_us:>10.0f} us  {status}", flush=True)
+        if per_call > case.budget_us:
+            violations.append(f"{case.function} {case.label}: {per_call:.2f} us exceeds the {case.budget_us:g} us budget")
+
+    groups: dict[str, list[dict]] = {}
+    for result in results:
+        if result["flat_group"]:
+            groups.setdefault(result["flat_group"], []).append(result)
+    for group, members in groups.items():
+        fastest = min(members, key=lambda r: r["per_call_us"])
+        slowest = max(members, key=lambda r: r["per_call_us"])
+        if slowest["per_call_us"] > fastest["per_call_us"] * FLAT_RATIO:
+            violations.append(
+                f"{group}: {slowest['case']} takes {slowest['per_call_us']:.2f} us against "
+                f"{fastest['per_call_us']:.2f} us for {fastest['case']}, cost should not depend on network size"
+            )
+    return results, violations
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmark the pure IPAM helpers")
+    parser.add_argument("--only", nargs="+", help="Only run cases for these functions")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repeats per case; the best is kept")
+    parser.add_argument("--json", type=str, help="Write the measured envelope to this file")
+    args = parser.parse_args()
+
+    cases = _prefix_cases() + _subnet_count_cases()
+    if args.only:
+        cases = [case for case in cases if case.function in args.only]
+    results, violations = run(cases, args.repeat)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if violations:
+        print("\nPerformance envelope violations:")
+        for violation in violations:
+            print(f"  {violation}")
+        return 1
+    print(f"\nAll {len(results)} cases within the performance envelope")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
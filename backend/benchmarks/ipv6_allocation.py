@@ -0,0 +1,58 @@
+"""
+Benchmark IPv6 allocation and utilization paths.
+
+Carves /64s out of /48 supernets and measures the pure allocation and
+utilization helpers, none of which should enumerate hosts.
+
+Run from the backend directory:
+    python -m benchmarks.ipv6_allocation
+"""
+import ipaddress
+import time
+
+from benchmarks.environment import use_placeholder_settings
+
+# Settings are read when app modules are first imported
+use_placeholder_settings()
+
+from app.services.ipam import (  # noqa: E402
+    calculate_subnet_available_ips,
+    calculate_subnet_spatial_segments,
+    calculate_subnet_utilization,
+    get_valid_ip_range,
+)
+from app.services.subnet_allocation import first_free_subnet, plan_subnet_batch  # noqa: E402
+
+
+def _timed(label: str, func, repeat: int = 5):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<55} {best * 1000:10.2f} ms")
+    return result
+
+
+def main():
+    supernet = "2001:db8::/48"
+    carved = [str(net) for net in list(ipaddress.ip_network(supernet).subnets(new_prefix=64))[:20000]]
+
+    _timed("first_free_subnet /64 in /48 (empty)", lambda: first_free_subnet(supernet, [], 64))
+    _timed("first_free_subnet /64 in /48 (20000 used)", lambda: first_free_subnet(supernet, carved, 64))
+    _timed("first_free_subnet /56 in /48 (20000 used)", lambda: first_free_subnet(supernet, carved, 56))
+    _timed("plan_subnet_batch 1000 x /64 in /48 (20000 used)", lambda: plan_subnet_batch(supernet, carved, [64] * 1000), repeat=1)
+
+    subnet = "2001:db8:0:1::/64"
+    network = ipaddress.ip_network(subnet)
+    assigned = [str(network.network_address + i) for i in range(1, 5001)]
+    _timed("calculate_subnet_utilization /64 (5000 assigned)", lambda: calculate_subnet_utilization(subnet, assigned))
+    _timed("calculate_subnet_available_ips /64 (5000 assigned)", lambda: calculate_subnet_available_ips(subnet, assigned))
+    _timed("calculate_subnet_spatial_segments /64 (5000 assigned)", lambda: calculate_subnet_spatial_segments(subnet, assigned))
+    _timed("get_valid_ip_range /64", lambda: get_valid_ip_range(subnet))
+
+
+if __name__ == "__main__":
+    main()
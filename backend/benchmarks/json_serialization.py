@@ -0,0 +1,73 @@
+"""
+Benchmark building and encoding a 1000-item subnet list response.
+
+Compares the response_model path (ORM-style objects validated into
+PaginatedResponse[SubnetOut], then encoded the way FastAPI's default
+JSONResponse does) with the lean path used by list routes that opt in
+(plain dicts from column tuples encoded with orjson).
+
+Run from the backend directory:
+    python -m benchmarks.json_serialization
+"""
+import json
+from types import SimpleNamespace
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.environment import use_placeholder_settings
+
+# Settings are read when app modules are first imported
+use_placeholder_settings()
+
+from app.schemas.pagination import PaginatedResponse  # noqa: E402
+from app.schemas.subnet import SubnetOut  # noqa: E402
+from benchmarks.ipv6_allocation import _timed  # noqa: E402
+
+ITEMS = 1000
+
+
+def _subnet_row(index: int) -> dict:
+    return {
+        "id": index,
+        "supernet_id": 1,
+        "cidr": f"10.{index // 256}.{index % 256}.0/24",
+        "name": f"subnet-{index}",
+        "purpose_id": index % 7 or None,
+        "assigned_to": "Network Team",
+        "gateway_ip": f"10.{index // 256}.{index % 256}.1",
+        "vlan_id": index % 11 or None,
+        "site": "HQ",
+        "environment": "prod",
+        "allocation_mode": "manual",
+        "gateway_mode": "auto_first",
+        "subnet_mask": 24,
+        "host_count": None,
+        "utilization_percentage": 12.5,
+        "available_ips": 222,
+        "spatial_segments": [{"start": 0, "end": 31, "status": "used", "label": "32 in use"}],
+        "first_ip": f"10.{index // 256}.{index % 256}.1",
+        "last_ip": f"10.{index // 256}.{index % 256}.254",
+    }
+
+
+def _model_path(objects):
+    payload = PaginatedResponse[SubnetOut].create(objects, ITEMS, 1, ITEMS)
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _lean_path(rows):
+    return orjson.dumps({"items": rows, "total": ITEMS, "page": 1, "limit": ITEMS, "total_pages": 1})
+
+
+def main():
+    rows = [_subnet_row(index) for index in range(ITEMS)]
+    objects = [SimpleNamespace(**row) for row in rows]
+
+    model_body = _timed(f"response_model + json ({ITEMS} subnets)", lambda: _model_path(objects), repeat=20)
+    lean_body = _timed(f"lean dicts + orjson ({ITEMS} subnets)", lambda: _lean_path(rows), repeat=20)
+    assert json.loads(model_body) == json.loads(lean_body)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Replay a weighted mix of production-like traffic against a running server.
+
+After one login, N virtual users share a connection pool and loop: pick a
+scenario by weight, run it, and wait an exponentially distributed think time. Throughput, error rate
+and p50/p95/p99 latency are printed per reporting interval and summarized per
+scenario at the end, which is what worker counts and pool sizes are sized on.
+
+The ip_assignment and subnet_allocation scenarios write to the database
+(next-ip reservations and /28 auto-allocations named load-*), so point this at
+a disposable dataset such as one built with app.seed_dataset, or pass
+--read-only.
+
+Start a server and run from the backend directory:
+    uvicorn app.main:app --port 8000
+    python -m benchmarks.load_test --users 20 --duration 60 --email admin --password '...'
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+import httpx
+
+from benchmarks.stats import percentile
+
+DEFAULT_MIX = {"dashboard": 30, "search": 40, "ip_assignment": 15, "subnet_allocation": 10, "export": 1}
+WRITE_SCENARIOS = {"ip_assignment", "subnet_allocation"}
+SEARCH_TERMS = ("synthetic", "subnet-00", "10.0.", "dc1", "prod", "dev-000", "team-0", "vlan1")
+
+
+@dataclass
+class Sample:
+    scenario: str
+    started: float
+    latency: float
+    ok: bool
+
+
+@dataclass
+class Targets:
+    """Ids discovered before the run so scenarios can address existing rows"""
+    supernet_ids: list[int] = field(default_factory=list)
+    subnet_ids: list[int] = field(default_factory=list)
+    search_terms: list[str] = field(default_factory=lambda: list(SEARCH_TERMS))
+
+
+async def dashboard(client: httpx.AsyncClient, targets: Targets) -> bool:
+    # The Dashboard page fires these together; list endpoints cap limit at 100
+    responses = await asyncio.gather(
+        client.get("/api/supernets"),
+        client.get("/api/subnets", params={"limit": 100}),
+        client.get("/api/vlans", params={"limit": 100}),
+        client.get("/api/devices", params={"limit": 100}),
+    )
+    return all(response.status_code < 400 for response in responses)
+
+
+async def search(client: httpx.AsyncClient, targets: Targets) -> bool:
+    term = random.choice(targets.search_terms)
+    suggest = await client.get("/api/search/suggest", params={"q": term[:3]})
+    results = await client.get("/api/search", params={"q": term})
+    return suggest.status_code < 400 and results.status_code < 400
+
+
+async def ip_assignment(client: httpx.AsyncClient, targets: Targets) -> bool:
+    if not targets.subnet_ids:
+        return False
+    subnet_id = random.choice(targets.subnet_ids)
+    response = await client.post(f"/api/subnets/{subnet_id}/next-ip", json={"count": 1})
+    # A full subnet is an expected outcome, not a server error
+    return response.status_code < 500
+
+
+async def subnet_allocation(client: httpx.AsyncClient, targets: Targets) -> bool:
+    if not targets.supernet_ids:
+        return False
+    response = await client.post("/api/subnets", json={
+        "allocation_mode": "auto_mask",
+        "subnet_mask": 28,
+        "supernet_id": random.choice(targets.supernet_ids),
+        "gateway_mode": "auto_first",
+        "name": f"load-{uuid.uuid4().hex[:12]}",
+    })
+    return response.status_code < 500
+
+
+async def export(client: httpx.AsyncClient, targets: Targets) -> bool:
+    response = await client.get("/api/export/all")
+    return response.status_code < 400
+
+
+SCENARIOS = {
+    "dashboard": dashboard,
+    "search": search,
+    "ip_assignment": ip_assignment,
+    "subnet_allocation": subnet_allocation,
+    "export": export,
+}
+
+
+class TokenAuth(httpx.Auth):
+    """
+    Bearer auth shared by all virtual users. Access tokens expire after
+    ACCESS_TOKEN_EXPIRE_MINUTES, so a 401 renews the token once, with the
+    refresh token or else by logging in again, and the request is retried.
+    """
+    requires_response_body = True
+
+    def __init__(self, access_token: str, refresh_token: str | None = None, credentials: dict | None = None):
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.credentials = credentials
+        self._lock = asyncio.Lock()
+
+    def _renewals(self, request: httpx.Request):
+        if self.refresh_token:
+            yield httpx.Request("POST", request.url.join("/api/auth/refresh"), json={"token": self.refresh_token})
+        if self.credentials:
+            yield httpx.Request("POST", request.url.join("/api/auth/login"), json=self.credentials)
+
+    async def async_auth_flow(self, request: httpx.Request):
+        token = self.access_token
+        request.headers["Authorization"] = f"Bearer {token}"
+        response = yield request
+        if response.status_code != 401:
+            return
+
+        async with self._lock:
+            # Another virtual user may have renewed the token while this request was in flight
+            if self.access_token == token:
+                for renewal in self._renewals(request):
+                    renewed = yield renewal
+                    if renewed.status_code == 200:
+                        tokens = renewed.json()
+                        self.access_token = tokens["access_token"]
+                        self.refresh_token = tokens.get("refresh_token")
+                        break
+        if self.access_token != token:
+            request.headers["Authorization"] = f"Bearer {self.access_token}"
+            yield request
+
+
+async def _authenticate(client: httpx.AsyncClient, args) -> TokenAuth:
+    if args.token:
+        # Without a password an expired --token cannot be renewed
+        return TokenAuth(args.token, credentials={"email": args.email, "password": args.password} if args.password else None)
+    credentials = {"email": args.email, "password": args.password}
+    response = await client.post("/api/auth/login", json=credentials)
+    response.raise_for_status()
+    tokens = response.json()
+    return TokenAuth(tokens["access_token"], tokens.get("refresh_token"), credentials)
+
+
+async def _discover(client: httpx.AsyncClient) -> Targets:
+    targets = Targets()
+    supernets = (await client.get("/api/supernets")).json()
+    targets.supernet_ids = [supernet["id"] for supernet in supernets]
+    subnets = (await client.get("/api/subnets", params={"limit": 100})).json()["items"]
+    targets.subnet_ids = [subnet["id"] for subnet in subnets if subnet.get("available_ips")]
+    targets.search_terms.extend(subnet["name"] for subnet in subnets[:20] if subnet.get("name"))
+    return targets
+
+
+async def _virtual_user(client, targets, mix, think_time, deadline, samples: list[Sample]):
+    names, weights = zip(*mix.items())
+    while time.monotonic() < deadline:
+        scenario = random.choices(names, weights)[0]
+        started = time.monotonic()
+        try:
+            ok = await SCENARIOS[scenario](client, targets)
+        except httpx.HTTPError:
+            ok = False
+        samples.append(Sample(scenario, started, time.monotonic() - started, ok))
+        if think_time:
+            await asyncio.sleep(random.expovariate(1 / think_time))
+
+
+def _summarize(samples: list[Sample], seconds: float) -> dict:
+    latencies = sorted(sample.latency * 1000 for sample in samples)
+    errors = sum(not sample.ok for sample in samples)
+    if not latencies:
+        return {"count": 0, "errors": 0}
+    return {
+        "count": len(samples),
+        "per_second": round(len(samples) / seconds, 2),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2),
+    }
+
+
+async def _report(samples: list[Sample], start: float, interval: float, deadline: float, timeline: list[dict]):
+    reported = 0
+    window_start = start
+    while window_start < deadline:
+        await asyncio.sleep(interval)
+        window = samples[reported:]
+        reported += len(window)
+        summary = _summarize(window, interval)
+        summary["at_s"] = round(time.monotonic() - start)
+        timeline.append(summary)
+        if summary["count"]:
+            print(
+                f"{summary['at_s']:>5}s  {summary['per_second']:8.1f} req/s  errors {summary['error_rate']:6.1%}  "
+                f"p50 {summary['p50_ms']:8.1f} ms  p95 {summary['p95_ms']:8.1f} ms  p99 {summary['p99_ms']:8.1f} ms",
+                flush=True,
+            )
+        else:
+            print(f"{summary['at_s']:>5}s  no completed scenarios", flush=True)
+        window_start += interval
+
+
+async def run(args) -> dict:
+    mix = dict(DEFAULT_MIX)
+    for item in args.mix or []:
+        name, _, weight = item.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}, expected one of {', '.join(SCENARIOS)}")
+        mix[name] = float(weight)
+    if args.read_only:
+        mix = {name: weight for name, weight in mix.items() if name not in WRITE_SCENARIOS}
+    mix = {name: weight for name, weight in mix.items() if weight > 0}
+
+    limits = httpx.Limits(max_connections=args.users * 4, max_keepalive_connections=args.users * 4)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        client.auth = await _authenticate(client, args)
+        targets = await _discover(client)
+        print(f"Running {args.users} users for {args.duration}s against {args.url} with mix {mix}", flush=True)
+
+        samples: list[Sample] = []
+        timeline: list[dict] = []
+        start = time.monotonic()
+        deadline = start + args.duration
+        users = []
+        for _ in range(args.users):
+            users.append(asyncio.create_task(
+                _virtual_user(client, targets, mix, args.think_time, deadline, samples)
+            ))
+            if args.ramp_up:
+                await asyncio.sleep(args.ramp_up / args.users)
+        reporter = asyncio.create_task(_report(samples, start, args.interval, deadline, timeline))
+        await asyncio.gather(*users)
+        reporter.cancel()
+        elapsed = time.monotonic() - start
+
+    by_scenario = defaultdict(list)
+    for sample in samples:
+        by_scenario[sample.scenario].append(sample)
+    results = {
+        "url": args.url,
+        "users": args.users,
+        "duration_s": round(elapsed, 1),
+        "mix": mix,
+        "total": _summarize(samples, elapsed),
+        "scenarios": {name: _summarize(group, elapsed) for name, group in sorted(by_scenario.items())},
+        "timeline": timeline,
+    }
+
+    print(f"\n{'scenario':<20} {'count':>7} {'req/s':>8} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, summary in list(results["scenarios"].items()) + [("total", results["total"])]:
+        if summary["count"]:
+            print(
+                f"{name:<20} {summary['count']:>7} {summary['per_second']:>8.1f} {summary['error_rate']:>7.1%} "
+                f"{summary['p50_ms']:>9.1f} {summary['p95_ms']:>9.1f} {summary['p99_ms']:>9.1f} {summary['max_ms']:>9.1f}"
+            )
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay a weighted mix of traffic against a running IPAM server")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to run")
+    parser.add_argument("--ramp-up", type=float, default=0, help="Seconds over which users are started")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean seconds a user waits between scenarios")
+    parser.add_argument("--interval", type=float, default=5, help="Seconds per reporting window")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--mix", nargs="+", metavar="SCENARIO=WEIGHT", help=f"Override weights, defaults {DEFAULT_MIX}")
+    parser.add_argument("--read-only", action="store_true", help="Skip scenarios that write to the database")
+    parser.add_argument("--email", default="admin")
+    parser.add_argument("--password")
+    parser.add_argument("--token", help="Use this access token instead of logging in")
+    parser.add_argument("--output", help="Write the summary and timeline as JSON")
+    args = parser.parse_args()
+    if not args.token and not args.password:
+        parser.error("Pass --password or --token")
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 1 if results["total"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import event
+
+# Settings are read at import time, so point the app at a throwaway database first
+_db_dir = tempfile.mkdtemp(prefix="ipam-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_dir}/ipam.db"
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("JWT_REFRESH_SECRET_KEY", "test-refresh-secret")
+os.environ.setdefault("METRICS_TOKEN", "test-metrics-token")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.security import create_access_token  # noqa: E402
+from app.db.models import User  # noqa: E402
+from app.db.session import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+# SQLite only enforces foreign keys, and so ON DELETE CASCADE, when asked to,
+# so turn it on to delete the way Postgres does
+@event.listens_for(engine.sync_engine, "connect")
+def _enforce_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+async def _create_schema() -> int:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as session:
+        user = User(email="admin@example.com", hashed_password="!", is_admin=True)
+        session.add(user)
+        await session.commit()
+        return user.id
+
+
+@pytest.fixture(scope="session")
+def client():
+    user_id = asyncio.run(_create_schema())
+    with TestClient(app) as test_client:
+        test_client.headers["Authorization"] = f"Bearer {create_access_token(user_id)}"
+        yield test_client
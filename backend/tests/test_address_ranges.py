@@ -0,0 +1,63 @@
+def _create_subnet(client, cidr, **fields):
+    return client.post("/api/subnets", json={"cidr": cidr, "gateway_mode": "none", **fields})
+
+
+def test_adjacent_ipv6_subnets_do_not_collide(client):
+    first = _create_subnet(client, "2001:db8:10::/64")
+    second = _create_subnet(client, "2001:db8:10:1::/64")
+    assert first.status_code == 200, first.text
+    assert second.status_code == 200, second.text
+
+    overlapping = _create_subnet(client, "2001:db8:10::/48")
+    assert overlapping.status_code == 400
+    assert overlapping.json()["detail"] == "Overlapping subnet"
+
+
+def test_ipv4_and_ipv6_ranges_are_kept_apart(client):
+    # ::1414:0/120 has the same numeric range as 20.20.0.0/24
+    assert _create_subnet(client, "20.20.0.0/24").status_code == 200
+    mapped = _create_subnet(client, "::1414:0/120")
+    assert mapped.status_code == 200, mapped.text
+
+    found = client.get("/api/search", params={"q": "20.20.0.5", "entity": "subnets"}).json()
+    assert [subnet["cidr"] for subnet in found["subnets"]] == ["20.20.0.0/24"]
+
+    # The IPv6 twin must not take up a slot on the page or signal more results
+    page = client.get("/api/search", params={"q": "20.20.0.0/16", "entity": "subnets", "limit": 1}).json()
+    assert [subnet["cidr"] for subnet in page["subnets"]] == ["20.20.0.0/24"]
+    assert page["has_more"]["subnets"] is False
+    assert page["next_cursor"]["subnets"] is None
+
+
+def test_next_ip_and_containment_search_in_ipv6(client):
+    subnet = _create_subnet(client, "2001:db8:20:ffff::/64").json()
+
+    reserved = client.post(f"/api/subnets/{subnet['id']}/next-ip", json={"count": 2})
+    assert reserved.status_code == 200, reserved.text
+    assert [a["ip_address"] for a in reserved.json()] == ["2001:db8:20:ffff::1", "2001:db8:20:ffff::2"]
+
+    found = client.get("/api/search", params={"q": "2001:db8:20:ffff::2", "entity": "ip_assignments"}).json()
+    assert [a["ip_address"] for a in found["ip_assignments"]] == ["2001:db8:20:ffff::2"]
+
+    listed = client.get("/api/ip-assignments", params={
+        "sort": "address", "start_ip": "2001:db8:20:ffff::2", "end_ip": "2001:db8:20:ffff::ffff",
+    }).json()
+    assert [a["ip_address"] for a in listed["items"]] == ["2001:db8:20:ffff::2"]
+
+
+def test_next_ip_rejects_unknown_device(client):
+    subnet = _create_subnet(client, "20.30.0.0/29").json()
+
+    response = client.post(f"/api/subnets/{subnet['id']}/next-ip", json={"count": 1, "device_id": 999999})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Device not found"
+
+
+def test_subnet_list_encodes_ipv6_address_counts(client):
+    subnet = _create_subnet(client, "2001:db8:30::/56")
+    assert subnet.status_code == 200, subnet.text
+
+    listed = client.get("/api/subnets", params={"limit": 100})
+    assert listed.status_code == 200, listed.text
+    found = next(s for s in listed.json()["items"] if s["cidr"] == "2001:db8:30::/56")
+    assert found["available_ips"] >= 2**72 - 2
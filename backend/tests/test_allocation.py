@@ -0,0 +1,80 @@
+import ipaddress
+
+import pytest
+
+from app.services.ip_allocation import OccupancyBitmap, find_free_addresses
+from app.services.subnet_allocation import first_free_subnet, hosts_to_prefix_length, plan_subnet_batch
+
+
+def test_hosts_to_prefix_length():
+    assert hosts_to_prefix_length(50) == 26
+    assert hosts_to_prefix_length(254) == 24
+    assert hosts_to_prefix_length(255) == 23
+    assert hosts_to_prefix_length(2) == 31
+    assert hosts_to_prefix_length(1000, version=6) == 118
+    with pytest.raises(ValueError):
+        hosts_to_prefix_length(0)
+
+
+def test_first_free_subnet_is_aligned():
+    # 10.0.0.64 is free but a /25 has to start on a /25 boundary
+    assert first_free_subnet("10.0.0.0/24", ["10.0.0.0/26"], 25) == "10.0.0.128/25"
+    assert first_free_subnet("10.0.0.0/24", ["10.0.0.64/26"], 26) == "10.0.0.0/26"
+    assert first_free_subnet("10.0.0.0/24", ["10.0.0.0/26", "10.0.0.128/26"], 26) == "10.0.0.64/26"
+
+
+def test_first_free_subnet_full_or_out_of_range():
+    assert first_free_subnet("10.0.0.0/24", ["10.0.0.0/25", "10.0.0.128/25"], 28) is None
+    assert first_free_subnet("10.0.0.0/24", [], 23) is None
+    assert first_free_subnet("10.0.0.0/24", [], 33) is None
+
+
+def test_first_free_subnet_in_ipv6():
+    existing = ["2001:db8::/64", "2001:db8:0:1::/64", "10.0.0.0/8"]
+    assert first_free_subnet("2001:db8::/48", existing, 64) == "2001:db8:0:2::/64"
+    # Jumps over occupied space instead of walking the 65536 /64s one by one
+    assert first_free_subnet("2001:db8::/48", ["2001:db8::/49"], 64) == "2001:db8:0:8000::/64"
+
+
+def test_plan_places_largest_first_and_keeps_request_order():
+    assert plan_subnet_batch("10.0.0.0/24", [], [26, 25, 26]) == ["10.0.0.128/26", "10.0.0.0/25", "10.0.0.192/26"]
+
+
+def test_plan_fills_gaps_with_the_smallest_fitting_block():
+    # The /26 goes into the hole below the existing subnet, leaving the /25 whole
+    assert plan_subnet_batch("10.0.0.0/24", ["10.0.0.64/26"], [26, 25]) == ["10.0.0.0/26", "10.0.0.128/25"]
+
+
+def test_plan_in_ipv6():
+    assert plan_subnet_batch("2001:db8::/62", [], [64, 63]) == ["2001:db8:0:2::/64", "2001:db8::/63"]
+
+
+def test_plan_rejects_what_does_not_fit():
+    with pytest.raises(ValueError, match="No space left"):
+        plan_subnet_batch("10.0.0.0/24", ["10.0.0.0/25"], [25, 25])
+    with pytest.raises(ValueError, match="does not fit"):
+        plan_subnet_batch("10.0.0.0/24", [], [23])
+
+
+def test_bitmap_scans_across_word_boundaries():
+    bitmap = OccupancyBitmap(130)
+    for index in range(128):
+        if index != 100:
+            bitmap.set(index)
+    bitmap.set(500)  # outside the bitmap, ignored
+    assert list(bitmap.iter_free()) == [100, 128, 129]
+    assert bitmap.is_set(63) and bitmap.is_set(64) and not bitmap.is_set(100)
+
+
+def test_bitmap_full_yields_nothing():
+    bitmap = OccupancyBitmap(64)
+    for index in range(64):
+        bitmap.set(index)
+    assert list(bitmap.iter_free()) == []
+
+
+def test_find_free_addresses():
+    taken = [int(ipaddress.ip_address(f"10.0.0.{host}")) for host in range(1, 65)]
+    assert find_free_addresses("10.0.0.0/24", taken, count=2) == ["10.0.0.65", "10.0.0.66"]
+    assert find_free_addresses("10.0.0.0/30", [int(ipaddress.ip_address("10.0.0.1"))], count=5) == ["10.0.0.2"]
+    assert find_free_addresses("2001:db8::/64", [], count=2) == ["2001:db8::1", "2001:db8::2"]
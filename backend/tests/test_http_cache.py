@@ -0,0 +1,40 @@
+def test_reference_etags_are_weak_and_vary_on_encoding(client):
+    response = client.get("/api/racks")
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('W/"')
+    assert "accept-encoding" in response.headers["vary"].lower()
+
+    # Either encoding revalidates against the same weak tag
+    for encoding in ("gzip", "identity"):
+        cached = client.get("/api/racks", headers={
+            "If-None-Match": response.headers["etag"], "Accept-Encoding": encoding,
+        })
+        assert cached.status_code == 304
+
+
+def test_cascading_delete_invalidates_dependent_etags(client):
+    purpose = client.post("/api/purposes", json={"name": "etag-purpose"}).json()
+    client.post("/api/vlans", json={
+        "site": "dc8", "environment": "test", "vlan_id": 801, "name": "etag-vlan", "purpose_id": purpose["id"],
+    })
+    vlans = client.get("/api/vlans", params={"limit": 100})
+    supernets = client.get("/api/supernets")
+
+    assert client.delete(f"/api/purposes/{purpose['id']}").status_code == 200
+
+    vlans_after = client.get("/api/vlans", params={"limit": 100}, headers={"If-None-Match": vlans.headers["etag"]})
+    assert vlans_after.status_code == 200
+    assert "etag-vlan" not in vlans_after.text
+    supernets_after = client.get("/api/supernets", headers={"If-None-Match": supernets.headers["etag"]})
+    assert supernets_after.status_code == 200
+
+
+def test_cross_origin_revalidation_keeps_cors_headers(client):
+    origin = {"Origin": "http://localhost:5173"}
+    response = client.get("/api/racks", headers=origin)
+    assert response.headers["access-control-allow-origin"] == origin["Origin"]
+
+    cached = client.get("/api/racks", headers={**origin, "If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+    assert cached.headers["access-control-allow-origin"] == origin["Origin"]
+    assert "origin" in cached.headers["vary"].lower()
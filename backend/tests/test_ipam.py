@@ -0,0 +1,64 @@
+import ipaddress
+
+from app.services.ipam import (
+    _bucket_spatial_segments, _coalesce_address_runs, calculate_subnet_spatial_segments, get_usable_address_count,
+    summarize_supernet_allocation,
+)
+
+
+def test_coalesce_address_runs():
+    assert _coalesce_address_runs([]) == []
+    assert _coalesce_address_runs([5]) == [(5, 5)]
+    assert _coalesce_address_runs([0, 1, 2, 4, 6, 7]) == [(0, 2), (4, 4), (6, 7)]
+
+
+def test_sparse_usage_marks_every_touched_bucket_allocated():
+    # A third of the addresses in use, spread evenly across the range
+    runs = [(offset, offset) for offset in range(0, 300, 3)]
+    segments = _bucket_spatial_segments(runs, 300, 10)
+    assert segments == [{'start': 0, 'end': 300, 'type': 'allocated', 'label': 'allocated (33.3% in use)'}]
+
+
+def test_buckets_keep_gaps_and_split_runs_across_boundaries():
+    # 8..11 straddles the first two buckets; 30..39 fills the last one
+    segments = _bucket_spatial_segments([(8, 11), (30, 39)], 40, 4)
+    assert [(s['start'], s['end'], s['type']) for s in segments] == [
+        (0, 20, 'allocated'), (20, 30, 'available'), (30, 40, 'allocated'),
+    ]
+    assert segments[0]['label'] == 'allocated (20.0% in use)'
+    assert segments[2]['label'] == 'allocated (100.0% in use)'
+
+
+def test_subnet_segments_fall_back_to_buckets():
+    assigned = [f"10.0.{i // 256}.{i % 256}" for i in range(1, 65536, 3)]
+    segments = calculate_subnet_spatial_segments("10.0.0.0/16", assigned, max_segments=64)
+    assert len(segments) == 1
+    assert segments[0]['type'] == 'allocated'
+    assert (segments[0]['start'], segments[0]['end']) == (0, 100)
+
+
+def test_supernet_summary_merges_overlaps_and_skips_foreign_children():
+    children = ["10.0.0.0/26", "10.0.0.32/27", "10.0.0.128/25", "10.1.0.0/24", "2001:db8::/64", "bogus"]
+    summary = summarize_supernet_allocation("10.0.0.0/24", children)
+    assert summary['utilization_percentage'] == 75.0
+    assert summary['available_ips'] == 254 - 192
+    assert summary['spatial_segments'] == [
+        {'start': 0.0, 'end': 25.0, 'type': 'allocated'},
+        {'start': 25.0, 'end': 50.0, 'type': 'available'},
+        {'start': 50.0, 'end': 100.0, 'type': 'allocated'},
+    ]
+
+
+def test_supernet_summary_clips_children_to_the_supernet():
+    summary = summarize_supernet_allocation("10.0.0.0/24", ["10.0.0.0/23"])
+    assert summary['utilization_percentage'] == 100.0
+    assert summary['available_ips'] == 0
+    assert summary['spatial_segments'] == [{'start': 0.0, 'end': 100.0, 'type': 'allocated'}]
+
+
+def test_supernet_summary_in_ipv6():
+    summary = summarize_supernet_allocation("2001:db8::/64", ["2001:db8::/65"])
+    assert summary['utilization_percentage'] == 50.0
+    assert summary['available_ips'] == get_usable_address_count(ipaddress.ip_network("2001:db8::/64")) - 2**63
+    empty = summarize_supernet_allocation("2001:db8::/64", [])
+    assert empty['spatial_segments'] == [{'start': 0, 'end': 100, 'type': 'available'}]
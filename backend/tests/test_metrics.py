@@ -0,0 +1,17 @@
+METRICS_AUTH = {"Authorization": "Bearer test-metrics-token"}
+
+
+def test_not_modified_responses_are_labelled_with_their_route(client):
+    etag = client.get("/api/categories").headers["etag"]
+    assert client.get("/api/categories", headers={"If-None-Match": etag}).status_code == 304
+
+    metrics = client.get("/metrics", headers=METRICS_AUTH).text
+    assert 'http_requests_total{method="GET",route="/api/categories",status="304"}' in metrics
+    assert 'route="unmatched",status="304"' not in metrics
+
+
+def test_metrics_require_the_metrics_token(client):
+    # The session client carries a user's JWT, which is not the metrics token
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers=METRICS_AUTH).status_code == 200
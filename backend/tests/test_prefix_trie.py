@@ -0,0 +1,41 @@
+from app.services.prefix_trie import PrefixTrie
+
+
+def _lookup(client, ip):
+    response = client.get("/api/lookup", params={"ip": ip})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_lookup_follows_cascading_deletes(client):
+    purpose = client.post("/api/purposes", json={"name": "trie-purpose"}).json()
+    subnet = client.post("/api/subnets", json={
+        "cidr": "20.50.0.0/24", "gateway_mode": "none", "name": "trie-subnet", "purpose_id": purpose["id"],
+    })
+    assert subnet.status_code == 200, subnet.text
+    assert _lookup(client, "20.50.0.9")["subnet"]["name"] == "trie-subnet"
+
+    assert client.delete(f"/api/purposes/{purpose['id']}").status_code == 200
+    assert _lookup(client, "20.50.0.9")["subnet"] is None
+
+
+def test_trie_matches_covering_prefixes_least_specific_first():
+    trie = PrefixTrie()
+    for cidr in ("10.0.0.0/8", "10.1.0.0/16", "10.1.2.0/24", "10.2.0.0/16"):
+        trie.insert(cidr, cidr)
+    assert len(trie) == 4
+    assert trie.matches("10.1.2.3") == ["10.0.0.0/8", "10.1.0.0/16", "10.1.2.0/24"]
+    assert trie.longest_match("10.1.3.4") == "10.1.0.0/16"
+    assert trie.longest_match("10.1.0.0/16") == "10.1.0.0/16"
+    assert trie.longest_match("11.0.0.1") is None
+
+
+def test_trie_keeps_ip_versions_apart_and_replaces_values():
+    trie = PrefixTrie()
+    trie.insert("0.0.0.0/0", "v4 default")
+    trie.insert("2001:db8::/32", "doc")
+    trie.insert("2001:db8::/32", "doc, renamed")
+    assert len(trie) == 2
+    assert trie.longest_match("2001:db8:1::1") == "doc, renamed"
+    assert trie.longest_match("2001:db9::1") is None
+    assert trie.longest_match("192.0.2.1") == "v4 default"
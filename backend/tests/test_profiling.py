@@ -0,0 +1,41 @@
+import asyncio
+
+from app.core.profiling import _cprofile_lock
+from app.core.security import create_access_token
+from app.db.models import User
+from app.db.session import AsyncSessionLocal
+
+
+async def _create_user(email: str, is_admin: bool) -> int:
+    async with AsyncSessionLocal() as session:
+        user = User(email=email, hashed_password="!", is_admin=is_admin)
+        session.add(user)
+        await session.commit()
+        return user.id
+
+
+def test_admin_gets_the_profile(client):
+    response = client.get("/api/categories", params={"profile": "1"})
+    assert response.status_code == 200
+    assert response.headers["x-profiled-status"] == "200"
+    assert "function calls" in response.text
+    assert not _cprofile_lock.locked()
+
+
+def test_concurrent_profile_is_refused(client):
+    with _cprofile_lock:
+        response = client.get("/api/categories", params={"profile": "1"})
+    assert response.status_code == 409
+    assert response.json()["detail"] == "A profiling session is already running"
+
+
+def test_anonymous_and_non_admin_callers_are_not_profiled(client):
+    anonymous = client.get("/api/categories", params={"profile": "1"}, headers={"Authorization": ""})
+    assert anonymous.status_code == 401
+    assert "x-profiled-status" not in anonymous.headers
+
+    token = create_access_token(asyncio.run(_create_user("viewer@example.com", is_admin=False)))
+    viewer = client.get("/api/categories", params={"profile": "1"}, headers={"Authorization": f"Bearer {token}"})
+    assert viewer.status_code == 200
+    assert "x-profiled-status" not in viewer.headers
+    assert isinstance(viewer.json(), list)
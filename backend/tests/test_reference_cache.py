@@ -0,0 +1,40 @@
+import asyncio
+
+from sqlalchemy import delete
+
+from app.db.models import Purpose
+from app.db.session import AsyncSessionLocal
+from app.services.reference_cache import vlans_cache
+
+
+async def _cached_vlan_names() -> set[str]:
+    async with AsyncSessionLocal() as db:
+        return {vlan.name for vlan in await vlans_cache.all(db)}
+
+
+def test_purpose_delete_invalidates_cached_vlans(client):
+    purpose = client.post("/api/purposes", json={"name": "cache-purpose"}).json()
+    client.post("/api/vlans", json={
+        "site": "dc7", "environment": "test", "vlan_id": 701, "name": "cache-vlan", "purpose_id": purpose["id"],
+    })
+    assert "cache-vlan" in asyncio.run(_cached_vlan_names())
+
+    assert client.delete(f"/api/purposes/{purpose['id']}").status_code == 200
+    assert "cache-vlan" not in asyncio.run(_cached_vlan_names())
+
+
+def test_uncommitted_cascading_delete_reads_through(client):
+    purpose = client.post("/api/purposes", json={"name": "pending-purpose"}).json()
+    client.post("/api/vlans", json={
+        "site": "dc7", "environment": "test", "vlan_id": 702, "name": "pending-vlan", "purpose_id": purpose["id"],
+    })
+
+    async def names_after_pending_delete():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Purpose).where(Purpose.id == purpose["id"]))
+            names = {vlan.name for vlan in await vlans_cache.all(db)}
+            await db.rollback()
+            return names
+
+    assert "pending-vlan" in asyncio.run(_cached_vlan_names())
+    assert "pending-vlan" not in asyncio.run(names_after_pending_delete())
@@ -0,0 +1,42 @@
+from app.api.routes.search import _parse_network_query
+from app.services.text_search import like_pattern, prefix_pattern
+
+
+def _search_cidrs(client, q, entity="subnets"):
+    response = client.get("/api/search", params={"q": q, "entity": entity})
+    assert response.status_code == 200, response.text
+    return [row["cidr"] for row in response.json()[entity]]
+
+
+def test_parse_network_query():
+    assert str(_parse_network_query(" 10.0.0.5 ")) == "10.0.0.5/32"
+    assert str(_parse_network_query("10.0.0.5/24")) == "10.0.0.0/24"
+    assert str(_parse_network_query("2001:db8::/48")) == "2001:db8::/48"
+    assert _parse_network_query("core-sw") is None
+    assert _parse_network_query("10.0.0") is None
+
+
+def test_cidr_queries_match_by_containment(client):
+    for cidr in ("20.60.0.0/24", "20.60.1.0/24", "20.60.2.0/24"):
+        assert client.post("/api/subnets", json={"cidr": cidr, "gateway_mode": "none"}).status_code == 200
+
+    # Contained subnets, in address order
+    assert _search_cidrs(client, "20.60.0.0/23") == ["20.60.0.0/24", "20.60.1.0/24"]
+    # Covering subnets, for an address or a smaller prefix
+    assert _search_cidrs(client, "20.60.1.77") == ["20.60.1.0/24"]
+    assert _search_cidrs(client, "20.60.2.128/25") == ["20.60.2.0/24"]
+    assert _search_cidrs(client, "20.61.0.0/16") == []
+
+
+def test_like_patterns_escape_wildcards():
+    assert like_pattern("core") == "%core%"
+    assert like_pattern("50%_off\\") == "%50\\%\\_off\\\\%"
+    assert prefix_pattern("a_b") == "a\\_b%"
+
+
+def test_substring_search_is_case_insensitive_and_literal(client):
+    for cidr, name in (("20.62.0.0/24", "Promo 50%_Off"), ("20.62.1.0/24", "promo 500ff")):
+        assert client.post("/api/subnets", json={"cidr": cidr, "name": name, "gateway_mode": "none"}).status_code == 200
+
+    assert _search_cidrs(client, "PROMO") == ["20.62.0.0/24", "20.62.1.0/24"]
+    assert _search_cidrs(client, "0%_o") == ["20.62.0.0/24"]
@@ -0,0 +1,28 @@
+from app.db.models import Supernet
+from app.db.session import AsyncSessionLocal
+
+
+async def _add_supernet(cidr: str) -> int:
+    async with AsyncSessionLocal() as session:
+        supernet = Supernet(cidr=cidr, name=cidr)
+        session.add(supernet)
+        await session.commit()
+        return supernet.id
+
+
+def test_create_subnet_rejects_missing_references(client):
+    for field, detail in (("purpose_id", "Purpose not found"), ("vlan_id", "VLAN not found"), ("supernet_id", "Supernet not found")):
+        response = client.post("/api/subnets", json={"cidr": "20.40.0.0/24", "gateway_mode": "none", field: 999999})
+        assert response.status_code == 400, response.text
+        assert response.json()["detail"] == detail
+
+
+def test_batch_rejects_missing_references(client):
+    supernet_id = client.portal.call(_add_supernet, "20.41.0.0/16")
+
+    response = client.post("/api/subnets/batch", json={
+        "supernet_id": supernet_id,
+        "subnets": [{"name": "a", "subnet_mask": 24}, {"name": "b", "subnet_mask": 24, "purpose_id": 999999}],
+    })
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"] == "Purpose not found"
@@ -0,0 +1,38 @@
+from app.services.suggest_index import SuggestIndex
+
+
+def _suggested(client, prefix):
+    response = client.get("/api/search/suggest", params={"q": prefix})
+    assert response.status_code == 200, response.text
+    return {(item["type"], item["label"]) for item in response.json()}
+
+
+def test_purpose_delete_evicts_cascaded_vlans_and_subnets(client):
+    purpose = client.post("/api/purposes", json={"name": "cascade-purpose"}).json()
+    vlan = client.post("/api/vlans", json={
+        "site": "dc9", "environment": "test", "vlan_id": 901, "name": "cascade-vlan", "purpose_id": purpose["id"],
+    }).json()
+    subnet = client.post("/api/subnets", json={
+        "cidr": "20.40.0.0/24", "gateway_mode": "none", "name": "cascade-subnet",
+        "purpose_id": purpose["id"], "vlan_id": vlan["id"],
+    })
+    assert subnet.status_code == 200, subnet.text
+    assert _suggested(client, "cascade-") == {("vlan", "cascade-vlan"), ("subnet", "cascade-subnet")}
+
+    assert client.delete(f"/api/purposes/{purpose['id']}").status_code == 200
+    assert _suggested(client, "cascade-") == set()
+
+
+def test_complete_lists_each_entity_once_in_key_order():
+    index = SuggestIndex()
+    index.put("device", 1, {"name": "core-sw-10", "hostname": "core-sw-10.dc1"})
+    index.put("device", 2, {"name": "Core-SW-2"})
+    index.put("subnet", 3, {"name": "core", "cidr": "10.0.0.0/24"})
+    index.put("vlan", 4, {"name": "edge"})
+
+    found = index.complete("CORE")
+    assert [(item["type"], item["id"], item["match"]) for item in found] == [
+        ("subnet", 3, "core"), ("device", 1, "core-sw-10"), ("device", 2, "Core-SW-2"),
+    ]
+    assert [item["id"] for item in index.complete("core", limit=2)] == [3, 1]
+    assert [item["id"] for item in index.complete("core", kinds={"device"})] == [1, 2]
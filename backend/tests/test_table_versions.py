@@ -0,0 +1,58 @@
+from sqlalchemy import insert, select
+from app.core.config import settings
+from app.db.models import Device, Rack, TableVersion
+from app.db.session import engine
+from app.services import suggest_index
+from app.services.table_versions import publish_table_versions
+
+
+async def _write_from_another_worker(model, values):
+    """Commit a row and its version bump without going through this process's session events"""
+    async with engine.begin() as conn:
+        await conn.execute(insert(model).values(**values))
+        await conn.run_sync(publish_table_versions, [model.__tablename__])
+
+
+async def _shared_versions():
+    async with engine.connect() as conn:
+        return dict((await conn.execute(select(TableVersion.name, TableVersion.version))).all())
+
+
+def _suggested_names(client, prefix):
+    return {item["label"] for item in client.get("/api/search/suggest", params={"q": prefix}).json()}
+
+
+def test_writes_from_other_workers_invalidate_etags(client, monkeypatch):
+    monkeypatch.setattr(settings, "TABLE_VERSION_POLL_SECONDS", 0)
+    racks = client.get("/api/racks")
+    client.portal.call(_write_from_another_worker, Rack, {"aisle": "remote", "rack_number": "r1"})
+
+    after = client.get("/api/racks", headers={"If-None-Match": racks.headers["etag"]})
+    assert after.status_code == 200
+    assert "remote" in after.text
+
+
+def test_writes_from_other_workers_rebuild_the_suggestion_index(client, monkeypatch):
+    monkeypatch.setattr(settings, "TABLE_VERSION_POLL_SECONDS", 0)
+    assert _suggested_names(client, "remote-") == set()
+    client.portal.call(_write_from_another_worker, Device, {"name": "remote-device"})
+    assert _suggested_names(client, "remote-") == {"remote-device"}
+
+
+def test_own_writes_update_the_suggestion_index_in_place(client):
+    _suggested_names(client, "local-")
+    index = suggest_index._index
+    assert client.post("/api/devices", json={"name": "local-device"}).status_code == 200
+    assert _suggested_names(client, "local-") == {"local-device"}
+    assert suggest_index._index is index
+
+
+def test_unwatched_tables_are_not_published(client):
+    subnet = client.post("/api/subnets", json={"cidr": "10.249.0.0/24", "gateway_mode": "none"}).json()
+    before = client.portal.call(_shared_versions)
+
+    # Writes ip_assignments and audit_logs, which no cache reads
+    assert client.post(f"/api/subnets/{subnet['id']}/next-ip", json={"count": 1}).status_code == 200
+    after = client.portal.call(_shared_versions)
+    assert after == before
+    assert not {"ip_assignments", "audit_logs", "users"} & set(after)
@@ -1,8 +1,12 @@
-import { useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import { useQuery } from "@tanstack/react-query";
 import { api } from "../lib/api";
 import { getErrorMessage } from "../utils/errorHandling";
 
+const SEARCH_ENTITIES = ["supernets", "subnets", "devices", "vlans", "ip_assignments"];
+
+type EntityPage = { rows: any[]; cursor: string | null };
+
 export default function SearchPage() {
   const [q, setQ] = useState({ 
     site: "", 
@@ -21,12 +25,68 @@ export default function SearchPage() {
   const { data: vlansResponse } = useQuery({ queryKey: ["vlans"], queryFn: async () => (await api.get("/api/vlans?page=1&limit=1000")).data });
   const vlans = vlansResponse?.items || [];
   
+  // Debounce typeahead so each keystroke does not issue its own request
+  const [suggestText, setSuggestText] = useState("");
+  useEffect(() => {
+    const timer = setTimeout(() => setSuggestText(q.text.trim()), 150);
+    return () => clearTimeout(timer);
+  }, [q.text]);
+  const { data: suggestions } = useQuery({
+    queryKey: ["search-suggest", suggestText],
+    queryFn: async () => (await api.get("/api/search/suggest", { params: { q: suggestText } })).data,
+    enabled: suggestText.length > 0,
+    staleTime: 30_000,
+  });
+
+  // Remember the filters of the last search so "load more" pages through the
+  // same results even after the inputs have been edited
+  const searchedParams = useRef<Record<string, string>>({});
   const { data, refetch, isFetching } = useQuery({
     queryKey: ["search", q],
-    queryFn: async () => (await api.get("/api/search", { params: { ...q, q: q.text } })).data,
+    queryFn: async () => {
+      const params = { ...q, q: q.text };
+      searchedParams.current = params;
+      return (await api.get("/api/search", { params })).data;
+    },
     enabled: false,
   });
 
+  // Each entity type is capped per request; further rows are fetched per type with its cursor
+  const [pages, setPages] = useState<Record<string, EntityPage>>({});
+  const [loadingMore, setLoadingMore] = useState<string | null>(null);
+  useEffect(() => {
+    if (!data) return;
+    const firstPages: Record<string, EntityPage> = {};
+    for (const entity of SEARCH_ENTITIES) {
+      firstPages[entity] = { rows: data[entity] ?? [], cursor: data.next_cursor?.[entity] ?? null };
+    }
+    setPages(firstPages);
+  }, [data]);
+
+  const loadMore = async (entity: string) => {
+    const cursor = pages[entity]?.cursor;
+    if (!cursor) return;
+    setLoadingMore(entity);
+    try {
+      const page = (await api.get("/api/search", { params: { ...searchedParams.current, entity, cursor } })).data;
+      setPages((prev) => ({
+        ...prev,
+        [entity]: { rows: [...(prev[entity]?.rows ?? []), ...page[entity]], cursor: page.next_cursor[entity] },
+      }));
+    } catch (error: any) {
+      alert(`Search failed: ${getErrorMessage(error)}`);
+    } finally {
+      setLoadingMore(null);
+    }
+  };
+
+  const resultProps = (entity: string) => ({
+    rows: pages[entity]?.rows ?? [],
+    hasMore: Boolean(pages[entity]?.cursor),
+    loading: loadingMore === entity,
+    onLoadMore: () => loadMore(entity),
+  });
+
   const handleCsvImport = async () => {
     if (!csvFile) return;
     
@@ -56,7 +116,10 @@ export default function SearchPage() {
       <div className="grid grid-cols-3 gap-2">
         <input className="border rounded p-2" placeholder="Site" value={q.site} onChange={(e) => setQ({ ...q, site: e.target.value })} />
         <input className="border rounded p-2" placeholder="Environment" value={q.environment} onChange={(e) => setQ({ ...q, environment: e.target.value })} />
-        <input className="border rounded p-2" placeholder="Text Search" value={q.text} onChange={(e) => setQ({ ...q, text: e.target.value })} />
+        <input className="border rounded p-2" placeholder="Text Search" list="search-suggestions" value={q.text} onChange={(e) => setQ({ ...q, text: e.target.value })} />
+        <datalist id="search-suggestions">
+          {(suggestions ?? []).map((s: any) => <option key={`${s.type}-${s.id}-${s.match}`} value={s.match}>{s.type}: {s.label}</option>)}
+        </datalist>
         <select className="border rounded p-2" value={q.purpose_id} onChange={(e) => setQ({ ...q, purpose_id: e.target.value })}>
           <option value="">Any Purpose</option>
           {(purposes ?? []).map((p: any) => <option key={p.id} value={p.id}>{p.name}</option>)}
@@ -155,13 +218,13 @@ export default function SearchPage() {
       {data && (
         <div className="space-y-4">
           <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
-            <Result title="Supernets" rows={data.supernets} cols={["name", "cidr", "site", "environment"]} />
-            <Result title="Subnets" rows={data.subnets} cols={["name", "cidr", "site", "environment"]} />
-            <Result title="Devices" rows={data.devices} cols={["name", "hostname", "location", "role", "vendor"]} />
-            <Result title="VLANs" rows={data.vlans} cols={["site", "environment", "vlan_id", "name"]} />
+            <Result title="Supernets" {...resultProps("supernets")} cols={["name", "cidr", "site", "environment"]} />
+            <Result title="Subnets" {...resultProps("subnets")} cols={["name", "cidr", "site", "environment"]} />
+            <Result title="Devices" {...resultProps("devices")} cols={["name", "hostname", "location", "role", "vendor"]} />
+            <Result title="VLANs" {...resultProps("vlans")} cols={["site", "environment", "vlan_id", "name"]} />
           </div>
-          {data.ip_assignments && data.ip_assignments.length > 0 && (
-            <Result title="IP Assignments" rows={data.ip_assignments} cols={["ip_address", "role", "interface", "subnet", "device"]} />
+          {(pages.ip_assignments?.rows.length ?? 0) > 0 && (
+            <Result title="IP Assignments" {...resultProps("ip_assignments")} cols={["ip_address", "role", "interface", "subnet", "device"]} />
           )}
         </div>
       )}
@@ -169,7 +232,14 @@ export default function SearchPage() {
   );
 }
 
-function Result({ title, rows, cols }: { title: string; rows: any[]; cols: string[] }) {
+function Result({ title, rows, cols, hasMore, loading, onLoadMore }: {
+  title: string;
+  rows: any[];
+  cols: string[];
+  hasMore: boolean;
+  loading: boolean;
+  onLoadMore: () => void;
+}) {
   return (
     <div>
       <h3 className="font-semibold mb-2">{title}</h3>
@@ -197,6 +267,11 @@ function Result({ title, rows, cols }: { title: string; rows: any[]; cols: strin
           </tbody>
         </table>
       </div>
+      {hasMore && (
+        <button className="border rounded px-3 py-1 mt-2 text-xs" onClick={onLoadMore} disabled={loading}>
+          {loading ? "Loading..." : `Load more ${title.toLowerCase()}`}
+        </button>
+      )}
     </div>
   );
 }